@@ -18,13 +18,22 @@ from execution.executor import Executor
 
 from intentions.factory_intentions import TaskIntention, ActionIntention
 from intentions.state_representation import State, Predicate, Fluent 
+from tracing.tracer import DEBUG
 
 
 class Operator(Agent):
+    is_human = False
+
     def __init__(self, unique_id: str, model, 
                  size: Tuple[int, int], 
                  init_pos: Tuple[int, int], 
                  side: str, zone: str):
+        # register in the structure-of-arrays operator store first: pos, carrying,
+        # current_task and planned_path (set from here on) live only in model.operator_registry
+        self.unique_id = unique_id
+        self._registry = model.operator_registry
+        self._row = self._registry.register(self, is_human=self.is_human)
+
         super().__init__(unique_id, model)
         
         # id is inherited from Agent class. It will be set to unique_id in super().__init__()
@@ -40,6 +49,9 @@ class Operator(Agent):
 
         self.carrying = None
         self.planned_path = []
+        self.has_coffee = False
+        self.intended_microaction = None    # decided but not yet committed (staged scheduling)
+        self.acted_at = -1                  # last step in which the operator acted (moved or not)
 
 
         # Tasks and intentions
@@ -50,27 +62,101 @@ class Operator(Agent):
         # self.current_plan: List[ActionIntention] = []
         
     
+    # ---------------------------------------------------------
+    # state views over the operator registry
+    # ---------------------------------------------------------
+    @property
+    def pos(self):
+        return self._registry.pos_values[self._row]
+
+    @pos.setter
+    def pos(self, value):
+        self._registry.set_position(self._row, value)
+
+    @property
+    def carrying(self):
+        return self._registry.carried_items[self._row]
+
+    @carrying.setter
+    def carrying(self, item):
+        self._registry.set_carrying(self._row, item)
+
+    @property
+    def current_task(self):
+        return self._registry.current_tasks[self._row]
+
+    @current_task.setter
+    def current_task(self, task):
+        self._registry.set_task(self._row, task)
+
+    @property
+    def planned_path(self):
+        return self._registry.planned_paths[self._row]
+
+    @planned_path.setter
+    def planned_path(self, path):
+        self._registry.set_planned_path(self._row, path)
+    
     
 
     def step(self):
         # Base step method called by both Human and Robot
-        print(f"\n--- {self.unique_id} Step no. {self.model.schedule.steps} ---")
+        self.model.tracer.debug("operator.step", "\n--- {agent} Step no. {step} ---",
+                                agent=self.unique_id, step=self.model.schedule.steps)
         
         # runs subclass-specific step logic (implemented by subclasses)
         self._agent_step()
-        
+        self.acted_at = self.model.schedule.steps
+        self._report()
+
+    # ---------------------------------------------------------
+    # staged scheduling (models/staged_scheduler.py): perceive -> decide -> commit
+    # ---------------------------------------------------------
+    def perceive(self):
+        """Observe the world; read-only, every operator perceives the same snapshot"""
+        pass
+
+    def decide(self):
+        """Plan and pick the micro-action to execute this tick (nothing is applied to the world)"""
+        self.model.tracer.debug("operator.step", "\n--- {agent} Step no. {step} ---",
+                                agent=self.unique_id, step=self.model.schedule.steps)
+        self.intended_microaction = self.executor.decide()
+
+    def commit(self):
+        """Apply the decided micro-action"""
+        if self.intended_microaction is not None:
+            self.executor.commit(self.intended_microaction)
+            self.intended_microaction = None
+        self.acted_at = self.model.schedule.steps
+        self._report()
+
+    def next_event_delay(self):
+        """Ticks until the next activation under the discrete-event scheduler (None while idle)"""
+        return self.executor.next_event_delay()
+
+    def truncate_skip(self, step):
+        self.executor.truncate_skip(step)
+
+    def _report(self):
         # Update tracking variables from executor
         self.current_task = self.executor.current_task
         self.current_action = self.executor.current_action
-        self.current_microaction = self.executor.current_microactions[0] if self.executor.current_microactions else None
+        self.current_microaction = self.executor.current_microactions.peek()
         
-        # Print debug info
+        # Trace debug info
+        tracer = self.model.tracer
+        if not tracer.enabled(DEBUG):
+            return
         if self.carrying:
-            print(f"Carrying: {self.carrying.unique_id}")
-        print(f"Position: {self.pos}")
-        print(f"~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ {self.unique_id}, Current task: {self.current_task} ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~")
-        print(f"Current action: {self.current_action.action_type.name if self.current_action else None}")
-        print(f"Current microaction: {self.current_microaction.microaction_type.name if self.current_microaction else None}")
+            tracer.debug("operator.carrying", "Carrying: {item}", item=self.carrying.unique_id)
+        tracer.debug("operator.status",
+                     "Position: {pos}\n"
+                     "~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~ {agent}, Current task: {task} ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~\n"
+                     "Current action: {action}\n"
+                     "Current microaction: {microaction}",
+                     pos=self.pos, agent=self.unique_id, task=self.current_task,
+                     action=self.current_action.action_type.name if self.current_action else None,
+                     microaction=self.current_microaction.microaction_type.name if self.current_microaction else None)
     
     
     
@@ -91,13 +177,16 @@ class Operator(Agent):
 # Human class
 # ========================================================
 class Human(Operator):
+    is_human = True
+    hesitation = 0.0    # probability of pausing a tick (set by what-if rollouts, see models/rollouts.py)
+
     def __init__(self, unique_id: str, model, size: Tuple[int, int], init_pos: Tuple[int, int], side: str, zone: str):
         super().__init__(unique_id=unique_id, model=model, size=size, init_pos=init_pos, side=side, zone=zone)
         
 
 
         # Human-specific planning/execution
-        self.planner = Planner()  # Can be HumanPlanner in future
+        self.planner = Planner(model)  # Can be HumanPlanner in future
         self.executor = Executor(self)  # Can be HumanExecutor in future
         
         # Keep for human-specific reasoning
@@ -118,8 +207,25 @@ class Human(Operator):
     def _agent_step(self):
 
         # human specific simulaion-execution step
+        if self._hesitates():
+            return
         self.executor.act()
 
+    def decide(self):
+        if self._hesitates():
+            self.intended_microaction = None
+            return
+        super().decide()
+
+    def next_event_delay(self):
+        delay = super().next_event_delay()
+        if delay is not None and self.hesitation:
+            return 1    # a pause may come at any tick
+        return delay
+
+    def _hesitates(self) -> bool:
+        return self.hesitation > 0 and self.model.random.random() < self.hesitation
+
 
 
 # ========================================================
@@ -131,7 +237,7 @@ class Robot(Operator):
 
 
         # Robot-specific planning/execution
-        self.planner = Planner()  # Can be RobotPlanner in future
+        self.planner = Planner(model)  # Can be RobotPlanner in future
         self.executor = Executor(self)  # Can be RobotExecutor in future        
         # Robot-specific tracking
         self.current_action: ActionIntention = None
@@ -162,7 +268,11 @@ class Robot(Operator):
         self.executor.act()
 
 
-        self._print_beliefs()
+        self._trace_beliefs()
+
+    def perceive(self):
+        # observe humans and update beliefs (staged scheduling: before anyone acts this tick)
+        self.intention_recognition.step()
 
 
 
@@ -170,11 +280,13 @@ class Robot(Operator):
     # methods for reasoning about human intentions
     # ---------------------------------------------------------
 
-    def _print_beliefs(self):        
-        # Print robot's reasoning about human intentions
-        print(f"\n--- Robot's reasoning about humans ---")
+    def _trace_beliefs(self):        
+        # Trace robot's reasoning about human intentions (built only if debug events are traced)
+        if not self.model.tracer.enabled(DEBUG):
+            return
+        lines = ["\n--- Robot's reasoning about humans ---"]
         for human_id in self.model.humans:
-            print(f"Task probabilities for {human_id}:")
+            lines.append(f"Task probabilities for {human_id}:")
             task_probs = self.intention_recognition.get_all_task_probabilities(human_id)
             
             if task_probs:
@@ -185,19 +297,20 @@ class Robot(Operator):
                     if task:
                         by_type[task.task_type].append((task_id, prob, task.parameters.get('item_id')))
                 
-                # Print tasks grouped by type and sorted by probability
+                # List tasks grouped by type and sorted by probability
                 for task_type, tasks in by_type.items():
-                    print(f"  {task_type.name}:")
+                    lines.append(f"  {task_type.name}:")
                     # Sort each group by probability
                     for task_id, prob, item_id in sorted(tasks, key=lambda x: x[1], reverse=True):
                         if prob > 0.01:    
                             if item_id:
-                                print(f"    {task_id} ({item_id}): {prob:.2f}")
+                                lines.append(f"    {task_id} ({item_id}): {prob:.2f}")
                             else:
-                                print(f"    {task_id}: {prob:.2f}")
+                                lines.append(f"    {task_id}: {prob:.2f}")
             else:
-                print("  No task probabilities available yet")
-            print()
+                lines.append("  No task probabilities available yet")
+            lines.append("")
+        self.model.tracer.debug("robot.beliefs", "\n".join(lines))
 
         
     def get_belief_data_for_viz(self):
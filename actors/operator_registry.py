@@ -0,0 +1,114 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class OperatorRegistry:
+    """
+    Structure-of-arrays store of operator (human and robot) state.
+
+    Every operator owns one row. Positions are kept in an (N, 2) float array,
+    carried items and current tasks as integer indices (-1 for none), so bulk
+    consumers (recognizer, drawer, ...) can read all operators at once without
+    touching the Operator objects. Human and Robot keep their usual attribute API:
+    pos, carrying, current_task and planned_path are properties reading and writing
+    this registry only, which keeps it in sync with every ContinuousSpace move. The
+    row's objects (exact position tuple, item, task) sit next to the numeric columns
+    and are written by the same setters.
+    """
+
+    def __init__(self):
+        self.operators: List = []            # row -> operator object
+        self.ids: List[str] = []             # row -> operator unique_id
+        self.rows: Dict[str, int] = {}       # unique_id -> row
+
+        self.positions = np.zeros((0, 2))                  # NaN while not placed
+        self.carrying = np.zeros(0, dtype=int)             # item index, -1 if empty-handed
+        self.tasks = np.zeros(0, dtype=int)                # task index, -1 if idle
+        self.is_human = np.zeros(0, dtype=bool)
+        self.planned_paths: List[list] = []
+
+        # row -> the objects behind the columns, as the Operator properties return them
+        self.pos_values: List = []
+        self.carried_items: List = []
+        self.current_tasks: List = []
+
+        # interned item / task ids behind the integer columns
+        self.item_ids: List[str] = []
+        self.item_index: Dict[str, int] = {}
+        self.task_ids: List[str] = []
+        self.task_index: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.operators)
+
+    # ------------------------------------------------
+    # registration
+    # ------------------------------------------------
+    def register(self, operator, is_human: bool) -> int:
+        """Add an operator and return its row"""
+        row = len(self.operators)
+        self.operators.append(operator)
+        self.ids.append(operator.unique_id)
+        self.rows[operator.unique_id] = row
+
+        self.positions = np.vstack([self.positions, np.full((1, 2), np.nan)])
+        self.carrying = np.append(self.carrying, -1)
+        self.tasks = np.append(self.tasks, -1)
+        self.is_human = np.append(self.is_human, is_human)
+        self.planned_paths.append([])
+        self.pos_values.append(None)
+        self.carried_items.append(None)
+        self.current_tasks.append(None)
+        return row
+
+    @property
+    def human_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.is_human)
+
+    @property
+    def robot_rows(self) -> np.ndarray:
+        return np.flatnonzero(~self.is_human)
+
+    # ------------------------------------------------
+    # setters (called by the Operator properties)
+    # ------------------------------------------------
+    def set_position(self, row: int, pos):
+        self.pos_values[row] = pos
+        if pos is None:
+            self.positions[row] = np.nan
+        else:
+            self.positions[row] = pos
+
+    def set_carrying(self, row: int, item):
+        self.carried_items[row] = item
+        self.carrying[row] = -1 if item is None else self._intern(item.unique_id, self.item_ids, self.item_index)
+
+    def set_task(self, row: int, task):
+        self.current_tasks[row] = task
+        if task is None:
+            self.tasks[row] = -1
+        else:
+            task_id = task.parameters.get('task_id', str(id(task)))
+            self.tasks[row] = self._intern(task_id, self.task_ids, self.task_index)
+
+    def set_planned_path(self, row: int, path: list):
+        self.planned_paths[row] = path
+
+    @staticmethod
+    def _intern(key: str, keys: List[str], index: Dict[str, int]) -> int:
+        if key not in index:
+            index[key] = len(keys)
+            keys.append(key)
+        return index[key]
+
+    # ------------------------------------------------
+    # lookups
+    # ------------------------------------------------
+    def carried_item_id(self, row: int) -> Optional[str]:
+        idx = self.carrying[row]
+        return self.item_ids[idx] if idx >= 0 else None
+
+    def task_id(self, row: int) -> Optional[str]:
+        idx = self.tasks[row]
+        return self.task_ids[idx] if idx >= 0 else None
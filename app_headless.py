@@ -34,11 +34,13 @@ import config.factory_param_config as fc_config
 
 # Retrieve the model parameters
 model_params = fc_config.get_factory_model_params()
-print(model_params.keys())
+# headless: no per-tick output (use "ring" or "jsonl" to keep the trace)
+model_params["tracing_params"] = dict(model_params["tracing_params"], sink="null")
 # Ensure model_params is a dictionary with the required keys
 fac_model = FactoryModel(**model_params)
 
-for i in range(100):
-   fac_model.step()
+# fast_forward jumps over the ticks in which operators only walk their planned routes
+# (not while robots repair D* Lite paths around walking humans, see execution/fast_forward.py)
+fac_model.run_steps(100, fast_forward=True)
 
 x = 1
\ No newline at end of file
@@ -0,0 +1,18 @@
+from typing import Dict
+
+
+# =============================================================================
+# TASK ALLOCATION CONFIG
+# =============================================================================
+ALLOCATION = {
+    "capacity": 3,              # tasks queued per operator (including the one in progress)
+    "reallocate_on_completion": True,   # re-solve the pending tasks of a side whenever one of its tasks completes
+    "seconds_per_step": 1.0,    # simulated seconds per model step (throughput in tasks per simulated hour)
+}
+
+
+# =============================================================================
+# Export configurations
+# =============================================================================
+def get_allocation_config() -> Dict:
+    return ALLOCATION
@@ -3,6 +3,11 @@ from config.layout_user_config import FACTORY_LAYOUT as LAYOUT
 
 from config.factory_objects_params_config import get_objects_config
 from config.factory_operators_param_config import get_operators_config
+from config.recognition_param_config import get_recognition_config
+from config.planning_param_config import get_planning_config
+from config.allocation_param_config import get_allocation_config
+from config.scheduling_param_config import get_scheduling_config
+from config.tracing_param_config import get_tracing_config
 
 
 # =============================================================================
@@ -36,6 +41,12 @@ def get_factory_model_params() -> Dict:
         
         "mytext_params": "TEXT mytext in model_params",
 
+        "recognition_params": get_recognition_config(),
+        "planning_params": get_planning_config(),
+        "allocation_params": get_allocation_config(),
+        "scheduling_params": get_scheduling_config(),
+        "tracing_params": get_tracing_config(),
+
     }
 
 
@@ -0,0 +1,41 @@
+from typing import Dict
+
+
+# =============================================================================
+# MOTION PLANNING CONFIG
+# =============================================================================
+PLANNING = {
+    "cell_size": 25,            # occupancy grid resolution (px): path quality vs. planning latency
+    "spatial_hash_cell_size": 100,  # bucket size (px) of the space's neighbor index; None scans every agent per query
+    "avoid_operators": True,    # treat the other operators' current footprints as obstacles
+
+    "route_cache": True,        # reuse routes between landmarks (shelves, kitting table, doors, coffee machines)
+    "precompute_routes": False, # fill the route table for every landmark pair at model init
+    "route_attach_radius": 100, # max distance (px) from a free start position to join a cached route
+
+    "incremental_replanning": False,    # robots repair their path (D* Lite) when humans change the cost map (opt-in: slower than A*)
+    "blocked_wait_ticks": 10,   # ticks a robot waits on a cut-off D* Lite path before taking a static A* path
+    "forecast_steps": 3,        # ticks of linear extrapolation of each human's motion
+    "forecast_cost": 4.0,       # extra cost factor of a cell on a human's forecast
+
+    "fleet_planning": False,    # plan all moving robots jointly (prioritized, reservation table)
+    "fleet_cell_size": 35,      # space-time grid resolution (px); a diagonal move must fit in one step
+    "fleet_goal_dwell": 2,      # ticks a planned robot keeps its goal cell after arriving (fixed agents keep theirs)
+    "fleet_max_expansions": 20000,  # space-time A* expansions per agent before giving up
+    "fleet_time_budget": 0.05,  # max solve time (s) per joint plan; remaining robots plan alone
+    "fleet_include_humans": True,   # reserve the humans' planned steps before planning robots
+    "fleet_horizon": 40,        # ticks of the humans' queued steps reserved per joint plan
+
+    "strips_max_expansions": 2000,  # node expansions of the symbolic task planner before giving up
+
+    "kinematic_motion": False,  # operators accelerate/brake toward their waypoints instead of jumping one MOVE_STEP per tick
+    "max_speed": 40,            # px per tick
+    "max_accel": 15,            # px per tick^2
+}
+
+
+# =============================================================================
+# Export configurations
+# =============================================================================
+def get_planning_config() -> Dict:
+    return PLANNING
@@ -0,0 +1,40 @@
+from typing import Dict
+
+
+# =============================================================================
+# INTENTION RECOGNITION CONFIG
+# =============================================================================
+# "engine" selects the task-inference strategy used by every robot's
+# HumanIntentionRecognition (see intentions/recognition_engines.py).
+# Each engine reads its own keyword arguments from the entry with its name.
+RECOGNITION = {
+    "engine": "bayesian",      # "bayesian" | "hmm" | "particle"
+
+    "release_radius": 100,     # max distance (px) between a releasing human and the holder
+
+    "bayesian": {},
+
+    "hmm": {
+        "stay_prob": 0.7,      # probability of remaining in the current action stage
+        "switch_prob": 0.02,   # probability of abandoning the task for another one
+        "match_weight": 1.0,   # emission weight when the observed action matches the stage
+        "type_weight": 0.2,    # emission weight when only the action type matches
+        "background": 0.05,    # emission floor for every state
+    },
+
+    "particle": {
+        "num_particles": 200,      # particles per human: accuracy vs. per-tick cost
+        "advance_prob": 0.3,       # probability of moving on to the next action stage
+        "switch_prob": 0.02,       # probability of abandoning the task for another one
+        "target_noise": 0.05,      # probability of a movement target outside the task plan
+        "background": 0.05,        # likelihood floor for every particle
+        "resample_threshold": 0.5, # resample when ESS < threshold * num_particles
+    },
+}
+
+
+# =============================================================================
+# Export configurations
+# =============================================================================
+def get_recognition_config() -> Dict:
+    return RECOGNITION
@@ -0,0 +1,19 @@
+from typing import Dict
+
+
+# =============================================================================
+# SCHEDULING CONFIG
+# =============================================================================
+SCHEDULING = {
+    "scheduler": "base",        # "base": operators act one after the other; "staged": perceive -> decide -> commit;
+                                # "event": operators act only at their next event (arrival, grab, task start, ...)
+    "event_max_skip": 10,       # max walking ticks between two activations of an operator (event scheduler)
+    "event_interaction_radius": 100,    # px; operators closer than this are activated every tick
+}
+
+
+# =============================================================================
+# Export configurations
+# =============================================================================
+def get_scheduling_config() -> Dict:
+    return SCHEDULING
@@ -0,0 +1,19 @@
+from typing import Dict
+
+
+# =============================================================================
+# TRACING CONFIG
+# =============================================================================
+TRACING = {
+    "level": "debug",           # "debug": every tick's decisions; "info": task / plan outcomes; "warning": failures; "off"
+    "sink": "print",            # "print": stdout; "null": drop (no formatting cost); "ring": last records in memory; "jsonl": file
+    "path": "trace.jsonl",      # output file of the "jsonl" sink
+    "capacity": 10000,          # records kept by the "ring" sink
+}
+
+
+# =============================================================================
+# Export configurations
+# =============================================================================
+def get_tracing_config() -> Dict:
+    return TRACING
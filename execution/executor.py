@@ -1,8 +1,17 @@
-from typing import List, Optional
+import math
+from collections import deque
+from typing import Iterator, List, Optional
+
+import numpy as np
+
 from intentions.factory_intentions import ActionIntention, ActionType
-from execution.microactions import microaction, microactionType
+from execution.microactions import microaction, microactionType, MicroactionQueue, move_steps
 from intentions.state_representation import State
 from planning import path_planner
+from planning.incremental_planner import DStarLite
+
+
+PIXELS_PER_STEP = 50    # max distance covered by one MOVE_STEP microaction
 
 
 '''
@@ -14,6 +23,11 @@ Executes microactions, monitors results
 '''
 
 
+def robots_repairing_paths(model) -> bool:
+    """True while some robot follows a D* Lite path that is repaired as the humans move"""
+    return any(robot.executor.incremental_planner is not None for robot in model.robots.values())
+
+
 class Executor:
     def __init__(self, agent):
         self.agent = agent
@@ -21,29 +35,50 @@ class Executor:
         self.current_action = None
         self.current_task = None
 
-        self.current_microactions = []
-        self.current_action_sequence = []
+        self.current_microactions = MicroactionQueue()
+        self.current_action_sequence = deque()
+
+        # D* Lite search of the current MOVE_TO (robots only), repaired as humans move
+        self.incremental_planner = None
+        self.move_goal = None   # target position of the current MOVE_TO
+        self.blocked_ticks = 0  # consecutive ticks the D* Lite path has been cut off
+
+        # discrete-event scheduling: MOVE_STEPs of the ticks skipped since the activation at step skip_from
+        self.skip_run = []
+        self.skip_from = 0
+
+    @property
+    def tracer(self):
+        return self.agent.model.tracer
         
 
     def act(self):
         """act is called by the agent's step method each tick"""
+        microaction = self.decide()
+        if microaction is not None:
+            self.commit(microaction)
+
+    def decide(self) -> Optional[microaction]:
+        """Update action/micro-action plans and return the micro-action to execute this tick (None to wait)"""
         '''
         print(f"\n--- Executor Step [{self.agent.unique_id}] ---")
         '''
+        self._catch_up()
         
         # ------------------------------------------------
         # 1. Action Management
         # ------------------------------------------------
         # Get new action if needed
         if not self.current_action:
-            print(f"Assigned task: {self.agent.assigned_taskIntentions}")
+            self.tracer.debug("executor.tasks", "Assigned task: {tasks}", tasks=self.agent.assigned_taskIntentions)
             self.current_action = self._get_next_action()
             if self.current_action:
-                print(f"→ Starting new action: {self.current_action.action_type.name}")
+                self.tracer.debug("executor.action_start", "→ Starting new action: {action}",
+                                  action=self.current_action.action_type.name)
                 # print(f"  Parameters: {self.current_action.parameters}")
             else:
-                print("→ No actions available")
-                return
+                self.tracer.debug("executor.idle", "→ No actions available")
+                return None
 
         # ------------------------------------------------
         # 2. World State Check
@@ -52,18 +87,21 @@ class Executor:
 
         # Check if current action is complete with debug info
         if self.current_action:
-            print("\nChecking action achievement:")
-            print(f"Action: {self.current_action.action_type.name}: {self.current_action.parameters}")
+            self.tracer.debug("executor.action_check", "\nChecking action achievement:\nAction: {action}: {parameters}",
+                              action=self.current_action.action_type.name, parameters=self.current_action.parameters)
             # print(f"Desired state: {self.current_action.desired_state}")
             # print(f"Current world predicates: {world_state.predicates}")
             achieved = self.current_action.is_achieved(world_state)
-            print(f"Action achieved: {achieved}")
+            self.tracer.debug("executor.action_achieved", "Action achieved: {achieved}", achieved=achieved)
             
             if achieved:
-                print(f"✓ Action completed: {self.current_action.action_type.name}")
+                self.tracer.info("executor.action_completed", "✓ Action completed: {action}",
+                                 action=self.current_action.action_type.name)
                 self.current_action = None
-                self.current_microactions = []
-                return
+                self.current_microactions.clear()
+                self._close_incremental_planner()
+                self._stop_motion()
+                return None
 
         # # Check if current action is complete with debug info 
         # if self.current_action and self.current_action.is_achieved(world_state):
@@ -78,19 +116,36 @@ class Executor:
         # ------------------------------------------------
         # Plan new microactions if needed
         if not self.current_microactions:
-            self.current_microactions = self._plan_microactions_for_action(self.current_action, world_state)
+            self.current_microactions = MicroactionQueue(self._plan_microactions_for_action(self.current_action, world_state))
             if self.current_microactions:
-                print(f"→ Planned new micro-action: {self.current_microactions[0].microaction_type.name}")
+                self.tracer.debug("executor.microaction_planned", "→ Planned new micro-action: {microaction}",
+                                  microaction=self.current_microactions.peek().microaction_type.name)
             else:
-                print("✗ Could not plan micro-actions for action")
+                self.tracer.warning("executor.plan_failed", "✗ Could not plan micro-actions for action")
                 self.current_action = None  # Clear action to force replanning
-                return
+                self._stop_motion()
+                return None
 
         # ------------------------------------------------
         # 4. micro-action Execution
         # ------------------------------------------------
+        # Splice in a repaired route if humans changed the cost map; wait while the way is cut off
+        if not self._repair_path():
+            self.tracer.debug("executor.blocked", "✗ Path blocked by a human, waiting")
+            self._stop_motion()
+            return None
+
         # Execute next micro-action
-        microaction = self.current_microactions[0]
+        microaction = self.current_microactions.peek()
+        motion = getattr(self.agent.model, 'motion_model', None)
+        if motion is not None and microaction.microaction_type == microactionType.MOVE_STEP:
+            # kinematic motion: the motion model moves the agent, the executor only steers
+            self._steer(motion)
+            return None
+        return microaction
+
+    def commit(self, microaction: microaction):
+        """Execute the decided micro-action and advance the micro-action queue"""
         '''
         print(f"→ Executing: {microaction.microaction_type.name}")
         '''
@@ -99,11 +154,14 @@ class Executor:
             '''
             print(f"✓ micro-action completed: {microaction.microaction_type.name}")
             '''
-            self.current_microactions.pop(0)
+            # the queue may have been replaced since decide (joint fleet replanning)
+            if self.current_microactions.peek() is microaction:
+                self.current_microactions.popleft()
         
         else:
-            print("✗ micro-action failed. Discarding remaining micro-actions.")
-            self.current_microactions = []
+            self.tracer.warning("executor.microaction_failed", "✗ micro-action failed. Discarding remaining micro-actions.")
+            self.current_microactions.clear()
+            self._stop_motion()
 
             '''
             Potential Improvements
@@ -120,10 +178,10 @@ class Executor:
                         self.current_microactions = []
             '''
 
-        # Print current state
-        print(f"Position: {self.agent.pos}")
+        # Trace current state
+        self.tracer.debug("executor.position", "Position: {pos}", pos=self.agent.pos)
         if self.agent.carrying:
-            print(f"Carrying: {self.agent.carrying.unique_id}")
+            self.tracer.debug("executor.carrying", "Carrying: {item}", item=self.agent.carrying.unique_id)
 
 
 
@@ -140,15 +198,9 @@ class Executor:
             target_pos = microaction.parameters.get('target_pos')
             # if target_pos and self.agent.model.grid.is_cell_empty(target_pos):
             if target_pos:
-                # Move agent itself
+                # Move agent itself (a carried item is attached to it in the space and follows)
                 self.agent.model.grid.move_agent(self.agent, target_pos)
                 
-                # if carrying item, ensure position sync and move
-                if self.agent.carrying:
-                    item = self.agent.carrying
-                    item.pos = self.agent.pos       # Ensure position is synced
-                    self.agent.model.grid.move_agent(item, target_pos)      # Move item in grid
-                
                 return True
  
         # ------------------------------------------------
@@ -159,7 +211,8 @@ class Executor:
             item = self.agent.model.items.get(item_id)
             
             if not item or self.agent.carrying:
-                print(f"Cannot grab: item={item}, carrying={self.agent.carrying}")
+                self.tracer.warning("executor.grab_failed", "Cannot grab: item={item}, carrying={carrying}",
+                                    item=item, carrying=self.agent.carrying)
                 return False
                 
             # Handle item pickup/grab
@@ -167,16 +220,15 @@ class Executor:
             if prev_holder and hasattr(prev_holder, 'remove_item'):
                 prev_holder.remove_item(item)    # this will clear item.holder 
                 
-            # just move the item to the agent's position
-            item.pos = self.agent.pos   # Ensure position is synced before move
-            self.agent.model.grid.move_agent(item, self.agent.pos)    # Move_agent handles the item's holder and pos update
+            # attach the item to the agent: from now on it is wherever the agent is
+            self.agent.model.grid.attach(item, self.agent)
 
             
             # Update relationship state
             self.agent.carrying = item
             item.holder = self.agent
             
-            print(f"Successfully grabbed {item_id}")
+            self.tracer.info("executor.grabbed", "Successfully grabbed {item}", item=item_id)
             return True
 
         # ------------------------------------------------
@@ -184,7 +236,7 @@ class Executor:
         # ------------------------------------------------
         elif microaction.microaction_type == microactionType.RELEASE:
             if not self.agent.carrying:
-                print("Cannot release: not carrying anything")
+                self.tracer.warning("executor.release_failed", "Cannot release: not carrying anything")
                 return False
                 
             item = self.agent.carrying
@@ -192,30 +244,41 @@ class Executor:
             
             
             # Get target holder object
-            holder_obj = None
-            if target_holder == "kitting_table":
-                holder_obj = self.agent.model.kitting_table
-            elif target_holder.startswith("shelf_"):
-                holder_obj = self.agent.model.shelves.get(target_holder)
+            holder_obj = self.agent.model.holders.get(target_holder)
                 
             if not holder_obj or not hasattr(holder_obj, 'add_item'):
-                print(f"Invalid target holder: {target_holder}")
+                self.tracer.warning("executor.release_failed", "Invalid target holder: {holder}", holder=target_holder)
                 return False
             
 
-            # Move item to holder's position (handles grid updates)
-            self.agent.model.grid.move_agent(item, holder_obj.pos)    # Move_agent handles the item's holder and pos update in physical layer
+            # Detach item from the agent and leave it at holder's position (handles grid updates)
+            self.agent.model.grid.detach(item, holder_obj.pos)
             
             
             # Update relationship state in physical layer
             self.agent.carrying = None
             holder_obj.add_item(item)   # this will update item.holder to holder_obj
-            print(f"Successfully released {item.unique_id} on {target_holder}")
+            self.tracer.info("executor.released", "Successfully released {item} on {holder}",
+                             item=item.unique_id, holder=target_holder)
+            return True
+
+        # ------------------------------------------------
+        # USE micro-action
+        # ------------------------------------------------
+        elif microaction.microaction_type == microactionType.USE:
+            target_id = microaction.parameters.get('target_entity')
+            target = self.agent.model.get_entity(target_id)
+            if target is None or not hasattr(target, 'use'):
+                self.tracer.warning("executor.use_failed", "Cannot use: {target}", target=target_id)
+                return False
+            target.use(self.agent)
+            self.tracer.info("executor.used", "Successfully used {target}", target=target_id)
             return True
                 
 
         else:
-            print(f"Unknown micro-action type: {microaction.microaction_type}")
+            self.tracer.warning("executor.unknown_microaction", "Unknown micro-action type: {microaction}",
+                                microaction=microaction.microaction_type)
 
 
         return False
@@ -224,23 +287,27 @@ class Executor:
 
     def _get_next_action(self) -> Optional[ActionIntention]:
         """Get next unachieved action from tasks"""
-        print("Getting next action")
+        self.tracer.debug("executor.next_action", "Getting next action")
         world_state = self.agent.model.state_manager.get_state()
 
         # If we have remaining actions for current task, use next one
         if self.current_action_sequence:
-            return self.current_action_sequence.pop(0)
+            return self.current_action_sequence.popleft()
             
 
         if self.current_task and self.current_task.is_achieved(world_state):
+            completed = self.current_task
             # Update agent's current_task to None
             self.agent.current_task = None
             self.current_task = None
+            allocator = getattr(self.agent.model, 'task_allocator', None)
+            if allocator:
+                allocator.on_task_completed(self.agent, completed)
     
     
-        # Get new task and its actions if needed
+        # Get new task and its actions if needed (in the allocator's slot order)
         if not self.current_task:
-            for task in self.agent.assigned_taskIntentions:
+            for task in sorted(self.agent.assigned_taskIntentions, key=lambda t: t.parameters.get('slot', 0)):
                 if not task.is_achieved(world_state):
                     # Set both executor's and agent's current task
                     self.current_task = task
@@ -249,7 +316,7 @@ class Executor:
                     actions = self.agent.planner.plan_for_task(task, world_state)
                     if actions:
                         # Store remaining actions in the sequence
-                        self.current_action_sequence = actions[1:]
+                        self.current_action_sequence = deque(actions[1:])
                         return actions[0]
         
         return None
@@ -283,7 +350,7 @@ class Executor:
 
     def _plan_microactions_for_action(self, action: ActionIntention, world_state: State) -> List[microaction]:
         """Convert action to sequence of micro-actions with debug prints"""
-        print(f"\nPlanning micro-actions for action: {action.action_type.name}")
+        self.tracer.debug("executor.plan", "\nPlanning micro-actions for action: {action}", action=action.action_type.name)
         # print(f"Action parameters: {action.parameters}")
         # print(f"Current world state predicates:")
         # for pred in world_state.predicates:
@@ -312,7 +379,8 @@ class Executor:
             target_entity_id = action.parameters['target_entity']
             target_pos = None
             
-            print(f"Planning move from {start_pos} to entity {target_entity_id}")
+            self.tracer.debug("executor.plan_move", "Planning move from {start} to entity {target}",
+                              start=start_pos, target=target_entity_id)
             
             # Find target position in world state
             for predicate in world_state.predicates:
@@ -320,34 +388,28 @@ class Executor:
                     try:
                         x, y = map(int, predicate.args[1].split(","))
                         target_pos = (x, y)
-                        print(f"Found target position: {target_pos}")
+                        self.tracer.debug("executor.target_found", "Found target position: {pos}", pos=target_pos)
                     except Exception as e:
-                        print(f"Error parsing position: {e}")
+                        self.tracer.warning("executor.target_parse_error", "Error parsing position: {error}", error=e)
                     break
                     
             if not target_pos:
-                print(f"Could not find position for entity {target_entity_id}")
+                self.tracer.warning("executor.target_missing", "Could not find position for entity {target}",
+                                    target=target_entity_id)
                 return []
             
             
             # call an advanced path panning to generate a path
-            # path_with_velocity = path_planner.get_robot_path_with_velocity(start_pos, target_pos, world_state, self.agent)
+            # path, velocity = incremental_planner.get_robot_path_with_velocity(start_pos, target_pos, self.agent)
             
             
             
-            # Generate path as sequence of positions
-            path = self._calculate_path(start_pos, target_pos)
-            print(f"Calculated path: {path}")
-            
-            # Store the path in the agent for visualization
-            if not hasattr(self.agent, 'planned_path'):
-                self.agent.planned_path = []
-            self.agent.planned_path = path
+            # Generate path as lazy sequence of step positions (also stored in agent.planned_path for visualization)
+            steps = self._plan_path(start_pos, target_pos)
+            self.tracer.debug("executor.path", "Calculated path: {path}", path=self.agent.planned_path)
 
-            # Convert path to micro-actions
-            microactions = [microaction(microactionType.MOVE_STEP, {"target_pos": pos}) for pos in path[1:]]
-            print(f"Generated {len(microactions)} move micro-actions")
-            return microactions
+            # Convert path to micro-actions, built one at a time as the queue is consumed
+            return move_steps(steps)
 
 
 
@@ -356,7 +418,7 @@ class Executor:
         # Action: pick_up
         # ------------------------------------------------
         elif action.action_type == ActionType.PICK_UP:
-            print(f"Planning pickup for item {action.parameters['item_id']}")
+            self.tracer.debug("executor.plan_pickup", "Planning pickup for item {item}", item=action.parameters['item_id'])
             # clear the planned path if any
             if hasattr(self.agent, 'planned_path'):
                 self.agent.planned_path = []
@@ -372,7 +434,8 @@ class Executor:
         # Action: place
         # ------------------------------------------------
         elif action.action_type == ActionType.PLACE:
-            print(f"Planning place micro-action for item {action.parameters['item_id']} on {action.parameters['target_holder']}")
+            self.tracer.debug("executor.plan_place", "Planning place micro-action for item {item} on {holder}",
+                              item=action.parameters['item_id'], holder=action.parameters['target_holder'])
             # clear the planned path if any
             if hasattr(self.agent, 'planned_path'):
                 self.agent.planned_path = []
@@ -382,8 +445,18 @@ class Executor:
                 # TODO
             return [microaction(microactionType.RELEASE, {"target_holder": action.parameters['target_holder']})]
 
+        # ------------------------------------------------
+        # Action: use (e.g. coffee machine)
+        # ------------------------------------------------
+        elif action.action_type == ActionType.USE:
+            self.tracer.debug("executor.plan_use", "Planning use micro-action on {target}",
+                              target=action.parameters['target_entity'])
+            if hasattr(self.agent, 'planned_path'):
+                self.agent.planned_path = []
+            return [microaction(microactionType.USE, {"target_entity": action.parameters['target_entity']})]
+
         
-        print(f"Unknown action type: {action.action_type.name}")
+        self.tracer.warning("executor.unknown_action", "Unknown action type: {action}", action=action.action_type.name)
         return []
 
 
@@ -392,7 +465,7 @@ class Executor:
 
 
 
-    def _plan_move_microactions(self, action: ActionIntention, world_state: State) -> List[microaction]:
+    def _plan_move_microactions(self, action: ActionIntention, world_state: State) -> Iterator[microaction]:
         """Plan sequence of move micro-actions to reach target"""
         # Get current and target positions
         start_pos = self.agent.pos
@@ -409,11 +482,8 @@ class Executor:
         if not target_pos:
             return []
             
-        # Generate path as sequence of positions
-        path = self._calculate_path(start_pos, target_pos)
-        
         # Convert path to micro-actions
-        return [microaction(microactionType.MOVE_STEP, {"target_pos": pos}) for pos in path[1:]]
+        return move_steps(self._plan_path(start_pos, target_pos))
 
 
     def _plan_pickup_microactions(self, action: ActionIntention, world_state: State) -> List[microaction]:
@@ -429,12 +499,289 @@ class Executor:
     # ------------------------------------------------
     # Helper methods
     # ------------------------------------------------
+    def _plan_path(self, start: tuple, end: tuple) -> Iterator[tuple]:
+        """
+        Obstacle-aware path from the model's A* planner, straight line if no route is found.
+
+        Returns the step positions after start lazily; the route (waypoints) is stored in
+        agent.planned_path for visualization.
+        """
+        model = self.agent.model
+        planner = getattr(model, 'path_planner', None)
+        if planner is None:
+            return self._follow(self._calculate_path(start, end))
+
+        if self._uses_fleet_planner():
+            path = self._plan_fleet_path(start, end)
+            if path is not None:
+                return self._follow(path)   # one position per tick, already timed
+
+        if self._uses_incremental_planner():
+            self._close_incremental_planner()
+            self.incremental_planner = DStarLite(model.cost_map, start, end)
+            self._wake_skipping_humans()
+            waypoints = self.incremental_planner.replan(start)
+            if waypoints is not None:
+                return self._follow_waypoints(waypoints)
+            # cut off by humans right now: move as planned on the static layout,
+            # _repair_path holds the robot until the way clears (or gives up on D* Lite)
+
+        return self._plan_static_path(start, end)
+
+    def _plan_static_path(self, start: tuple, end: tuple) -> Iterator[tuple]:
+        """A* / route cache path around the layout and the other operators' current footprints"""
+        model = self.agent.model
+        planner = model.path_planner
+        blocked = set()
+        if model.planning_params.get("avoid_operators", True):
+            for other in model.operator_registry.operators:
+                if other is not self.agent and other.pos is not None:
+                    blocked |= planner.grid.footprint_cells(other.pos, other.size)
+
+        route_cache = getattr(model, 'route_cache', None)
+        if route_cache is not None:
+            waypoints = route_cache.plan(start, end, blocked=blocked)
+        else:
+            waypoints = planner.plan(start, end, blocked=blocked)
+        if waypoints is None:
+            self.tracer.warning("executor.no_path", "No obstacle-free path from {start} to {end}, moving straight",
+                                start=start, end=end)
+            return self._follow(self._calculate_path(start, end))
+        return self._follow_waypoints(waypoints)
+
+    def _follow(self, path: List[tuple]) -> Iterator[tuple]:
+        """Step through a path of per-tick positions (path[0] is the start)"""
+        self.agent.planned_path = path
+        return iter(path[1:])
+
+    def _follow_waypoints(self, waypoints: List[tuple]) -> Iterator[tuple]:
+        """Step along a waypoint polyline, densified lazily into MOVE_STEP-sized steps"""
+        self.agent.planned_path = waypoints
+        return path_planner.iter_steps(waypoints, PIXELS_PER_STEP)
+
+    def _uses_incremental_planner(self) -> bool:
+        model = self.agent.model
+        return (not getattr(self.agent, 'is_human', False)
+                and getattr(model, 'cost_map', None) is not None
+                and getattr(model, 'fleet_planner', None) is None
+                and model.planning_params.get("incremental_replanning", False))
+
+    def _uses_fleet_planner(self) -> bool:
+        return (not getattr(self.agent, 'is_human', False)
+                and getattr(self.agent.model, 'fleet_planner', None) is not None)
+
+    def _queued_move_steps(self, horizon: int) -> List[tuple]:
+        """Target positions of the next MOVE_STEPs (at most horizon), up to the first other micro-action"""
+        steps = []
+        for m in self.current_microactions.lookahead(horizon):
+            if m.microaction_type != microactionType.MOVE_STEP:
+                break
+            steps.append(m.parameters['target_pos'])
+        return steps
+
+    def _plan_fleet_path(self, start: tuple, end: tuple) -> Optional[List[tuple]]:
+        """
+        Replan every moving robot jointly with this new trip; other robots get their new steps here.
+
+        Paths start at this agent's turn: operators that have already acted in this
+        step make their next move a tick later (they wait on their cell at t=1).
+        """
+        model = self.agent.model
+        planner = model.fleet_planner
+        self.move_goal = end
+        now = model.schedule.steps
+
+        requests = {self.agent.unique_id: (start, end)}
+        fixed = {}
+        delays = {}
+        for robot in model.robots.values():
+            if robot is self.agent:
+                continue
+            executor = robot.executor
+            head = executor.current_microactions.peek()
+            if executor.current_action and executor.current_action.action_type == ActionType.MOVE_TO \
+                    and head is not None and head.microaction_type == microactionType.MOVE_STEP:
+                requests[robot.unique_id] = (robot.pos, executor.move_goal)
+                delays[robot.unique_id] = int(robot.acted_at == now)
+            else:
+                fixed[robot.unique_id] = [robot.pos]
+        if model.planning_params.get("fleet_include_humans", True):
+            for human in model.humans.values():
+                waits = [human.pos] * (1 + int(human.acted_at == now))
+                fixed[human.unique_id] = waits + human.executor._queued_move_steps(planner.horizon)
+
+        paths = planner.plan(requests, fixed, delays)
+        self.tracer.debug("executor.fleet_plan", "Fleet plan for {robots} robots in {ms:.1f} ms",
+                          robots=len(requests), ms=planner.last_solve_time * 1000)
+
+        for robot_id, path in paths.items():
+            if robot_id == self.agent.unique_id or path is None:
+                continue
+            path = path[delays[robot_id]:]      # from the robot's own next turn
+            robot = model.robots[robot_id]
+            robot.executor.current_microactions = MicroactionQueue(move_steps(path[1:]))
+            robot.planned_path = path
+        return paths[self.agent.unique_id]
+
+    def _close_incremental_planner(self):
+        self.blocked_ticks = 0
+        if self.incremental_planner is not None:
+            self.incremental_planner.close()
+            self.incremental_planner = None
+
+    def _repair_path(self) -> bool:
+        """
+        Repair the D* Lite search for the changed cells and replace the remaining move
+        steps; False if blocked. After blocked_wait_ticks blocked ticks (e.g. a human
+        standing idle in the only corridor) the robot drops D* Lite and takes the
+        static A* / route cache path around the operators' current footprints.
+        """
+        planner = self.incremental_planner
+        if planner is None or not self.current_microactions:
+            return True
+        if self.current_microactions.peek().microaction_type != microactionType.MOVE_STEP:
+            return True
+        if planner.changes:
+            waypoints = planner.replan(self.agent.pos)
+            if waypoints is not None and planner.path_changed:
+                self.tracer.debug("executor.replanned", "Replanned path around humans ({expanded} cells expanded)",
+                                  expanded=planner.last_expanded)
+                self.current_microactions = MicroactionQueue(move_steps(self._follow_waypoints(waypoints)))
+        if planner.path_found:
+            self.blocked_ticks = 0
+            return True
+
+        self.blocked_ticks += 1
+        if self.blocked_ticks < self.agent.model.planning_params.get("blocked_wait_ticks", 10):
+            return False
+        self.tracer.info("executor.blocked_fallback", "✗ Blocked for {ticks} ticks, leaving D* Lite for a static path",
+                         ticks=self.blocked_ticks)
+        goal = planner.goal_pos
+        self._close_incremental_planner()
+        self.current_microactions = MicroactionQueue(move_steps(self._plan_static_path(self.agent.pos, goal)))
+        return True
+
+    # ------------------------------------------------
+    # discrete-event scheduling
+    # ------------------------------------------------
+    def next_event_delay(self) -> Optional[int]:
+        """
+        Ticks until the executor has to act again (DiscreteEventScheduler), None while idle.
+
+        While walking a run of MOVE_STEPs, the steps of the next ticks are skipped: the
+        next activation jumps to the last skipped one and carries on from there. The skip
+        is bounded by event_max_skip and by the distance to the nearest other operator
+        (two operators close in by at most 2 * PIXELS_PER_STEP per tick). A robot repairing
+        a D* Lite path acts every tick, and a human may not skip into the area such a
+        robot searches (its path, widened by the human's cost footprint).
+        """
+        model = self.agent.model
+        if self.current_action is None:
+            world_state = model.state_manager.get_state()
+            if self.current_task is None and all(task.is_achieved(world_state) for task in self.agent.assigned_taskIntentions):
+                return None     # woken up by the task allocator
+            return 1
+        if self.current_action.action_type != ActionType.MOVE_TO or getattr(model, 'motion_model', None) is not None:
+            return 1
+        if self.incremental_planner is not None:
+            return 1    # D* Lite repairs follow the humans tick by tick
+
+        params = model.scheduling_params
+        run = []
+        for m in self.current_microactions.lookahead(params.get("event_max_skip", 10)):
+            if m.microaction_type != microactionType.MOVE_STEP:
+                break
+            run.append(m)
+        skip = len(run)
+        registry = model.operator_registry
+        others = np.delete(registry.positions, registry.rows[self.agent.unique_id], axis=0)
+        if len(others):
+            offsets = others - np.asarray(self.agent.pos, dtype=float)
+            gap = np.hypot(offsets[:, 0], offsets[:, 1]).min() - params.get("event_interaction_radius", 100)
+            skip = min(skip, int(gap // (2 * PIXELS_PER_STEP)))
+        distance = self._repair_area_distance() if getattr(self.agent, 'is_human', False) else math.inf
+        if distance < math.inf:
+            reach = params.get("event_interaction_radius", 100) \
+                + model.planning_params.get("forecast_steps", 3) * PIXELS_PER_STEP
+            skip = min(skip, int((distance - reach) // PIXELS_PER_STEP))
+        if skip < 2:
+            return 1
+        # the skip - 1 ticks in between are caught up at the next activation, run[skip - 1] is due then
+        self.skip_run = run[:skip - 1]
+        self.skip_from = model.schedule.steps
+        return skip
+
+    def _wake_skipping_humans(self):
+        """A new D* Lite search follows every tick of the humans: end their skips (event scheduler)"""
+        schedule = self.agent.model.schedule
+        if not getattr(schedule, 'event_driven', False):
+            return
+        for human in self.agent.model.humans.values():
+            if human.executor.skip_run:
+                schedule.wake(human)
+
+    def _repair_area_distance(self) -> float:
+        """Distance from the agent to the nearest bounding box of a robot's D* Lite path (inf if none)"""
+        distance = math.inf
+        x, y = self.agent.pos
+        for robot in self.agent.model.robots.values():
+            planner = robot.executor.incremental_planner
+            if planner is None:
+                continue
+            cells = planner.cells or [planner.start, planner.goal]
+            size = planner.grid.cell_size
+            cols = [cell[0] for cell in cells]
+            rows = [cell[1] for cell in cells]
+            dx = max(min(cols) * size - x, 0, x - (max(cols) + 1) * size)
+            dy = max(min(rows) * size - y, 0, y - (max(rows) + 1) * size)
+            distance = min(distance, math.hypot(dx, dy))
+        return distance
+
+    def truncate_skip(self, step: int):
+        """The next activation was moved to step: only the ticks before it are skipped"""
+        del self.skip_run[max(0, step - self.skip_from - 1):]
+
+    def _catch_up(self):
+        """Consume the MOVE_STEPs of the skipped ticks and move to the last of them"""
+        skipped = self.agent.model.schedule.steps - self.skip_from - 1
+        run = self.skip_run[:max(0, skipped)]
+        self.skip_run = []
+        if not run:
+            return
+        target = run[-1]
+        queue = self.current_microactions
+        if not any(m is target for m in queue.lookahead(self.agent.model.scheduling_params.get("event_max_skip", 10))):
+            return      # queue replaced since (e.g. joint fleet replanning)
+        while queue.peek() is not target:
+            queue.popleft()
+        self._execute_microaction(queue.popleft())
+
+    def _steer(self, motion):
+        """Drop the MOVE_STEPs already reached and point the motion model at the next one"""
+        queue = self.current_microactions
+        while queue and queue.peek().microaction_type == microactionType.MOVE_STEP \
+                and motion.has_arrived(self.agent, queue.peek().parameters['target_pos']):
+            queue.popleft()
+        head = queue.peek()
+        if head is None or head.microaction_type != microactionType.MOVE_STEP:
+            motion.clear_target(self.agent)
+            return
+        following = queue.lookahead(2)
+        stop = len(following) < 2 or following[1].microaction_type != microactionType.MOVE_STEP
+        motion.set_target(self.agent, head.parameters['target_pos'], stop)
+
+    def _stop_motion(self):
+        """Drop the motion model's target, so the operator does not keep heading for a stale waypoint"""
+        motion = getattr(self.agent.model, 'motion_model', None)
+        if motion is not None:
+            motion.clear_target(self.agent)
+
     def _calculate_path(self, start: tuple, end: tuple) -> List[tuple]:
         """Simple direct path planning - could be enhanced with pathfinding"""
         path = []
         x, y = start
         target_x, target_y = end
-        pixels_per_step = 50
+        pixels_per_step = PIXELS_PER_STEP
         
         dx = target_x - x
         dy = target_y - y
@@ -0,0 +1,191 @@
+import math
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from intentions.factory_intentions import ActionType
+from execution.microactions import microactionType
+from execution.executor import robots_repairing_paths
+
+
+'''
+Fast-forward for headless runs
+
+While every operator is either walking a planned route or idle with nothing left to
+do, the ticks in between are fully determined by the queued MOVE_STEPs. FastForward
+finds the next "interesting" tick (an arrival, i.e. the last step of a route, which is
+followed by a grab/release/new action; or two operators coming within
+interaction_radius of each other) and jumps straight to the tick before it: each
+walking operator consumes its skipped steps and makes only the last move, and the
+scheduler, state updates and data collection run once for the whole jump instead of
+once per tick. The positions of the last max_runs skipped runs are kept per operator
+and can be queried with position_at.
+
+Robots repair their D* Lite paths as the humans move, tick by tick, so no jump is made
+while such a robot is under way and a human walks: with incremental_replanning on,
+fast-forward only pays off in phases where the humans stand still. Robots still observe humans
+(intention recognition) only at the ticks that are actually stepped, so fast-forward is
+meant for headless runs where throughput and end states matter, not per-tick
+recognition traces. first_divergence checks a configuration against plain stepping.
+'''
+
+
+class FastForward:
+    """Jump the model over ticks in which operators only follow their queued move steps"""
+
+    def __init__(self, model, interaction_radius: float = 100, min_jump: int = 2, max_runs: int = 100):
+        self.model = model
+        self.interaction_radius = interaction_radius
+        self.min_jump = min_jump
+
+        # agent_id -> last max_runs (first skipped step, [positions...]) runs
+        self.max_runs = max_runs
+        self.trajectories: Dict[str, deque] = {}
+
+        self.jumps = 0
+        self.skipped_steps = 0
+
+    # ------------------------------------------------
+    # window
+    # ------------------------------------------------
+    def _walking_steps(self, operator, limit: int) -> Optional[List[tuple]]:
+        """
+        Positions of the operator's next ticks that can be skipped ([] if it stands
+        still), None if its next tick may do more than a move step.
+        """
+        executor = operator.executor
+        if executor.current_action is None:
+            if executor.current_task is not None:
+                return None     # finished task not yet handed back to the allocator
+            world_state = self.model.state_manager.get_state()
+            if any(not task.is_achieved(world_state) for task in operator.assigned_taskIntentions):
+                return None     # about to start a task
+            return []
+        if executor.current_action.action_type != ActionType.MOVE_TO:
+            return None
+        planner = executor.incremental_planner
+        if planner is not None and not planner.path_found:
+            return None         # waiting for a human to clear the way
+
+        positions = []
+        for m in executor.current_microactions.lookahead(limit + 1):
+            if m.microaction_type != microactionType.MOVE_STEP:
+                break
+            positions.append(m.parameters['target_pos'])
+        # the last step (arrival) is stepped normally
+        return positions[:-1] if len(positions) > 1 else None
+
+    def window(self, limit: int) -> Tuple[int, Dict[str, List[tuple]]]:
+        """Number of ticks that can be skipped (at most limit) and the walking operators' positions"""
+        if getattr(self.model, 'motion_model', None) is not None:
+            return 0, {}    # kinematic motion: a MOVE_STEP is no longer one tick
+        if getattr(self.model.schedule, 'event_driven', False):
+            return 0, {}    # the discrete-event scheduler skips walking ticks itself
+        operators = self.model.operator_registry.operators
+        walks = {}
+        ticks = limit
+        for operator in operators:
+            steps = self._walking_steps(operator, limit)
+            if steps is None:
+                return 0, {}
+            if steps:
+                walks[operator.unique_id] = steps
+                ticks = min(ticks, len(steps))
+        if ticks < self.min_jump:
+            return 0, {}
+        if robots_repairing_paths(self.model) and any(agent_id in self.model.humans for agent_id in walks):
+            return 0, {}    # the robots' D* Lite repairs depend on every position of the walking humans
+
+        # stop before the first tick at which two operators come within interaction_radius
+        tracks = np.empty((ticks, len(operators), 2))
+        for col, operator in enumerate(operators):
+            steps = walks.get(operator.unique_id)
+            tracks[:, col] = steps[:ticks] if steps else operator.pos
+        diff = tracks[:, :, None, :] - tracks[:, None, :, :]
+        dist = np.hypot(diff[..., 0], diff[..., 1])
+        # only pairs with at least one walking operator can meet
+        walking = np.array([operator.unique_id in walks for operator in operators])
+        dist[:, ~(walking[:, None] | walking[None, :])] = math.inf
+        dist[:, np.arange(len(operators)), np.arange(len(operators))] = math.inf
+        close = np.flatnonzero((dist < self.interaction_radius).any(axis=(1, 2)))
+        if close.size:
+            ticks = int(close[0])
+        if ticks < self.min_jump:
+            return 0, {}
+        return ticks, {agent_id: steps[:ticks] for agent_id, steps in walks.items()}
+
+    # ------------------------------------------------
+    # jump
+    # ------------------------------------------------
+    def advance(self, limit: int) -> int:
+        """Skip up to limit ticks if nothing interesting happens in them; returns the ticks skipped"""
+        ticks, walks = self.window(limit)
+        if not ticks:
+            return 0
+
+        model = self.model
+        first_step = model.schedule.steps
+        for agent_id, positions in walks.items():
+            executor = model.operator_registry.operators[model.operator_registry.rows[agent_id]].executor
+            queue = executor.current_microactions
+            # consume the skipped steps, move only through the last two (keeps the
+            # per-tick velocity seen by the move listeners)
+            for _ in range(ticks - 2):
+                queue.popleft()
+            for _ in range(min(ticks, 2)):
+                executor._execute_microaction(queue.popleft())
+            self.trajectories.setdefault(agent_id, deque(maxlen=self.max_runs)).append((first_step, positions))
+
+        model.schedule.steps += ticks
+        model.schedule.time += ticks
+        model._steps += ticks
+        model._time += ticks
+        model.state_manager.update()
+        model.datacollector.collect(model)
+
+        self.jumps += 1
+        self.skipped_steps += ticks
+        model.tracer.debug("fast_forward.jump", "⏩ Fast-forwarded {ticks} steps ({first} → {last})",
+                           ticks=ticks, first=first_step, last=model.schedule.steps)
+        return ticks
+
+    def position_at(self, agent_id: str, step: int) -> Optional[tuple]:
+        """Position of an operator at a skipped step (the position after that step), None if not skipped"""
+        for first_step, positions in self.trajectories.get(agent_id, ()):
+            if first_step <= step < first_step + len(positions):
+                return positions[step - first_step]
+        return None
+
+    def first_divergence(self, steps: int) -> Optional[int]:
+        """
+        Run steps ticks on two forks of the model, one stepped tick by tick and one
+        fast-forwarded, and return the first tick at which an operator's position
+        differs (None if the runs agree)
+        """
+        reference = self.model.fork()
+        expected = []
+        for _ in range(steps):
+            reference.step()
+            expected.append([tuple(operator.pos) for operator in reference.operator_registry.operators])
+
+        jumped = self.model.fork()
+        first_step = jumped.schedule.steps
+        target = first_step + steps
+        while jumped.schedule.steps < target:
+            before = jumped.schedule.steps
+            if not jumped.fast_forward.advance(target - before):
+                jumped.step()
+            for step in range(before, jumped.schedule.steps):
+                # operators that did not walk during a jump stood still
+                positions = [jumped.fast_forward.position_at(operator.unique_id, step) or tuple(operator.pos)
+                             for operator in jumped.operator_registry.operators]
+                if positions != expected[step - first_step]:
+                    return step
+        return None
+
+    def get_stats(self) -> Dict:
+        return {
+            "jumps": self.jumps,
+            "skipped_steps": self.skipped_steps,
+        }
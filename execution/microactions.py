@@ -1,11 +1,13 @@
+from collections import deque
 from enum import Enum
 from dataclasses import dataclass
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 
 class microactionType(Enum):
     MOVE_STEP = "move-step"     # parameters: target_pos
     GRAB = "grab"               # parameters: item_id
     RELEASE = "release"         # parameters: target_holder
+    USE = "use"                 # parameters: target_entity
 
 
 @dataclass
@@ -16,3 +18,72 @@ class microaction:
 
     def __repr__(self):
         return f"microaction({self.microaction_type.name}, {self.parameters})"
+
+
+def move_steps(positions: Iterable[tuple]) -> Iterator[microaction]:
+    """Lazily wrap target positions into MOVE_STEP microactions"""
+    for pos in positions:
+        yield microaction(microactionType.MOVE_STEP, {"target_pos": pos})
+
+
+class MicroactionQueue:
+    """
+    FIFO of microactions: a deque of materialized microactions followed by a lazy source.
+
+    Microactions are pulled from the source (e.g. a move_steps generator over a path)
+    one at a time as the head is consumed, so long routes take constant memory and
+    clearing an abandoned plan never builds its remaining steps.
+    """
+
+    def __init__(self, microactions: Iterable[microaction] = ()):
+        self._head = deque()
+        self._source: Optional[Iterator[microaction]] = iter(microactions)
+
+    def _fill(self) -> bool:
+        if not self._head and self._source is not None:
+            nxt = next(self._source, None)
+            if nxt is None:
+                self._source = None
+            else:
+                self._head.append(nxt)
+        return bool(self._head)
+
+    def __bool__(self):
+        return self._fill()
+
+    def peek(self) -> Optional[microaction]:
+        return self._head[0] if self._fill() else None
+
+    def popleft(self) -> microaction:
+        if not self._fill():
+            raise IndexError("pop from an empty MicroactionQueue")
+        return self._head.popleft()
+
+    def lookahead(self, n: int) -> List[microaction]:
+        """The next n queued microactions (or fewer), without consuming them"""
+        while len(self._head) < n and self._source is not None:
+            nxt = next(self._source, None)
+            if nxt is None:
+                self._source = None
+            else:
+                self._head.append(nxt)
+        return [self._head[i] for i in range(min(n, len(self._head)))]
+
+    def clear(self):
+        self._head.clear()
+        self._source = None
+
+    def remaining(self) -> List[microaction]:
+        """All queued microactions (drains the lazy source into the deque)"""
+        if self._source is not None:
+            self._head.extend(self._source)
+            self._source = None
+        return list(self._head)
+
+    def __getstate__(self):
+        # generators cannot be pickled or copied: materialize the rest of the queue
+        return {'_head': deque(self.remaining()), '_source': None}
+
+    def __repr__(self):
+        lazy = " + lazy source" if self._source is not None else ""
+        return f"MicroactionQueue({list(self._head)}{lazy})"
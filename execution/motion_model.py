@@ -0,0 +1,122 @@
+from typing import Dict
+
+import numpy as np
+
+
+'''
+Kinematic motion model
+
+Operators move with a velocity bounded by max_speed and change it by at most max_accel
+per tick, steering toward a target waypoint (the head MOVE_STEP of their executor).
+Intermediate waypoints are passed through at speed; the last one of a route is
+approached with a braking profile and snapped onto exactly, so reach predicates (exact
+position equality) still hold on arrival.
+
+All operators are integrated together once per tick with one NumPy update over the
+OperatorRegistry rows, and the new positions are then written back to the
+ContinuousSpace in a single pass.
+'''
+
+
+class KinematicMotionModel:
+    """Velocity / acceleration-limited motion of all operators, integrated in bulk"""
+
+    def __init__(self, model, max_speed: float = 40, max_accel: float = 15, dt: float = 1.0,
+                 arrive_tolerance: float = 0.5):
+        self.model = model
+        self.registry = model.operator_registry
+        self.max_speed = max_speed
+        self.max_accel = max_accel
+        self.dt = dt
+        self.arrive_tolerance = arrive_tolerance
+
+        n = len(self.registry)
+        self.velocities = np.zeros((n, 2))
+        self.targets = np.full((n, 2), np.nan)      # NaN while an operator has no target
+        self.stop = np.zeros(n, dtype=bool)         # brake on the target (last waypoint of a route)
+        self.arrived = np.zeros(n, dtype=bool)      # reached (or passed) its current target
+
+    # ------------------------------------------------
+    # executor interface
+    # ------------------------------------------------
+    def set_target(self, agent, target, stop: bool):
+        row = self.registry.rows[agent.unique_id]
+        if not np.array_equal(self.targets[row], target):
+            self.targets[row] = target
+            self.arrived[row] = False
+        self.stop[row] = stop
+
+    def clear_target(self, agent):
+        row = self.registry.rows[agent.unique_id]
+        self.targets[row] = np.nan
+        self.velocities[row] = 0.0
+        self.arrived[row] = False
+
+    def has_arrived(self, agent, target) -> bool:
+        row = self.registry.rows[agent.unique_id]
+        return bool(self.arrived[row]) and np.array_equal(self.targets[row], target)
+
+    def speed(self, agent) -> float:
+        return float(np.hypot(*self.velocities[self.registry.rows[agent.unique_id]]))
+
+    # ------------------------------------------------
+    # integration
+    # ------------------------------------------------
+    def integrate(self):
+        """Advance every operator with a target by one tick and write the positions back"""
+        active = ~np.isnan(self.targets[:, 0]) & ~self.arrived
+        if not active.any():
+            return
+        rows = np.flatnonzero(active)
+        pos = self.registry.positions[rows]
+        vel = self.velocities[rows]
+        offset = self.targets[rows] - pos
+        dist = np.hypot(offset[:, 0], offset[:, 1])
+        direction = np.divide(offset, dist[:, None], out=np.zeros_like(offset), where=dist[:, None] > 0)
+
+        # desired speed: cruise, or the braking profile v = sqrt(2 a d) on the last waypoint
+        desired_speed = np.where(self.stop[rows],
+                                 np.minimum(self.max_speed, np.sqrt(2 * self.max_accel * dist)),
+                                 self.max_speed)
+        dv = direction * desired_speed[:, None] - vel
+        dv_norm = np.hypot(dv[:, 0], dv[:, 1])
+        limit = self.max_accel * self.dt
+        dv *= np.minimum(1.0, limit / np.maximum(dv_norm, 1e-12))[:, None]
+        vel = vel + dv
+        speed = np.hypot(vel[:, 0], vel[:, 1])
+        vel *= np.minimum(1.0, self.max_speed / np.maximum(speed, 1e-12))[:, None]
+
+        new_pos = pos + vel * self.dt
+        remaining = np.hypot(*(self.targets[rows] - new_pos).T)
+        travel = np.hypot(vel[:, 0], vel[:, 1]) * self.dt
+        # braking rows arrive when they would reach or overshoot the target (snapped on it);
+        # pass-through rows when the target is within one more tick of travel
+        reached = np.where(self.stop[rows],
+                           (travel >= dist) | (remaining <= self.arrive_tolerance),
+                           remaining <= np.maximum(travel, self.arrive_tolerance))
+        snap = reached & self.stop[rows]
+        new_pos[snap] = self.targets[rows][snap]
+        vel[snap] = 0.0
+
+        self.velocities[rows] = vel
+        self.arrived[rows] = reached
+        self._write_back(rows, new_pos, snap)
+
+    def _write_back(self, rows: np.ndarray, new_pos: np.ndarray, snap: np.ndarray):
+        agents, positions = [], []
+        for row, pos, snapped in zip(rows, new_pos, snap):
+            operator = self.registry.operators[row]
+            if snapped:
+                pos = tuple(self.targets[row].astype(int))   # exact (integer) waypoint
+            else:
+                pos = (float(pos[0]), float(pos[1]))
+            agents.append(operator)
+            positions.append(pos)
+        self.model.grid.move_agents(agents, positions)   # carried items are attached and follow
+
+    def get_stats(self) -> Dict:
+        moving = ~np.isnan(self.targets[:, 0]) & ~self.arrived
+        return {
+            "moving": int(moving.sum()),
+            "mean_speed": float(np.hypot(self.velocities[:, 0], self.velocities[:, 1]).mean()) if len(moving) else 0.0,
+        }
@@ -33,6 +33,7 @@ class ActionType(Enum):
     MOVE_TO = "move_to"         # parameters: agent_id, target_entity  
     PICK_UP = "pick_up"         # parameters: agent_id, item_id
     PLACE = "place"             # parameters: agent_id, item_id, target_holder
+    USE = "use"                 # parameters: agent_id, target_entity (e.g. coffee machine)
 
 
 
@@ -104,6 +105,58 @@ class ActionIntention(Intention):
     def is_achieved(self, world_state: State) -> bool:
         """Check if action is achieved by comparing desired state against world state"""
         return super().is_achieved(world_state)
+
+
+
+class FrozenParameters(dict):
+    """Read-only parameter dict of an ActionRecord (still a dict for readers, picklable)"""
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("action parameters are immutable")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenParameters, (dict(self),))
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+
+
+class ActionRecord:
+    """
+    Immutable action bound from a plan template (see planning/planner.py).
+
+    Offers the read API of ActionIntention (action_type, parameters, desired_state,
+    is_achieved) with fixed slots, so instantiating a plan allocates only the records.
+    """
+    __slots__ = ('action_type', 'parameters', 'desired_predicates')
+    intention_type = IntentionType.ACTION
+
+    def __init__(self, action_type: ActionType, parameters: Dict[str, Any], desired_predicates):
+        object.__setattr__(self, 'action_type', action_type)
+        object.__setattr__(self, 'parameters', FrozenParameters(parameters))
+        object.__setattr__(self, 'desired_predicates', tuple(desired_predicates))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (ActionRecord, (self.action_type, dict(self.parameters), self.desired_predicates))
+
+    def __repr__(self):
+        return f"ActionRecord(type={self.action_type.name}, parameters={dict(self.parameters)})"
+
+    @property
+    def desired_state(self) -> State:
+        return State(list(self.desired_predicates))
+
+    def is_achieved(self, world_state: State) -> bool:
+        """Check if action is achieved by comparing desired predicates against world state"""
+        world_predicates = world_state.predicates
+        return all(pred in world_predicates for pred in self.desired_predicates)
     
     
 
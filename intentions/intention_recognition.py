@@ -7,11 +7,13 @@ from intentions.state_representation import State, Predicate, Fluent
 from execution.microactions import microaction, microactionType
 
 from intentions import movement_probability as mv
+from intentions.recognition_engines import RecognitionEngine, make_recognition_engine
+from tracing.tracer import DEBUG
 
 class HumanIntentionRecognition:
     """System for robots to recognize human intentions based on observed world state changes"""
     
-    def __init__(self, robot):
+    def __init__(self, robot, engine: Optional[RecognitionEngine] = None):
         self.robot = robot
         self.model = robot.model
         
@@ -19,6 +21,14 @@ class HumanIntentionRecognition:
         self.perceived_human_states = {}  # Current state of each human
         self.previous_human_states = {}   # Previous state of each human
         
+        # Change detection: only humans whose state changed since the last tick are re-inferred
+        self.changed_humans = set()       # humans whose position or carrying changed this tick
+        self.last_change_step = {}        # Dict of human_id -> step of the last observed change
+        self.achieved_task_ids = set()    # tasks already seen achieved in the world state
+        self.newly_achieved_task_ids = set()  # tasks achieved since the previous tick
+        self._last_positions = np.zeros((0, 2))  # human positions (registry order) at the last tick
+        self._last_carrying = np.zeros(0, dtype=int)
+        
         # Store position history for movement analysis (up to 5 recent positions)
         self.position_history = {}  # Dict of human_id -> deque of positions with timestamps
         
@@ -40,6 +50,13 @@ class HumanIntentionRecognition:
         # Store inferred task probabilities
         self.task_probabilities = {}  # Dict of human_id -> dict of task -> probability
         
+        # Task inference strategy (selected per run through the model's recognition_params)
+        recognition_params = getattr(self.model, 'recognition_params', None) or {}
+        self.engine = engine or make_recognition_engine(self, recognition_params)
+        
+        # Max distance (px) between a human and the holder they released an item on
+        self.release_radius = recognition_params.get("release_radius", 100)
+        
           
     def step(self):
         """Main update function called from Robot's step method"""
@@ -62,39 +79,73 @@ class HumanIntentionRecognition:
     
     def _update_perceived_human_states(self):
         """Update robot's perception of human states (internal belief)"""
-        for human_id, human in self.model.humans.items():
-            # Move current state to previous state
-            if human_id in self.perceived_human_states:
-                self.previous_human_states[human_id] = self.perceived_human_states[human_id].copy()
-            else:
-                self.previous_human_states[human_id] = self._extract_human_state(human)
-            
-            # Update current state
-            self.perceived_human_states[human_id] = self._extract_human_state(human)
+        self.changed_humans = set()
+        step = self.model.schedule.steps
+        
+        # Change detection on the operator registry columns, for all humans at once
+        registry = self.model.operator_registry
+        rows = registry.human_rows
+        positions = registry.positions[rows]
+        carrying = registry.carrying[rows]
+        
+        num_known = len(self._last_positions)
+        changed = np.ones(len(rows), dtype=bool)   # humans seen for the first time count as changed
+        changed[:num_known] = (np.any(positions[:num_known] != self._last_positions, axis=1) |
+                               (carrying[:num_known] != self._last_carrying))
+        self._last_positions = positions
+        self._last_carrying = carrying
+        
+        # Idle humans (same position and carrying state as last tick) are skipped here, 
+        # so they keep their previous beliefs and cost O(1) per tick.
+        for row in rows[changed]:
+            human = registry.operators[row]
+            human_id = human.unique_id
+            current = self._extract_human_state(human)
             
-            # Update position history
-            if human_id not in self.position_history:
+            # First observation: nothing to compare with yet
+            if human_id not in self.perceived_human_states:
+                self.previous_human_states[human_id] = current
+                self.perceived_human_states[human_id] = current
+                self.last_change_step[human_id] = step
                 self.position_history[human_id] = deque(maxlen=5)  # Track last 5 positions
+                self.position_history[human_id].append((step, human.pos))
+                self._initialize_human_tracking(human_id)
+                continue
             
-            self.position_history[human_id].append((self.model.schedule.steps, human.pos))
-            
+            # Move current state to previous state
+            self.previous_human_states[human_id] = self.perceived_human_states[human_id]
+            self.perceived_human_states[human_id] = current
+            self.changed_humans.add(human_id)
+            self.last_change_step[human_id] = step
             
-            # Initialize other tracking structures if needed
-            if human_id not in self.inferred_microactions:
-                self.inferred_microactions[human_id] = deque(maxlen=10)
-            if human_id not in self.action_history:
-                self.action_history[human_id] = deque(maxlen=5)
-            # NEW:  ensures that each human has an empty dictionary for storing action probabilities when they're first observed
-            if human_id not in self.action_probabilities:
-                self.action_probabilities[human_id] = {}
-            if human_id not in self.task_probabilities:
-                self.task_probabilities[human_id] = self._initialize_task_probabilities(human_id)
+            # Update position history
+            self.position_history[human_id].append((step, human.pos))
+    
+    
+    def _initialize_human_tracking(self, human_id):
+        """Initialize tracking structures for a newly observed human"""
+        self.inferred_microactions[human_id] = deque(maxlen=10)
+        self.action_history[human_id] = deque(maxlen=5)
+        # ensures that each human has an empty dictionary for storing action probabilities when they're first observed
+        self.action_probabilities[human_id] = {}
+        self.task_probabilities[human_id] = self._initialize_task_probabilities(human_id)
+        self.engine.add_human(human_id)
+        # tasks completed before this human was first seen are not candidates
+        self.engine.remove_tasks(human_id, [task_id for task_id in self.achieved_task_ids
+                                            if task_id in self.task_probabilities[human_id]])
+    
+    
+    def get_idle_steps(self, human_id) -> int:
+        """Number of steps since the human's position or carrying state last changed"""
+        if human_id not in self.last_change_step:
+            return 0
+        return self.model.schedule.steps - self.last_change_step[human_id]
         
         
     
     def _infer_microactions(self):
         """Infer microactions based on state changes between steps"""
-        for human_id in self.perceived_human_states:
+        for human_id in self.changed_humans:
             prev = self.previous_human_states.get(human_id)
             curr = self.perceived_human_states[human_id]
             
@@ -148,7 +199,8 @@ class HumanIntentionRecognition:
         timestamp = self.model.schedule.steps
         self.inferred_microactions[human_id].append((timestamp, micro))
         
-        print(f"Robot {self.robot.unique_id} observed {human_id} performing {micro.microaction_type.name}")
+        self.model.tracer.debug("recognition.observed", "Robot {robot} observed {human} performing {microaction}",
+                                robot=self.robot.unique_id, human=human_id, microaction=micro.microaction_type.name)
     
     
     # ==============================================
@@ -158,7 +210,8 @@ class HumanIntentionRecognition:
 
     def _infer_actions(self):
         """Infer which high-level action the human is performing based on microaction patterns"""
-        for human_id, microactions in self.inferred_microactions.items():
+        for human_id in self.changed_humans:
+            microactions = self.inferred_microactions[human_id]
             if not microactions:
                 continue
                 
@@ -225,22 +278,12 @@ class HumanIntentionRecognition:
 
     
     def _infer_release_target(self, human_id) -> str:
-        """Infer where the human placed an item"""
+        """Infer where the human placed an item: the nearest holder within the release radius"""
         # Get human's current position
         human_pos = self.perceived_human_states[human_id]['pos']
         
-        # Check proximity to kitting table
-        kt_distance = mv.calculate_distance(human_pos, self.model.kitting_table.pos)
-        if kt_distance < 100:  # Assuming 100 is "close enough"
-            return "kitting_table"
-        
-        # Check proximity to shelves
-        for shelf_id, shelf in self.model.shelves.items():
-            shelf_distance = mv.calculate_distance(human_pos, shelf.pos)
-            if shelf_distance < 100:
-                return shelf_id
-        
-        return "unknown"
+        holder_id = self.model.holder_index.nearest(human_pos, self.release_radius)
+        return holder_id if holder_id is not None else "unknown"
     
     
 
@@ -251,36 +294,23 @@ class HumanIntentionRecognition:
     # Update _infer_tasks to use action probabilities
     def _infer_tasks(self):
         """Infer which task the human is trying to complete based on action probabilities"""
-        world_state = self.model.state_manager.get_state()
+        # Completion is checked once per tick for all humans
+        self._update_achieved_tasks()
         
         for human_id in self.perceived_human_states:
-            if human_id not in self.task_probabilities:
-                continue
-            
             # Get completed tasks from world state
             completed_tasks = self._get_completed_tasks(human_id)
-            print(f"Completed tasks for {human_id}: {completed_tasks}")
-            if not completed_tasks:
-                print(f"No completed tasks for {human_id}")
-            
-            
-            # Reset completed tasks
-            for task_id in completed_tasks:
-                del self.task_probabilities[human_id][task_id]
-            
-            # Redistribute probabilities uniformly if tasks remain
-            remaining_tasks = list(self.task_probabilities[human_id].keys())
-            if remaining_tasks:
-                uniform_prob = 1.0 / len(remaining_tasks)
-                for task in remaining_tasks:
-                    self.task_probabilities[human_id][task] = uniform_prob
-            
-            # Continue updating probabilities based on actions
-            if human_id in self.action_probabilities and self.action_probabilities[human_id]:
-                self._update_task_probabilities_with_probs(
-                    human_id, 
-                    self.action_probabilities[human_id]
-                )
+            if completed_tasks:
+                self.model.tracer.debug("recognition.completed", "Completed tasks for {human}: {tasks}",
+                                        human=human_id, tasks=completed_tasks)
+                # Reset completed tasks
+                self.engine.remove_tasks(human_id, completed_tasks)
+        
+        # Continue updating probabilities based on actions, using the selected engine.
+        # Idle humans keep their last belief (only completed tasks are removed above).
+        if self.changed_humans:
+            self.engine.update([human_id for human_id in self.perceived_human_states
+                                if human_id in self.changed_humans])
            
            
     # def _infer_tasks(self):
@@ -293,60 +323,24 @@ class HumanIntentionRecognition:
     #         self._update_task_probabilities_with_probs(human_id, self.action_probabilities[human_id])
          
          
+    def _update_achieved_tasks(self):
+        """Find the tasks that became achieved in the world state since the last tick"""
+        world_predicates = set(self.model.state_manager.get_state().predicates)
+        
+        self.newly_achieved_task_ids = set()
+        for task in self.all_possible_tasks:
+            task_id = task.parameters.get('task_id', str(id(task)))
+            if task_id in self.achieved_task_ids:
+                continue
+            if all(pred in world_predicates for pred in task.desired_state.predicates):
+                self.newly_achieved_task_ids.add(task_id)
+        self.achieved_task_ids |= self.newly_achieved_task_ids
+    
+    
     def _get_completed_tasks(self, human_id):
         """Identify tasks that have been completed based on world state"""
-        completed_tasks = []
-        world_state = self.model.state_manager.get_state()
-        
-        for task_id, prob in self.task_probabilities[human_id].items():
-            task = self.model.task_library.get_task_by_id(task_id)
-            if task and task.is_achieved(world_state):
-                completed_tasks.append(task_id)
-        
-        return completed_tasks   
-                
-    # Add method to update tasks with probabilistic actions
-    def _update_task_probabilities_with_probs(self, human_id, action_probabilities):
-        """Update task probabilities based on observed action probabilities"""
-        if human_id not in self.task_probabilities:
-            self.task_probabilities[human_id] = self._initialize_task_probabilities(human_id)
-        
-        # Get current task probabilities
         task_probs = self.task_probabilities[human_id]
-        
-        # Calculate likelihoods for each task given all possible actions
-        total_likelihood = 0
-        task_likelihoods = {task_id: 0.0 for task_id in task_probs}
-        
-        # For each task, calculate likelihood based on all possible actions
-        for task in self.model.task_library.get_all_tasks():
-            task_id = task.parameters.get('task_id')
-            if not task_id or task_id not in task_probs:
-                continue
-                
-            prior = task_probs[task_id]
-            likelihood = 0.0
-            
-            # Consider all possible actions with their probabilities
-            for action_key, action_prob in action_probabilities.items():
-                action_type, target = action_key
-                # Calculate how likely this action is given this task
-                action_likelihood = self._calculate_action_likelihood_for_task(
-                    action_type, target, human_id, task)
-                # Weight by action probability
-                likelihood += action_prob * action_likelihood
-            
-            # Store and accumulate with prior
-            task_likelihoods[task_id] = likelihood
-            total_likelihood += likelihood * prior
-        
-        # Update probabilities using Bayes' rule
-        if total_likelihood > 0:
-            for task_id in task_probs:
-                prior = task_probs[task_id]
-                likelihood = task_likelihoods.get(task_id, 0.0)
-                task_probs[task_id] = (likelihood * prior) / total_likelihood
-                
+        return [task_id for task_id in self.newly_achieved_task_ids if task_id in task_probs]
                 
     # Add helper method for action likelihoods
     def _calculate_action_likelihood_for_task(self, action_type, target, human_id, task):
@@ -410,12 +404,14 @@ class HumanIntentionRecognition:
     # Update _log_beliefs to display action probabilities
     def _log_beliefs(self):
         """Log the current beliefs about human intentions"""
+        if not self.model.tracer.enabled(DEBUG):
+            return
         for human_id in self.perceived_human_states:
-            print(f"\n--- Robot's beliefs about {human_id} ---")
+            lines = [f"\n--- Robot's beliefs about {human_id} ---"]
             
-            # Print action probabilities and task probabilities
+            # List action probabilities and task probabilities
             if human_id in self.action_probabilities and self.action_probabilities[human_id]:
-                print("Action probabilities:")
+                lines.append("Action probabilities:")
                 # Sort by probability
                 sorted_actions = sorted(
                     self.action_probabilities[human_id].items(), 
@@ -423,9 +419,9 @@ class HumanIntentionRecognition:
                     reverse=True
                 )
                 for (action_type, target), prob in sorted_actions[:3]:  # Show top 3
-                    print(f"  {action_type.name}({target}): {prob:.2f}")
+                    lines.append(f"  {action_type.name}({target}): {prob:.2f}")
             
-            # Print task probabilities by type
+            # List task probabilities by type
             if human_id in self.task_probabilities:
                 # Group by task type for readability
                 by_type = defaultdict(list)
@@ -434,17 +430,18 @@ class HumanIntentionRecognition:
                     if task:
                         by_type[task.task_type].append((task_id, prob, task.parameters.get('item_id')))
                 
-                print("Task probabilities by type:")
+                lines.append("Task probabilities by type:")
                 for task_type, tasks in by_type.items():
-                    print(f"  {task_type.name}:")
+                    lines.append(f"  {task_type.name}:")
                     # Sort by probability
                     for task_id, prob, item_id in sorted(tasks, key=lambda x: x[1], reverse=True):
                         if item_id:
-                            print(f"    {task_id} ({item_id}): {prob:.2f}")
+                            lines.append(f"    {task_id} ({item_id}): {prob:.2f}")
                         else:
-                            print(f"    {task_id}: {prob:.2f}")
+                            lines.append(f"    {task_id}: {prob:.2f}")
             
-            print("-----------------------------------")
+            lines.append("-----------------------------------")
+            self.model.tracer.debug("recognition.beliefs", "\n".join(lines))
     
     
     
@@ -88,7 +88,8 @@ def calculate_trajectory_based_probabilities(model, human_id, human_pos, movemen
             for target, score, dist in potential_targets:
                 prob = score / total_score
                 target_probabilities[target] = prob
-                print(f"Target {target}: probability {prob:.2f}, distance {dist:.1f}")
+                model.tracer.debug("recognition.target", "Target {target}: probability {prob:.2f}, distance {dist:.1f}",
+                                   target=target, prob=prob, dist=dist)
     
     return target_probabilities
 
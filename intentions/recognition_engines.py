@@ -0,0 +1,587 @@
+# intentions/recognition_engines.py
+# Pluggable task-inference strategies for HumanIntentionRecognition.
+#
+# The recognizer turns observed world-state changes into microactions and action
+# probabilities. An engine takes those action probabilities and maintains the
+# per-human task beliefs stored in recognizer.task_probabilities.
+
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from intentions.factory_intentions import ActionType
+from intentions import movement_probability as mv
+
+
+class RecognitionEngine:
+    """Base class for task-inference strategies used by HumanIntentionRecognition"""
+
+    name = None
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.model = recognizer.model
+
+        # cost bookkeeping, so engines can be compared on the same run
+        self.update_count = 0
+        self.update_time = 0.0
+
+    def add_human(self, human_id):
+        """Called once when a human is first observed, after its uniform prior is set"""
+        pass
+
+    def remove_tasks(self, human_id, task_ids):
+        """Drop completed tasks from the belief of a human and renormalize the rest"""
+        task_probs = self.recognizer.task_probabilities[human_id]
+        for task_id in task_ids:
+            task_probs.pop(task_id, None)
+
+        total = sum(task_probs.values())
+        if total > 0:
+            for task_id in task_probs:
+                task_probs[task_id] /= total
+
+    def update(self, human_ids: List[str]):
+        """Update task beliefs of the given humans from their latest action probabilities"""
+        start = time.perf_counter()
+        self._update(human_ids)
+        self.update_time += time.perf_counter() - start
+        self.update_count += 1
+
+    def _update(self, human_ids: List[str]):
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, float]:
+        """Return accumulated cost of this engine"""
+        mean_time = self.update_time / self.update_count if self.update_count else 0.0
+        return {
+            "engine": self.name,
+            "updates": self.update_count,
+            "total_time": self.update_time,
+            "mean_time": mean_time,
+        }
+
+
+# ==============================================
+# Bayesian engine (default)
+# ==============================================
+
+class BayesianEngine(RecognitionEngine):
+    """Single-step Bayes update from a uniform prior over the remaining tasks"""
+
+    name = "bayesian"
+
+    def _update(self, human_ids):
+        for human_id in human_ids:
+            task_probs = self.recognizer.task_probabilities.get(human_id)
+            if task_probs is None:
+                continue
+
+            # Redistribute probabilities uniformly if tasks remain
+            if task_probs:
+                uniform_prob = 1.0 / len(task_probs)
+                for task_id in task_probs:
+                    task_probs[task_id] = uniform_prob
+
+            # Continue updating probabilities based on actions
+            action_probabilities = self.recognizer.action_probabilities.get(human_id)
+            if action_probabilities:
+                self._update_task_probabilities_with_probs(human_id, action_probabilities)
+
+    def _update_task_probabilities_with_probs(self, human_id, action_probabilities):
+        """Update task probabilities based on observed action probabilities"""
+        task_probs = self.recognizer.task_probabilities[human_id]
+
+        # Calculate likelihoods for each task given all possible actions
+        total_likelihood = 0
+        task_likelihoods = {task_id: 0.0 for task_id in task_probs}
+
+        # For each task, calculate likelihood based on all possible actions
+        for task in self.model.task_library.get_all_tasks():
+            task_id = task.parameters.get('task_id')
+            if not task_id or task_id not in task_probs:
+                continue
+
+            prior = task_probs[task_id]
+            likelihood = 0.0
+
+            # Consider all possible actions with their probabilities
+            for action_key, action_prob in action_probabilities.items():
+                action_type, target = action_key
+                # Calculate how likely this action is given this task
+                action_likelihood = self.recognizer._calculate_action_likelihood_for_task(
+                    action_type, target, human_id, task)
+                # Weight by action probability
+                likelihood += action_prob * action_likelihood
+
+            # Store and accumulate with prior
+            task_likelihoods[task_id] = likelihood
+            total_likelihood += likelihood * prior
+
+        # Update probabilities using Bayes' rule
+        if total_likelihood > 0:
+            for task_id in task_probs:
+                prior = task_probs[task_id]
+                likelihood = task_likelihoods.get(task_id, 0.0)
+                task_probs[task_id] = (likelihood * prior) / total_likelihood
+
+
+# ==============================================
+# HMM engine
+# ==============================================
+
+def _expected_action_key(action_type, parameters):
+    """Map a planned action to the (action_type, target) key used by the recognizer"""
+    if action_type == ActionType.MOVE_TO:
+        return (action_type, parameters.get('target_entity'))
+    if action_type == ActionType.PICK_UP:
+        return (action_type, parameters.get('item_id'))
+    if action_type == ActionType.PLACE:
+        return (action_type, parameters.get('target_holder'))
+    if action_type == ActionType.USE:
+        return (action_type, parameters.get('target_entity'))
+    return (action_type, None)
+
+
+class HMMEngine(RecognitionEngine):
+    """
+    Hidden Markov model over (task, action-stage) states, updated with the forward algorithm.
+
+    The stages of a task are the actions of TaskLibrary.task_action_sequences[task_id].
+    The transition model is left-to-right within a task (stay or advance one stage,
+    the last stage is absorbing) plus a small probability of switching to the first
+    stage of any other task. Since every row of the within-task transition matrix
+    has at most two non-zero entries, it is stored in banded form (stay, advance)
+    and one forward step costs O(S*K) for S tasks with at most K stages.
+    """
+
+    name = "hmm"
+
+    def __init__(self, recognizer,
+                 stay_prob=0.7,
+                 switch_prob=0.02,
+                 match_weight=1.0,
+                 type_weight=0.2,
+                 background=0.05):
+        super().__init__(recognizer)
+        self.stay_prob = stay_prob
+        self.switch_prob = switch_prob
+        self.match_weight = match_weight
+        self.type_weight = type_weight
+        self.background = background
+
+        self._built = False
+        self.alpha = {}         # human_id -> (S, K) forward probabilities
+        self.active = {}        # human_id -> (S,) mask of tasks not yet completed
+
+    # ------------------------------------------------
+    # model construction
+    # ------------------------------------------------
+    def _build(self):
+        """Derive the state space and transition structure from the task library"""
+        library = self.model.task_library
+        self.task_ids = [task.parameters.get('task_id', str(id(task)))
+                         for task in self.recognizer.all_possible_tasks]
+        self.task_index = {task_id: s for s, task_id in enumerate(self.task_ids)}
+
+        sequences = [library.get_action_sequence(task_id) for task_id in self.task_ids]
+        self.lengths = np.array([max(1, len(seq)) for seq in sequences], dtype=int)
+        num_tasks = len(self.task_ids)
+        max_stages = int(self.lengths.max()) if num_tasks else 1
+        stages = np.arange(max_stages)
+
+        self.valid = stages[None, :] < self.lengths[:, None]
+        last = stages[None, :] == (self.lengths[:, None] - 1)
+
+        # banded transition matrix: stay on the diagonal, advance on the super-diagonal
+        self.stay = np.where(self.valid, self.stay_prob, 0.0)
+        self.stay[last] = 1.0
+        self.advance = np.where(self.valid & ~last, 1.0 - self.stay_prob, 0.0)
+
+        # emission lookup: flat state indices per expected (action_type, target)
+        states_by_action = {}
+        type_masks = {}
+        for s, seq in enumerate(sequences):
+            for k, (action_type, parameters) in enumerate(seq):
+                key = _expected_action_key(action_type, parameters)
+                states_by_action.setdefault(key, []).append(s * max_stages + k)
+                if action_type not in type_masks:
+                    type_masks[action_type] = np.zeros((num_tasks, max_stages), dtype=bool)
+                type_masks[action_type][s, k] = True
+        self.states_by_action = {key: np.array(idx) for key, idx in states_by_action.items()}
+        self.type_masks = type_masks
+
+        self.max_stages = max_stages
+        self._built = True
+
+    def add_human(self, human_id):
+        if not self._built:
+            self._build()
+        active = np.zeros(len(self.task_ids), dtype=bool)
+        for task_id in self.recognizer.task_probabilities[human_id]:
+            if task_id in self.task_index:
+                active[self.task_index[task_id]] = True
+
+        alpha = np.zeros((len(self.task_ids), self.max_stages))
+        alpha[active, 0] = 1.0
+        total = alpha.sum()
+        if total > 0:
+            alpha /= total
+        self.alpha[human_id] = alpha
+        self.active[human_id] = active
+
+    def remove_tasks(self, human_id, task_ids):
+        super().remove_tasks(human_id, task_ids)
+        if human_id not in self.alpha:
+            return
+        for task_id in task_ids:
+            s = self.task_index.get(task_id)
+            if s is not None:
+                self.active[human_id][s] = False
+                self.alpha[human_id][s] = 0.0
+        total = self.alpha[human_id].sum()
+        if total > 0:
+            self.alpha[human_id] /= total
+
+    # ------------------------------------------------
+    # forward algorithm
+    # ------------------------------------------------
+    def _emission(self, action_probabilities):
+        """P(observation | state) for the current action distribution"""
+        emission = np.full((len(self.task_ids), self.max_stages), self.background)
+        flat = emission.reshape(-1)
+        for (action_type, target), prob in action_probabilities.items():
+            type_mask = self.type_masks.get(action_type)
+            if type_mask is not None:
+                emission[type_mask] += prob * self.type_weight
+            idx = self.states_by_action.get((action_type, target))
+            if idx is not None:
+                flat[idx] += prob * self.match_weight
+        return emission
+
+    def _forward_step(self, human_id, action_probabilities):
+        alpha = self.alpha[human_id]
+        active = self.active[human_id]
+
+        # predict: within-task transitions (banded)
+        predicted = self.stay * alpha
+        predicted[:, 1:] += (self.advance * alpha)[:, :-1]
+
+        # predict: task switching into the first stage of the remaining tasks
+        num_active = active.sum()
+        if num_active > 0 and self.switch_prob > 0:
+            predicted *= (1.0 - self.switch_prob)
+            predicted[active, 0] += self.switch_prob * alpha.sum() / num_active
+
+        # correct with the observation
+        alpha = predicted * self._emission(action_probabilities)
+        alpha[~self.valid] = 0.0
+        alpha[~active] = 0.0
+
+        total = alpha.sum()
+        if total > 0:
+            alpha /= total
+        self.alpha[human_id] = alpha
+
+    def _update(self, human_ids):
+        for human_id in human_ids:
+            if human_id not in self.alpha:
+                continue
+            action_probabilities = self.recognizer.action_probabilities.get(human_id)
+            if action_probabilities:
+                self._forward_step(human_id, action_probabilities)
+
+            # task marginals
+            marginals = self.alpha[human_id].sum(axis=1)
+            task_probs = self.recognizer.task_probabilities[human_id]
+            for task_id in task_probs:
+                task_probs[task_id] = float(marginals[self.task_index[task_id]])
+
+    def get_stage_probabilities(self, human_id, task_id) -> List[float]:
+        """Return the belief over action stages of one task (for inspection)"""
+        if human_id not in self.alpha or task_id not in self.task_index:
+            return []
+        s = self.task_index[task_id]
+        return self.alpha[human_id][s, :self.lengths[s]].tolist()
+
+
+# ==============================================
+# Particle filter engine
+# ==============================================
+
+class ParticleFilterEngine(RecognitionEngine):
+    """
+    Sampling-based joint estimate of (task, action stage, target) per human.
+
+    Every human keeps num_particles particles. All particles of all humans live in
+    (H, N) integer arrays, so propagation, weighting and systematic resampling are
+    single vectorized operations. Weights combine the task likelihood of the
+    recognizer (_calculate_action_likelihood_for_task) with the agreement between
+    the particle's current stage/target and the inferred action probabilities.
+    """
+
+    name = "particle"
+
+    def __init__(self, recognizer,
+                 num_particles=200,
+                 advance_prob=0.3,
+                 switch_prob=0.02,
+                 target_noise=0.05,
+                 background=0.05,
+                 resample_threshold=0.5):
+        super().__init__(recognizer)
+        self.num_particles = num_particles
+        self.advance_prob = advance_prob
+        self.switch_prob = switch_prob
+        self.target_noise = target_noise
+        self.background = background
+        self.resample_threshold = resample_threshold
+
+        # seeded from the model RNG so runs are reproducible
+        self.rng = np.random.default_rng(self.model.random.getrandbits(32))
+
+        self._built = False
+        self.human_rows = {}                                   # human_id -> row in the particle arrays
+        self.tasks = np.zeros((0, num_particles), dtype=int)
+        self.stages = np.zeros((0, num_particles), dtype=int)
+        self.targets = np.zeros((0, num_particles), dtype=int)
+        self.weights = np.zeros((0, num_particles))
+
+    # ------------------------------------------------
+    # model construction
+    # ------------------------------------------------
+    def _build(self):
+        library = self.model.task_library
+        self.task_ids = [task.parameters.get('task_id', str(id(task)))
+                         for task in self.recognizer.all_possible_tasks]
+        self.task_index = {task_id: s for s, task_id in enumerate(self.task_ids)}
+        self.tasks_by_index = list(self.recognizer.all_possible_tasks)
+
+        # every entity an action can refer to gets an integer code
+        entities = list(self.model.items) + ["kitting_table"] + list(self.model.shelves)
+        self.entity_ids = entities
+        self.entity_index = {entity_id: e for e, entity_id in enumerate(entities)}
+        self.move_targets = np.array([self.entity_index[t] for t in mv.get_all_possible_targets(self.model)])
+
+        self.action_types = list(ActionType)
+        self.action_type_index = {action_type: a for a, action_type in enumerate(self.action_types)}
+
+        sequences = [library.get_action_sequence(task_id) for task_id in self.task_ids]
+        self.lengths = np.array([max(1, len(seq)) for seq in sequences], dtype=int)
+        max_stages = int(self.lengths.max()) if self.task_ids else 1
+
+        # expected action type and target of every (task, stage); -1 where undefined
+        self.stage_type = np.full((len(self.task_ids), max_stages), -1, dtype=int)
+        self.stage_target = np.full((len(self.task_ids), max_stages), -1, dtype=int)
+        for s, seq in enumerate(sequences):
+            for k, (action_type, parameters) in enumerate(seq):
+                _, target = _expected_action_key(action_type, parameters)
+                self.stage_type[s, k] = self.action_type_index[action_type]
+                self.stage_target[s, k] = self.entity_index.get(target, -1)
+        self.is_move_stage = self.stage_type == self.action_type_index[ActionType.MOVE_TO]
+
+        self.active = np.zeros((0, len(self.task_ids)), dtype=bool)
+        self._built = True
+
+    def add_human(self, human_id):
+        if not self._built:
+            self._build()
+        active = np.zeros(len(self.task_ids), dtype=bool)
+        for task_id in self.recognizer.task_probabilities[human_id]:
+            if task_id in self.task_index:
+                active[self.task_index[task_id]] = True
+
+        row = len(self.human_rows)
+        self.human_rows[human_id] = row
+        self.active = np.vstack([self.active, active[None, :]])
+        self.tasks = np.vstack([self.tasks, np.zeros((1, self.num_particles), dtype=int)])
+        self.stages = np.vstack([self.stages, np.zeros((1, self.num_particles), dtype=int)])
+        self.targets = np.vstack([self.targets, np.zeros((1, self.num_particles), dtype=int)])
+        self.weights = np.vstack([self.weights, np.full((1, self.num_particles), 1.0 / self.num_particles)])
+        self._restart_particles(np.array([row]), np.ones((1, self.num_particles), dtype=bool))
+
+    def remove_tasks(self, human_id, task_ids):
+        super().remove_tasks(human_id, task_ids)
+        row = self.human_rows.get(human_id)
+        if row is None:
+            return
+        removed = [self.task_index[t] for t in task_ids if t in self.task_index]
+        if not removed:
+            return
+        self.active[row, removed] = False
+        stale = np.isin(self.tasks[row], removed)[None, :]
+        self._restart_particles(np.array([row]), stale)
+
+    # ------------------------------------------------
+    # sampling helpers
+    # ------------------------------------------------
+    def _sample_active_tasks(self, rows, count):
+        """Draw count tasks per row, uniformly among that row's active tasks"""
+        active = self.active[rows]
+        num_tasks = active.shape[1]
+        num_active = active.sum(axis=1)
+        flat_cum = np.cumsum(active.ravel())
+        row_base = np.concatenate(([0], flat_cum))[np.arange(len(rows)) * num_tasks]
+        picks = (self.rng.random((len(rows), count)) * num_active[:, None]).astype(int) + 1
+        flat_idx = np.searchsorted(flat_cum, row_base[:, None] + picks)
+        tasks = flat_idx - (np.arange(len(rows)) * num_tasks)[:, None]
+        # rows without active tasks keep a valid (irrelevant) index
+        return np.where(num_active[:, None] > 0, np.clip(tasks, 0, num_tasks - 1), 0)
+
+    def _expected_targets(self, tasks, stages):
+        targets = self.stage_target[tasks, stages]
+        noisy = self.is_move_stage[tasks, stages] & (self.rng.random(tasks.shape) < self.target_noise)
+        random_targets = self.move_targets[self.rng.integers(len(self.move_targets), size=tasks.shape)]
+        return np.where(noisy, random_targets, targets)
+
+    def _restart_particles(self, rows, mask):
+        """Re-draw the masked particles of the given rows from the start of an active task"""
+        if not mask.any():
+            return
+        new_tasks = self._sample_active_tasks(rows, self.num_particles)
+        new_stages = np.zeros_like(new_tasks)
+        new_targets = self._expected_targets(new_tasks, new_stages)
+        row_idx = rows[:, None]
+        self.tasks[row_idx, :] = np.where(mask, new_tasks, self.tasks[rows])
+        self.stages[row_idx, :] = np.where(mask, new_stages, self.stages[rows])
+        self.targets[row_idx, :] = np.where(mask, new_targets, self.targets[rows])
+
+    # ------------------------------------------------
+    # filter steps
+    # ------------------------------------------------
+    def _propagate(self, rows):
+        tasks, stages, targets = self.tasks[rows], self.stages[rows], self.targets[rows]
+
+        # advance to the next action stage of the task
+        can_advance = stages < (self.lengths[tasks] - 1)
+        advance = can_advance & (self.rng.random(tasks.shape) < self.advance_prob)
+        stages = stages + advance
+
+        # abandon the task for another active one
+        switch = self.rng.random(tasks.shape) < self.switch_prob
+        tasks = np.where(switch, self._sample_active_tasks(rows, self.num_particles), tasks)
+        stages = np.where(switch, 0, stages)
+
+        # stage changes re-draw the target
+        changed = advance | switch
+        targets = np.where(changed, self._expected_targets(tasks, stages), targets)
+
+        self.tasks[rows], self.stages[rows], self.targets[rows] = tasks, stages, targets
+
+    def _likelihood_tables(self, human_ids):
+        """Per-human task likelihoods and observed action tables, from the recognizer's likelihood functions"""
+        num_rows = len(human_ids)
+        task_lik = np.ones((num_rows, len(self.task_ids)))
+        observed = np.zeros((num_rows, len(self.action_types), len(self.entity_ids)))
+
+        for r, human_id in enumerate(human_ids):
+            action_probabilities = self.recognizer.action_probabilities.get(human_id) or {}
+            for (action_type, target), prob in action_probabilities.items():
+                e = self.entity_index.get(target)
+                if e is not None:
+                    observed[r, self.action_type_index[action_type], e] += prob
+
+            if not action_probabilities:
+                continue
+            # only the tasks currently held by particles need a likelihood
+            for s in np.unique(self.tasks[self.human_rows[human_id]]):
+                task = self.tasks_by_index[s]
+                task_lik[r, s] = sum(
+                    prob * self.recognizer._calculate_action_likelihood_for_task(action_type, target, human_id, task)
+                    for (action_type, target), prob in action_probabilities.items())
+        return task_lik, observed
+
+    def _reweight(self, rows, human_ids):
+        task_lik, observed = self._likelihood_tables(human_ids)
+        tasks, stages, targets = self.tasks[rows], self.stages[rows], self.targets[rows]
+
+        local = np.arange(len(rows))[:, None]
+        stage_type = self.stage_type[tasks, stages]
+        obs_lik = np.where((stage_type >= 0) & (targets >= 0),
+                           observed[local, np.maximum(stage_type, 0), np.maximum(targets, 0)],
+                           0.0) + self.background
+
+        weights = self.weights[rows] * task_lik[local, tasks] * obs_lik
+        weights[~self.active[rows][local, tasks]] = 0.0
+        totals = weights.sum(axis=1, keepdims=True)
+        uniform = np.full_like(weights, 1.0 / self.num_particles)
+        self.weights[rows] = np.where(totals > 0, weights / np.where(totals > 0, totals, 1.0), uniform)
+
+    def _resample(self, rows):
+        """Systematic resampling of all rows whose effective sample size dropped too low"""
+        weights = self.weights[rows]
+        ess = 1.0 / (weights ** 2).sum(axis=1)
+        rows = rows[ess < self.resample_threshold * self.num_particles]
+        if len(rows) == 0:
+            return
+
+        num_rows, n = len(rows), self.num_particles
+        cum = np.cumsum(self.weights[rows], axis=1)
+        cum[:, -1] = 1.0
+        offsets = np.arange(num_rows)[:, None]
+        positions = (self.rng.random((num_rows, 1)) + np.arange(n)[None, :]) / n
+        idx = np.searchsorted((cum + offsets).ravel(), (positions + offsets).ravel())
+        idx = np.minimum(idx.reshape(num_rows, n) - offsets * n, n - 1)
+
+        row_idx = rows[:, None]
+        self.tasks[rows] = self.tasks[row_idx, idx]
+        self.stages[rows] = self.stages[row_idx, idx]
+        self.targets[rows] = self.targets[row_idx, idx]
+        self.weights[rows] = 1.0 / n
+
+    def _update(self, human_ids):
+        human_ids = [h for h in human_ids if h in self.human_rows]
+        if not human_ids:
+            return
+        rows = np.array([self.human_rows[h] for h in human_ids])
+
+        self._propagate(rows)
+        self._reweight(rows, human_ids)
+
+        # task marginals (before resampling, so they use the fresh weights)
+        num_tasks = len(self.task_ids)
+        flat = (self.tasks[rows] + np.arange(len(rows))[:, None] * num_tasks).ravel()
+        marginals = np.bincount(flat, weights=self.weights[rows].ravel(),
+                                minlength=len(rows) * num_tasks).reshape(len(rows), num_tasks)
+        for r, human_id in enumerate(human_ids):
+            task_probs = self.recognizer.task_probabilities[human_id]
+            for task_id in task_probs:
+                task_probs[task_id] = float(marginals[r, self.task_index[task_id]])
+
+        self._resample(rows)
+
+    def get_target_probabilities(self, human_id) -> Dict[str, float]:
+        """Return the particle estimate of the human's current movement target"""
+        row = self.human_rows.get(human_id)
+        if row is None:
+            return {}
+        valid = self.targets[row] >= 0
+        counts = np.bincount(self.targets[row][valid], weights=self.weights[row][valid],
+                             minlength=len(self.entity_ids))
+        total = counts.sum()
+        if total <= 0:
+            return {}
+        return {self.entity_ids[e]: float(counts[e] / total) for e in np.nonzero(counts)[0]}
+
+
+# ==============================================
+# registry
+# ==============================================
+
+RECOGNITION_ENGINES = {
+    BayesianEngine.name: BayesianEngine,
+    HMMEngine.name: HMMEngine,
+    ParticleFilterEngine.name: ParticleFilterEngine,
+}
+
+
+def make_recognition_engine(recognizer, recognition_params=None) -> RecognitionEngine:
+    """Create the engine selected in recognition_params (see config/recognition_param_config.py)"""
+    recognition_params = recognition_params or {}
+    name = recognition_params.get("engine", BayesianEngine.name)
+    if name not in RECOGNITION_ENGINES:
+        raise ValueError(f"Unknown recognition engine: {name}. "
+                         f"Available engines: {list(RECOGNITION_ENGINES)}")
+    engine_kwargs = recognition_params.get(name, {})
+    return RECOGNITION_ENGINES[name](recognizer, **engine_kwargs)
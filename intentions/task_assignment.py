@@ -1,32 +1,193 @@
 # task_assignment.py
 
-import random
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
 from intentions.factory_intentions import TaskIntention, TaskType, State, Predicate, TaskOrigin
 
+
+# operator groups and the shelf side each one serves
+OPERATOR_GROUPS = (("humans", "right"), ("robots", "left"))
+
+
 def assign_tasks_to_operators(model):
     """Assign tasks to operators from the task library"""
-    assign_tasks_to_operator_group(model, model.humans.values(), "right")
-    assign_tasks_to_operator_group(model, model.robots.values(), "left")
-
-def assign_tasks_to_operator_group(model, operators, side):
-    """Assign tasks to a group of operators based on side"""
-    # Get all tasks from the task library for this side
-    side_tasks = []
-    for task_id, task in model.task_library.tasks[TaskOrigin.ASSIGNED].items():
-        item_id = task.parameters.get('item_id')
-        if item_id and model.items[item_id].init_shelf_id and model.shelves[model.items[item_id].init_shelf_id].side == side:
-            side_tasks.append(task)
-    
-    # Assign tasks to operators
-    for operator in operators:
-        # Select random subset of tasks (up to 3)
-        if side_tasks:
-            assigned_tasks = random.sample(side_tasks, min(3, len(side_tasks)))
-            for task in assigned_tasks:
-                # Create a copy of the task with the specific operator assigned
-                operator_task = create_item_delivery_task(operator, model.items[task.parameters['item_id']])
-                operator.assigned_taskIntentions.add(operator_task)
-                print(f"Assigned {task.parameters['item_id']} to {operator.unique_id}")
+    model.task_allocator.allocate_all()
+
+
+def hungarian(cost: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Minimum-cost assignment (Hungarian algorithm, shortest augmenting paths with potentials).
+
+    Works on rectangular matrices: every row is matched when rows <= cols, every column
+    otherwise. Returns the (row, col) pairs. O(n^2 m) for n = min(rows, cols).
+    """
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        return []
+
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    match = np.zeros(m + 1, dtype=int)     # match[j] = row (1-based) assigned to column j, 0 if free
+    way = np.zeros(m + 1, dtype=int)
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = match[j0]
+            free = ~used
+            free[0] = False
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            better = free[1:] & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+
+            j1 = int(np.argmin(np.where(free, minv, np.inf)))
+            delta = minv[j1]
+            u[match[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        # augment along the alternating path
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+
+    pairs = [(int(match[j]) - 1, j - 1) for j in range(1, m + 1) if match[j]]
+    if transposed:
+        pairs = [(col, row) for row, col in pairs]
+    return sorted(pairs)
+
+
+class TaskAllocator:
+    """
+    Optimal allocation of the delivery tasks of a side to its operator group.
+
+    Each operator has `capacity` slots (the task in progress takes the first one). The
+    cost of putting a task in slot k of an operator is the route length of the trip
+    (operator -> item -> kitting table, from the kitting table for k > 0) weighted by
+    (capacity - k): the classic flow-time assignment, so the solution minimises the sum
+    of delivery completion times and spreads the work over the group instead of stacking
+    it on the closest operator. The assignment is solved with the Hungarian algorithm;
+    it is re-solved for the pending tasks whenever a task of the side completes.
+    """
+
+    def __init__(self, model, capacity: int = 3, reallocate_on_completion: bool = True,
+                 seconds_per_step: float = 1.0):
+        self.model = model
+        self.capacity = capacity
+        self.reallocate_on_completion = reallocate_on_completion
+        self.seconds_per_step = seconds_per_step
+
+        self._route_lengths: Dict[tuple, float] = {}
+        # item_id -> its ASSIGNED task (the library is fixed after its initialization)
+        self._item_tasks: Dict[str, TaskIntention] = {
+            task.parameters.get('item_id'): task
+            for task in model.task_library.tasks[TaskOrigin.ASSIGNED].values()}
+        self.completed: List[Tuple[int, str, str]] = []    # (step, agent_id, task_id)
+        self.allocations = 0
+
+    # ------------------------------------------------
+    # costs
+    # ------------------------------------------------
+    def route_length(self, start, goal) -> float:
+        """Length of the planned route (straight line if no route is found)"""
+        key = (tuple(int(c) for c in start), tuple(int(c) for c in goal))
+        if key not in self._route_lengths:
+            planner = getattr(self.model, 'route_cache', None) or getattr(self.model, 'path_planner', None)
+            waypoints = planner.plan(start, goal) if planner else None
+            if not waypoints:
+                waypoints = [start, goal]
+            self._route_lengths[key] = sum(math.dist(a, b) for a, b in zip(waypoints, waypoints[1:]))
+        return self._route_lengths[key]
+
+    def trip_cost(self, start, item) -> float:
+        kitting_table = self.model.kitting_table.pos
+        return self.route_length(start, item.pos) + self.route_length(item.pos, kitting_table)
+
+    # ------------------------------------------------
+    # allocation
+    # ------------------------------------------------
+    def allocate_all(self):
+        for group, side in OPERATOR_GROUPS:
+            self.allocate(list(getattr(self.model, group).values()), side)
+
+    def pending_items(self, side: str, operators) -> List[str]:
+        """Items of the side still on their shelves and not being delivered by anyone"""
+        in_progress = {op.executor.current_task.parameters.get('item_id')
+                       for op in operators if op.executor.current_task}
+        return [item_id for item_id, item in self.model.items.items()
+                if item.side == side and item_id not in in_progress
+                and item.holder is not None and item.holder.unique_id in self.model.shelves
+                and item_id in self._item_tasks]
+
+    def allocate(self, operators, side: str):
+        """Solve the assignment of the pending tasks of a side to the operators' free slots"""
+        if not operators:
+            return
+        items = self.pending_items(side, operators)
+
+        # rows: free slots (operator, slot index)
+        slots = []
+        for op in operators:
+            first = 1 if op.executor.current_task else 0
+            slots.extend((op, k) for k in range(first, self.capacity))
+
+        cost = np.empty((len(slots), len(items)))
+        kitting_table = self.model.kitting_table.pos
+        for r, (op, k) in enumerate(slots):
+            start = op.pos if k == 0 else kitting_table
+            for c, item_id in enumerate(items):
+                cost[r, c] = (self.capacity - k) * self.trip_cost(start, self.model.items[item_id])
+
+        assigned = {op.unique_id: [] for op in operators}
+        for r, c in hungarian(cost):
+            op, k = slots[r]
+            assigned[op.unique_id].append((k, items[c]))
+
+        for op in operators:
+            current = op.executor.current_task
+            tasks = {current} if current else set()
+            for k, item_id in sorted(assigned[op.unique_id]):
+                task = create_item_delivery_task(op, self.model.items[item_id])
+                task.parameters["slot"] = k
+                tasks.add(task)
+            op.assigned_taskIntentions = tasks
+            self.model.schedule.wake(op)    # event-driven schedulers let idle operators sleep
+            self.model.tracer.info("allocation.assigned", "Assigned {items} to {agent}",
+                                   items=[item_id for _, item_id in sorted(assigned[op.unique_id])], agent=op.unique_id)
+        self.allocations += 1
+
+    def on_task_completed(self, operator, task: TaskIntention):
+        """Executor hook: record the delivery and re-solve the operator's side"""
+        self.completed.append((self.model.schedule.steps, operator.unique_id, task.parameters.get('task_id')))
+        if not self.reallocate_on_completion:
+            return
+        for group, side in OPERATOR_GROUPS:
+            operators = getattr(self.model, group)
+            if operator.unique_id in operators:
+                self.allocate(list(operators.values()), side)
+
+    # ------------------------------------------------
+    # metrics
+    # ------------------------------------------------
+    def throughput(self) -> float:
+        """Completed tasks per simulated hour"""
+        hours = self.model.schedule.steps * self.seconds_per_step / 3600
+        return len(self.completed) / hours if hours else 0.0
+
 
 def create_item_delivery_task(operator, item):
     """Create a delivery task for a specific operator and item"""
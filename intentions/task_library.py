@@ -39,7 +39,7 @@ class TaskLibrary:
     def initialize_action_sequences(self, planner=None):
         """Initialize the expected action sequence for each task using the planner"""
         if not hasattr(self.model, 'state_manager'):
-            print("State manager not available yet")
+            self.model.tracer.warning("task_library.no_state", "State manager not available yet")
             return False
             
         world_state = self.model.state_manager.get_state()
@@ -54,7 +54,7 @@ class TaskLibrary:
                     break
         
         if not self.planner:
-            print("No planner available for task action sequences")
+            self.model.tracer.warning("task_library.no_planner", "No planner available for task action sequences")
             return False
         
         # For each task in the system, use planner to determine action sequence
@@ -69,7 +69,8 @@ class TaskLibrary:
                     for action in action_sequence
                 ]
                 
-        print(f"Initialized action sequences for {len(self.task_action_sequences)} tasks")
+        self.model.tracer.info("task_library.initialized", "Initialized action sequences for {tasks} tasks",
+                               tasks=len(self.task_action_sequences))
         return True
                 
     
@@ -1323,6 +1323,15 @@ class ContinuousSpace:
 
     The concept of 'empty cells' is not directly applicable in continuous space,
     as positions are not discretized.
+
+    If cell_size is given, agents are also bucketed in a uniform grid of that
+    cell size (a spatial hash kept up to date by place/move/remove), so that
+    get_neighbors only looks at the buckets overlapping the query radius.
+
+    An agent can be attached to another one (e.g. a carried item to its carrier):
+    it then sits wherever its parent is, without being moved itself. Its position
+    is resolved from the parent when read: its pos must be derived from its
+    `parent` attribute (see objects.factory_objects.PassiveAgent).
     """
 
     def __init__(
@@ -1332,6 +1341,7 @@ class ContinuousSpace:
         torus: bool,
         x_min: float = 0,
         y_min: float = 0,
+        cell_size: float | None = None,
     ) -> None:
         """Create a new continuous space.
 
@@ -1341,6 +1351,9 @@ class ContinuousSpace:
             x_min, y_min: (default 0) If provided, set the minimum x and y
                           coordinates for the space. Below them, values loop to
                           the other edge (if torus=True) or raise an exception.
+            cell_size: (default None) Bucket size of the spatial hash used by
+                       get_neighbors and get_neighbors_batch; None scans all
+                       agents on every query.
         """
         self.x_min = x_min
         self.x_max = x_max
@@ -1354,9 +1367,37 @@ class ContinuousSpace:
 
 
         # FloatCoordinate = tuple[float, float] | npt.NDArray[np.float64]
-        # self._agent_points: npt.NDArray[FloatCoordinate] | None = None
+        self._agent_points: npt.NDArray[FloatCoordinate] | None = None
         self._index_to_agent: dict[int, Agent] = {}
         self._agent_to_index: dict[Agent, int | None] = {}
+        self._move_listeners: list[Callable] = []
+        self._type_masks: dict[Any, np.ndarray] = {}
+
+        # spatial hash: bucket -> agents (dicts keep the query results in insertion order)
+        self.cell_size = cell_size
+        self._buckets: dict[tuple[int, int], dict[Agent, None]] = {}
+        self._agent_bucket: dict[Agent, tuple[int, int]] = {}
+
+        # attachments: child -> parent, parent -> children
+        self._parent_of: dict[Agent, Agent] = {}
+        self._children_of: dict[Agent, dict[Agent, None]] = {}
+        if cell_size is not None:
+            self._bucket_cols = max(1, math.ceil(self.width / cell_size))
+            self._bucket_rows = max(1, math.ceil(self.height / cell_size))
+
+    def add_move_listener(self, listener: Callable) -> None:
+        """Register listener(agent, old_pos, new_pos), called after every place, move and remove.
+
+        old_pos is None for a newly placed agent, new_pos is None for a removed one.
+        """
+        self._move_listeners.append(listener)
+
+    def remove_move_listener(self, listener: Callable) -> None:
+        self._move_listeners.remove(listener)
+
+    def _notify_move(self, agent: Agent, old_pos, new_pos) -> None:
+        for listener in self._move_listeners:
+            listener(agent, old_pos, new_pos)
 
     def _build_agent_cache(self):
         """Cache agents positions to speed up neighbors calculations."""
@@ -1365,12 +1406,142 @@ class ContinuousSpace:
             self._agent_to_index[agent] = idx
             self._index_to_agent[idx] = agent
         # Since dicts are ordered by insertion, we can iterate through agents keys
-        self._agent_points = np.array([agent.pos for agent in self._agent_to_index])
+        # float even if every position is integral, or later float moves would be truncated
+        self._agent_points = np.array([agent.pos for agent in self._agent_to_index], dtype=float).reshape(-1, 2)
+        self._type_masks = {}
 
     def _invalidate_agent_cache(self):
         """Clear cached data of agents and positions in the space."""
         self._agent_points = None
         self._index_to_agent = {}
+        self._type_masks = {}
+
+    def _type_mask(self, agent_type) -> np.ndarray:
+        """Boolean mask over the cached points of the agents that are instances of agent_type."""
+        mask = self._type_masks.get(agent_type)
+        if mask is None:
+            mask = np.array(
+                [isinstance(self._index_to_agent[i], agent_type) for i in range(len(self._index_to_agent))],
+                dtype=bool,
+            )
+            self._type_masks[agent_type] = mask
+        return mask
+
+    def _bucket_of(self, pos: FloatCoordinate) -> tuple[int, int]:
+        return (
+            int((pos[0] - self.x_min) // self.cell_size),
+            int((pos[1] - self.y_min) // self.cell_size),
+        )
+
+    def _hash_insert(self, agent: Agent, pos: FloatCoordinate) -> None:
+        bucket = self._bucket_of(pos)
+        self._buckets.setdefault(bucket, {})[agent] = None
+        self._agent_bucket[agent] = bucket
+
+    def _hash_remove(self, agent: Agent) -> None:
+        bucket = self._agent_bucket.pop(agent)
+        members = self._buckets[bucket]
+        del members[agent]
+        if not members:
+            del self._buckets[bucket]
+
+    def _bucket_span(self, center: float, radius: float, origin: float, extent: float, count: int):
+        """Bucket indices along one axis covering [center - radius, center + radius].
+
+        On a torus the interval is wrapped in real coordinates, not in bucket
+        indices, since the last bucket is partial when cell_size does not divide
+        the extent.
+        """
+        lo, hi = center - radius, center + radius
+        if not self.torus:
+            return range(int((lo - origin) // self.cell_size), int((hi - origin) // self.cell_size) + 1)
+        if hi - lo >= extent:
+            return range(count)
+        spans = [(max(lo, origin), min(hi, origin + extent))]
+        if lo < origin:
+            spans.append((lo + extent, origin + extent))
+        if hi >= origin + extent:
+            spans.append((origin, hi - extent))
+        buckets = set()
+        for a, b in spans:
+            if a <= b:
+                buckets.update(range(int((a - origin) // self.cell_size), int((b - origin) // self.cell_size) + 1))
+        return sorted(bucket for bucket in buckets if bucket < count)
+
+    def _hash_candidates(self, pos: FloatCoordinate, radius: float) -> Iterator[Agent]:
+        """Agents in the buckets overlapping the square around pos."""
+        xs = self._bucket_span(pos[0], radius, self.x_min, self.width, self._bucket_cols)
+        ys = self._bucket_span(pos[1], radius, self.y_min, self.height, self._bucket_rows)
+        for x in xs:
+            for y in ys:
+                members = self._buckets.get((x, y))
+                if members:
+                    yield from members
+                    if self._children_of:
+                        for agent in members:
+                            yield from self._children_of.get(agent, ())
+
+    def attach(self, child: Agent, parent: Agent) -> None:
+        """Attach child to parent: from now on child is wherever parent is.
+
+        Moving the parent does not write the child's position; move listeners are
+        notified only of the attachment itself.
+
+        Args:
+            child: Agent that follows. It stays in the space but cannot be moved
+                   until detached.
+            parent: Agent it follows, already placed in the space.
+        """
+        if parent not in self._agent_to_index or child not in self._agent_to_index:
+            raise Exception("Both agents must be placed in the space to attach them")
+        if child in self._parent_of:
+            raise Exception(f"Agent {child.unique_id} is already attached")
+        old_pos = child.pos
+        self._parent_of[child] = parent
+        self._children_of.setdefault(parent, {})[child] = None
+        child.parent = parent
+        if self.cell_size is not None:
+            self._hash_remove(child)
+        if self._move_listeners:
+            self._notify_move(child, old_pos, child.pos)
+
+    def detach(self, child: Agent, pos: FloatCoordinate | None = None) -> None:
+        """Detach child from its parent and leave it at pos (default: where the parent is).
+
+        Args:
+            child: Attached agent.
+            pos: Coordinate tuple where the child is left.
+        """
+        parent = self._parent_of.pop(child)
+        children = self._children_of[parent]
+        del children[child]
+        if not children:
+            del self._children_of[parent]
+        old_pos = child.pos
+        child.parent = None
+        pos = self.torus_adj(parent.pos if pos is None else pos)
+        child.pos = pos
+        if self._agent_points is not None:
+            self._agent_points[self._agent_to_index[child]] = pos
+        if self.cell_size is not None:
+            self._hash_insert(child, pos)
+        if self._move_listeners:
+            self._notify_move(child, old_pos, pos)
+
+    def get_parent(self, agent: Agent) -> Agent | None:
+        """Agent that agent is attached to, if any."""
+        return self._parent_of.get(agent)
+
+    def _resolve_attached(self) -> None:
+        """Copy the parents' cached positions onto their children's rows."""
+        if self._parent_of:
+            children = [self._agent_to_index[child] for child in self._parent_of]
+            parents = [self._agent_to_index[parent] for parent in self._parent_of.values()]
+            self._agent_points[children] = self._agent_points[parents]
+
+    def _check_not_attached(self, agent: Agent) -> None:
+        if agent in self._parent_of:
+            raise Exception(f"Agent {agent.unique_id} is attached to {self._parent_of[agent].unique_id}; detach it first")
 
     @warn_if_agent_has_position_already
     def place_agent(self, agent: Agent, pos: FloatCoordinate) -> None:
@@ -1384,6 +1555,10 @@ class ContinuousSpace:
         self._agent_to_index[agent] = None
         pos = self.torus_adj(pos)
         agent.pos = pos
+        if self.cell_size is not None:
+            self._hash_insert(agent, pos)
+        if self._move_listeners:
+            self._notify_move(agent, None, pos)
 
     def move_agent(self, agent: Agent, pos: FloatCoordinate) -> None:
         """Move an agent from its current position to a new position.
@@ -1392,7 +1567,9 @@ class ContinuousSpace:
             agent: The agent object to move.
             pos: Coordinate tuple to move the agent to.
         """
+        self._check_not_attached(agent)
         pos = self.torus_adj(pos)
+        old_pos = agent.pos
         agent.pos = pos
 
         if self._agent_points is not None:
@@ -1401,6 +1578,96 @@ class ContinuousSpace:
             idx = self._agent_to_index[agent]
             self._agent_points[idx] = pos
 
+        if self.cell_size is not None and self._bucket_of(pos) != self._agent_bucket[agent]:
+            self._hash_remove(agent)
+            self._hash_insert(agent, pos)
+
+        if self._move_listeners:
+            self._notify_move(agent, old_pos, pos)
+
+    def place_agents(
+        self,
+        agents: Sequence[Agent],
+        positions: Sequence[FloatCoordinate] | npt.NDArray[np.float64],
+    ) -> None:
+        """Place several new agents at once.
+
+        Unlike repeated place_agent calls, an existing position cache is extended
+        in place instead of being rebuilt on the next neighborhood lookup.
+
+        Args:
+            agents: Agent objects to place.
+            positions: One coordinate per agent (sequence of tuples or (K, 2) array).
+        """
+        placed = [agent for agent in agents if agent in self._agent_to_index]
+        if placed:
+            raise Exception(f"{', '.join(str(agent.unique_id) for agent in placed)} - already in the space")
+        if len(set(agents)) != len(agents):
+            raise Exception("place_agents() got the same agent more than once")
+        positions = self._adjust_positions(positions)
+        first = len(self._agent_to_index)
+        for agent, pos in zip(agents, positions):
+            if agent.pos is not None:
+                warnings.warn(
+                    f"Agent {agent.unique_id} is being placed with place_agents() "
+                    f"despite already having the position {agent.pos}.",
+                    stacklevel=2,
+                )
+            self._agent_to_index[agent] = None
+            agent.pos = pos
+            if self.cell_size is not None:
+                self._hash_insert(agent, pos)
+
+        if self._agent_points is not None:
+            for idx, agent in enumerate(agents, start=first):
+                self._agent_to_index[agent] = idx
+                self._index_to_agent[idx] = agent
+            self._agent_points = np.vstack(
+                [self._agent_points.reshape(-1, 2), np.asarray(positions, dtype=float).reshape(-1, 2)]
+            )
+            self._type_masks = {}
+
+        if self._move_listeners:
+            for agent, pos in zip(agents, positions):
+                self._notify_move(agent, None, pos)
+
+    def move_agents(
+        self,
+        agents: Sequence[Agent],
+        positions: Sequence[FloatCoordinate] | npt.NDArray[np.float64],
+    ) -> None:
+        """Move several agents at once, with a single write to the position cache.
+
+        Args:
+            agents: Agent objects to move.
+            positions: One coordinate per agent (sequence of tuples or (K, 2) array).
+        """
+        for agent in agents:
+            self._check_not_attached(agent)
+        positions = self._adjust_positions(positions)
+        old_positions = [agent.pos for agent in agents]
+        for agent, pos in zip(agents, positions):
+            agent.pos = pos
+            if self.cell_size is not None and self._bucket_of(pos) != self._agent_bucket[agent]:
+                self._hash_remove(agent)
+                self._hash_insert(agent, pos)
+
+        if self._agent_points is not None and len(agents):
+            idxs = [self._agent_to_index[agent] for agent in agents]
+            self._agent_points[idxs] = np.asarray(positions, dtype=float).reshape(-1, 2)
+
+        if self._move_listeners:
+            for agent, old_pos, pos in zip(agents, old_positions, positions):
+                self._notify_move(agent, old_pos, pos)
+
+    def _adjust_positions(
+        self, positions: Sequence[FloatCoordinate] | npt.NDArray[np.float64]
+    ) -> list[FloatCoordinate]:
+        """Torus-adjust a batch of coordinates; array rows become (x, y) float tuples."""
+        if isinstance(positions, np.ndarray):
+            positions = [(float(x), float(y)) for x, y in positions.reshape(-1, 2)]
+        return [self.torus_adj(pos) for pos in positions]
+
     def remove_agent(self, agent: Agent) -> None:
         """Remove an agent from the space.
 
@@ -1409,13 +1676,27 @@ class ContinuousSpace:
         """
         if agent not in self._agent_to_index:
             raise Exception("Agent does not exist in the space")
+        # children stay where the agent was; an attached agent is detached first
+        for child in list(self._children_of.get(agent, ())):
+            self.detach(child)
+        if agent in self._parent_of:
+            self.detach(agent)
         del self._agent_to_index[agent]
+        if self.cell_size is not None:
+            self._hash_remove(agent)
 
         self._invalidate_agent_cache()
+        old_pos = agent.pos
         agent.pos = None
+        if self._move_listeners:
+            self._notify_move(agent, old_pos, None)
 
     def get_neighbors(
-        self, pos: FloatCoordinate, radius: float, include_center: bool = True
+        self,
+        pos: FloatCoordinate,
+        radius: float,
+        include_center: bool = True,
+        agent_type: type | tuple[type, ...] | None = None,
     ) -> list[Agent]:
         """Get all agents within a certain radius.
 
@@ -1426,19 +1707,73 @@ class ContinuousSpace:
                             coordinates. i.e. if you are searching for the
                             neighbors of a given agent, True will include that
                             agent in the results.
+            agent_type: (default None) Class or tuple of classes; if given, only
+                        instances of them are returned.
         """
+        if self.cell_size is not None:
+            neighbors = []
+            for agent in self._hash_candidates(pos, radius):
+                if agent_type is not None and not isinstance(agent, agent_type):
+                    continue
+                dx = abs(agent.pos[0] - pos[0])
+                dy = abs(agent.pos[1] - pos[1])
+                if self.torus:
+                    dx = min(dx, self.width - dx)
+                    dy = min(dy, self.height - dy)
+                dist = dx * dx + dy * dy
+                if dist <= radius**2 and (include_center or dist > 0):
+                    neighbors.append(agent)
+            return neighbors
+
+        return self.get_neighbors_batch([pos], radius, include_center, agent_type)[0]
+
+    def get_neighbors_batch(
+        self,
+        centers: Sequence[FloatCoordinate] | npt.NDArray[np.float64],
+        radius: float,
+        include_center: bool = True,
+        agent_type: type | tuple[type, ...] | None = None,
+    ) -> list[list[Agent]]:
+        """Get the agents within radius of each of several centers in one vectorized pass.
+
+        Args:
+            centers: Sequence (or (M, 2) array) of coordinates to search around.
+            radius, include_center, agent_type: As in get_neighbors.
+
+        Returns:
+            One list of agents per center, in the same order as centers.
+        """
+        if self.cell_size is not None:
+            # the hash only looks at nearby buckets, cheaper than an (M, N) distance matrix
+            return [
+                self.get_neighbors(center, radius, include_center, agent_type)
+                for center in np.asarray(centers, dtype=float).reshape(-1, 2)
+            ]
         if self._agent_points is None:
             self._build_agent_cache()
+        else:
+            self._resolve_attached()
+        centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+        if not len(self._agent_points):
+            return [[] for _ in range(len(centers))]
 
-        deltas = np.abs(self._agent_points - np.array(pos))
+        if agent_type is None:
+            idx_map = np.arange(len(self._agent_points))
+        else:
+            (idx_map,) = np.nonzero(self._type_mask(agent_type))
+        points = self._agent_points[idx_map]
+
+        deltas = np.abs(points[None, :, :] - centers[:, None, :])
         if self.torus:
             deltas = np.minimum(deltas, self.size - deltas)
-        dists = deltas[:, 0] ** 2 + deltas[:, 1] ** 2
+        dists = deltas[..., 0] ** 2 + deltas[..., 1] ** 2
 
-        (idxs,) = np.where(dists <= radius**2)
-        neighbors = [
-            self._index_to_agent[x] for x in idxs if include_center or dists[x] > 0
-        ]
+        hits = dists <= radius**2
+        if not include_center:
+            hits &= dists > 0
+        neighbors = [[] for _ in range(len(centers))]
+        for row, col in zip(*np.nonzero(hits)):
+            neighbors[row].append(self._index_to_agent[idx_map[col]])
         return neighbors
 
     def get_heading(
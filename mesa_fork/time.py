@@ -25,6 +25,9 @@ Key concepts:
 # Remove this __future__ import once the oldest supported Python is 3.10
 from __future__ import annotations
 
+import heapq
+import itertools
+import math
 import warnings
 from collections import defaultdict
 from collections.abc import Iterable
@@ -45,25 +48,33 @@ class BaseScheduler:
     This scheduler is designed to replicate the behavior of the scheduler in MASON, a multi-agent simulation toolkit.
     It assumes that each agent added has a `step` method which takes no arguments and executes the agent's micro-actions.
 
+    With active_only=True, agents that do not override `Agent.step` (passive objects) are
+    kept aside instead of being activated every step; they stay queryable through the
+    model (and `passive_agents`), and can be activated on demand with `wake`.
+
     Attributes:
         - model (Model): The model instance associated with the scheduler.
         - steps (int): The number of steps the scheduler has taken.
         - time (TimeT): The current time in the simulation. Can be an integer or a float.
+        - active_only (bool): Whether passive agents are skipped when stepping.
 
     Methods:
         - add: Adds an agent to the scheduler.
         - remove: Removes an agent from the scheduler.
+        - wake / sleep: Start / stop activating a passive agent every step.
         - step: Executes a step, which involves activating each agent once.
         - get_agent_count: Returns the number of agents in the scheduler.
         - agents (property): Returns a list of all agent instances.
     """
 
-    def __init__(self, model: Model, agents: Iterable[Agent] | None = None) -> None:
+    def __init__(self, model: Model, agents: Iterable[Agent] | None = None, active_only: bool = False) -> None:
         """Create a new BaseScheduler.
 
         Args:
             model (Model): The model to which the schedule belongs
             agents (Iterable[Agent], None, optional): An iterable of agents who are controlled by the schedule
+            active_only (bool, optional): If True, only activate agents with their own step method
+                                          (and passive agents that were woken up)
 
         """
         self.model = model
@@ -71,11 +82,15 @@ class BaseScheduler:
         self.time: TimeT = 0
         self._original_step = self.step
         self.step = self._wrapped_step
+        self.active_only = active_only
 
         if agents is None:
             agents = []
 
-        self._agents: AgentSet = AgentSet(agents, model)
+        self._agents: AgentSet = AgentSet([], model)
+        self._passive: AgentSet = AgentSet([], model)
+        for agent in agents:
+            self.add(agent)
 
         self._remove_warning_given = False
         self._agents_key_warning_given = False
@@ -88,10 +103,29 @@ class BaseScheduler:
             have a step() method.
         """
 
-        if agent not in self._agents:
-            self._agents.add(agent)
-        else:
+        if agent in self._agents or agent in self._passive:
             raise ValueError("agent already added to scheduler")
+        if self.active_only and not self.has_behaviour(agent):
+            self._passive.add(agent)
+        else:
+            self._agents.add(agent)
+
+    @staticmethod
+    def has_behaviour(agent: Agent) -> bool:
+        """Whether the agent overrides the no-op Agent.step"""
+        return type(agent).step is not Agent.step
+
+    def wake(self, agent: Agent) -> None:
+        """Activate a passive agent every step (until `sleep`)"""
+        if agent in self._passive:
+            self._passive.remove(agent)
+            self._agents.add(agent)
+
+    def sleep(self, agent: Agent) -> None:
+        """Stop activating an agent without behaviour (woken up earlier)"""
+        if self.active_only and agent in self._agents and not self.has_behaviour(agent):
+            self._agents.remove(agent)
+            self._passive.add(agent)
 
     def remove(self, agent: Agent) -> None:
         """Remove all instances of a given agent from the schedule.
@@ -103,7 +137,10 @@ class BaseScheduler:
         Args:
             agent: An agent object.
         """
-        self._agents.remove(agent)
+        if agent in self._passive:
+            self._passive.remove(agent)
+        else:
+            self._agents.remove(agent)
 
     def step(self) -> None:
         """Execute the step of all the agents, one at a time."""
@@ -127,6 +164,11 @@ class BaseScheduler:
         # a bit dirty, but returns a copy of the internal agent set
         return self._agents.select()
 
+    @property
+    def passive_agents(self) -> AgentSet:
+        """Agents added to the schedule but not activated (active_only)"""
+        return self._passive.select()
+
     def get_agent_keys(self, shuffle: bool = False) -> list[int]:
         # To be able to remove and/or add agents during stepping
         # it's necessary to cast the keys view to a list.
@@ -233,6 +275,7 @@ class StagedActivation(BaseScheduler):
         stage_list: list[str] | None = None,
         shuffle: bool = False,
         shuffle_between_stages: bool = False,
+        active_only: bool = False,
     ) -> None:
         """Create an empty Staged Activation schedule.
 
@@ -245,8 +288,9 @@ class StagedActivation(BaseScheduler):
             shuffle_between_stages (bool, optional): If True, shuffle the agents after each
                                     stage; otherwise, only shuffle at the start
                                     of each step.
+            active_only (bool, optional): If True, only activate agents with their own step method
         """
-        super().__init__(model, agents)
+        super().__init__(model, agents, active_only=active_only)
         self.stage_list = stage_list if stage_list else ["step"]
         self.shuffle = shuffle
         self.shuffle_between_stages = shuffle_between_stages
@@ -389,18 +433,120 @@ class RandomActivationByType(BaseScheduler):
 
 class DiscreteEventScheduler(BaseScheduler):
     """
-    This class has been deprecated and replaced by the functionality provided by experimental.devs
+    A scheduler that activates agents at the times of their scheduled events, kept in a
+    priority queue, instead of activating every agent every step.
+
+    After each activation the agent's next event is taken from its optional
+    `next_event_delay()` method: a number of time steps until it has something to do
+    again, or None to sleep until `wake` (or `schedule_event`) is called. Agents without
+    that method are activated every step. It is not asked if the agent was already
+    rescheduled during its own activation. When `wake` or `schedule_event` moves an
+    agent's event, its optional `truncate_skip(step)` method is told the step of the new
+    activation, so it only catches up on the steps actually skipped. `step` still advances one time_step, so step
+    based consumers (UI, data collection) keep working; `skip_idle` jumps over steps in
+    which no event is due.
+
+    Attributes:
+        - time_step (TimeT): The time advanced by one step.
+        - event_driven (bool): Marks schedulers whose agents are not activated every step.
+
+    Methods:
+        - schedule_event: (Re)schedules the next activation of an agent.
+        - wake: Activates an agent at the current time.
+        - next_event_time: Time of the earliest scheduled event (None if all agents sleep).
+        - skip_idle: Advances over the steps before the next event without activating anyone.
     """
 
-    def __init__(self, model: Model, time_step: TimeT = 1) -> None:
+    event_driven = True
+
+    def __init__(self, model: Model, time_step: TimeT = 1, active_only: bool = False) -> None:
         """
 
         Args:
             model (Model): The model to which the schedule belongs
             time_step (TimeT): The fixed time step between steps
+            active_only (bool, optional): If True, only activate agents with their own step method
 
         """
-        super().__init__(model)
-        raise Exception(
-            "DiscreteEventScheduler is deprecated in favor of the functionality provided by experimental.devs"
-        )
+        self.event_queue: list = []                 # heap of (time, seq, agent)
+        self._scheduled: dict = {}                  # agent -> time of its live event (lazy deletion)
+        self._sequence = itertools.count()
+        super().__init__(model, active_only=active_only)
+        self.time_step = time_step
+        self.activations = 0
+        self._wake_time: TimeT | None = None      # set while a step is activating agents
+
+    def add(self, agent: Agent) -> None:
+        super().add(agent)
+        if agent in self._agents:
+            self.schedule_event(self.time, agent)
+
+    def remove(self, agent: Agent) -> None:
+        super().remove(agent)
+        self._scheduled.pop(agent, None)
+
+    def schedule_event(self, time: TimeT, agent: Agent) -> None:
+        """Activate the agent at the given time (replaces its pending event)"""
+        if time < self.time:
+            raise ValueError(f"cannot schedule an event in the past ({time} < {self.time})")
+        if hasattr(agent, "truncate_skip"):
+            agent.truncate_skip(self.steps + round((time - self.time) / self.time_step))
+        self._push(time, agent)
+
+    def _push(self, time: TimeT, agent: Agent) -> None:
+        self._scheduled[agent] = time
+        heapq.heappush(self.event_queue, (time, next(self._sequence), agent))
+
+    def wake(self, agent: Agent) -> None:
+        """Activate the agent as soon as possible (the next step if called during a step)"""
+        super().wake(agent)
+        time = self.time if self._wake_time is None else self._wake_time
+        if agent in self._agents and self._scheduled.get(agent, math.inf) > time:
+            self.schedule_event(time, agent)
+
+    def _top(self):
+        """Drop superseded events and return the live head of the queue, or None"""
+        while self.event_queue:
+            time, _, agent = self.event_queue[0]
+            if self._scheduled.get(agent) == time:
+                return self.event_queue[0]
+            heapq.heappop(self.event_queue)
+        return None
+
+    def next_event_time(self) -> TimeT | None:
+        top = self._top()
+        return None if top is None else top[0]
+
+    def step(self) -> None:
+        """Activate the agents whose events are due in this step, then advance one time_step"""
+        end = self.time + self.time_step
+        self._wake_time = end
+        while True:
+            top = self._top()
+            if top is None or top[0] >= end:
+                break
+            heapq.heappop(self.event_queue)
+            agent = top[2]
+            del self._scheduled[agent]
+            agent.step()
+            self.activations += 1
+
+            if agent in self._scheduled:
+                continue    # woken during its own activation: the next event is already set
+            next_delay = agent.next_event_delay() if hasattr(agent, "next_event_delay") else 1
+            if next_delay is not None:
+                self._push(self.time + max(1, next_delay) * self.time_step, agent)
+        self._wake_time = None
+        self.steps += 1
+        self.time = end
+
+    def skip_idle(self, max_steps: int) -> int:
+        """Advance (at most max_steps) over the steps before the next event; returns the steps skipped"""
+        next_time = self.next_event_time()
+        idle = max_steps if next_time is None else int((next_time - self.time) // self.time_step)
+        idle = max(0, min(idle, max_steps))
+        self.steps += idle
+        self.time += idle * self.time_step
+        self.model._steps += idle
+        self.model._time += idle * self.time_step
+        return idle
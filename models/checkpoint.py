@@ -0,0 +1,92 @@
+import io
+import pickle
+import random
+import struct
+import time
+import zlib
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+
+'''
+Model checkpoints
+
+A checkpoint is the whole FactoryModel (space, operators with their executor queues,
+item holders, task assignments, recognizer beliefs, the model RNG) plus the global
+python / numpy RNG states, pickled and zlib-compressed behind a small versioned header:
+
+    MAGIC (4 bytes) | format version (uint16) | zlib(pickle(payload))
+
+Checkpoints written by an older format version are upgraded on load by the MIGRATIONS
+chain (one function per version step, applied to the unpickled payload), and classes
+moved or renamed since are redirected through MOVED_CLASSES.
+'''
+
+MAGIC = b"FMCK"
+CHECKPOINT_VERSION = 1
+_HEADER = struct.Struct(">4sH")
+
+
+# version -> function upgrading a payload of that version to version + 1
+MIGRATIONS: Dict[int, Callable[[Dict], Dict]] = {}
+
+# (old module, old name) -> (new module, new name) of classes moved since a checkpoint was written
+MOVED_CLASSES: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+
+class CheckpointError(Exception):
+    pass
+
+
+class _Unpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        module, name = MOVED_CLASSES.get((module, name), (module, name))
+        return super().find_class(module, name)
+
+
+def dumps(model, level: int = 6) -> bytes:
+    payload = {
+        "step": model.schedule.steps,
+        "created": time.time(),
+        "model": model,
+        "rng": {"python": random.getstate(), "numpy": np.random.get_state()},
+    }
+    body = zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), level)
+    return _HEADER.pack(MAGIC, CHECKPOINT_VERSION) + body
+
+
+def loads(data: bytes, restore_global_rng: bool = True):
+    if len(data) < _HEADER.size:
+        raise CheckpointError("not a model checkpoint (too short)")
+    magic, version = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise CheckpointError("not a model checkpoint (bad magic)")
+    if version > CHECKPOINT_VERSION:
+        raise CheckpointError(f"checkpoint format {version} is newer than this code ({CHECKPOINT_VERSION})")
+
+    payload = _Unpickler(io.BytesIO(zlib.decompress(data[_HEADER.size:]))).load()
+    while version < CHECKPOINT_VERSION:
+        if version not in MIGRATIONS:
+            raise CheckpointError(f"no migration from checkpoint format {version}")
+        payload = MIGRATIONS[version](payload)
+        version += 1
+
+    if restore_global_rng:
+        random.setstate(payload["rng"]["python"])
+        np.random.set_state(payload["rng"]["numpy"])
+    return payload["model"]
+
+
+def save_checkpoint(model, path: str, level: int = 6) -> int:
+    """Write the model to path; returns the checkpoint size in bytes"""
+    data = dumps(model, level)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def load_checkpoint(path: str, restore_global_rng: bool = True):
+    """Read a model back from a checkpoint file"""
+    with open(path, "rb") as f:
+        return loads(f.read(), restore_global_rng)
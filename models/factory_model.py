@@ -1,3 +1,4 @@
+import copy
 import time
 import cProfile
 import logging
@@ -18,13 +19,25 @@ from typing import List, Union, Optional
 import config.factory_param_config as fc_config
 # from models.base_model import BaseModel 
 from actors.factory_operators import Robot, Human
+from actors.operator_registry import OperatorRegistry
 from objects.factory_objects import ACSwitch, CoffeeMachine, Item, Shelf, KittingTable, Door
+from objects.holder_index import HolderIndex
+from planning.path_planner import OccupancyGrid, PathPlanner
+from planning.route_cache import RouteCache
+from planning.incremental_planner import DynamicCostMap
+from planning.multi_agent_planner import MultiAgentPlanner
+from planning.strips import StripsDomain, StripsPlanner
+from execution.fast_forward import FastForward
+from execution.motion_model import KinematicMotionModel
+from models.staged_scheduler import StagedFactoryScheduler
+from models import checkpoint
+from tracing.tracer import Tracer, make_tracer
 from intentions.state_representation import State, Predicate, Fluent
 from intentions.factory_intentions import  TaskIntention, TaskOrigin, ActionIntention
 # from intentions.intention_planner import IntentionPlanner
 # from intentions.execution_planner import ExecutionPlanner
 from intentions.state_representation import State, Predicate
-from intentions.task_assignment import assign_tasks_to_operators 
+from intentions.task_assignment import assign_tasks_to_operators, TaskAllocator
 
 from intentions.task_library import TaskLibrary
 
@@ -32,6 +45,19 @@ from state.world_state_manager import WorldStateManager
 # logging.basicConfig(level=logging.DEBUG)
 
 
+# data collector reporters (module level, so the model stays picklable for checkpoints)
+def report_step(model):
+    return model.schedule.steps
+
+
+def report_throughput(model):
+    return model.task_allocator.throughput()
+
+
+def report_position(agent):
+    return agent.pos
+
+
 
 class FactoryModel(Model):   
     # not  BaseModel for now
@@ -47,6 +73,11 @@ class FactoryModel(Model):
                  robots_params,
                  humans_params,
                  mytext_params,
+                 recognition_params=None,
+                 planning_params=None,
+                 allocation_params=None,
+                 scheduling_params=None,
+                 tracing_params=None,
                  ):
         super().__init__()
         
@@ -57,6 +88,21 @@ class FactoryModel(Model):
         self.current_id = 0
         self.mytext = mytext_params
 
+        # intention recognition settings used by the robots (engine selection, engine parameters)
+        self.recognition_params = recognition_params or {}
+
+        # motion planning settings (occupancy grid resolution, operator avoidance)
+        self.planning_params = planning_params or {}
+
+        # task allocation settings (operator capacity, reallocation, simulated time per step)
+        self.allocation_params = allocation_params or {}
+
+        # scheduler selection (sequential or staged perceive/decide/commit)
+        self.scheduling_params = scheduling_params or {}
+
+        # trace level and sink of the simulation's events (stdout, nothing, ring buffer, JSONL file)
+        self.tracing_params = tracing_params or {}
+
         # self.grid = Grid(width, height)  # Use our custom Grid
         
         # TODO: I still call it grid since in other files it is model.grid. but later contSpace is a better name
@@ -65,7 +111,8 @@ class FactoryModel(Model):
             y_max=height,
             torus=False,  # Your factory has walls, not wraparound
             x_min=0,
-            y_min=0
+            y_min=0,
+            cell_size=self.planning_params.get("spatial_hash_cell_size")
         )   
                 
         # TODO: check which scheduler to use 
@@ -73,8 +120,16 @@ class FactoryModel(Model):
         
         
         self.schedule = mesa_fork.time.SimultaneousActivation(self)
-        self.schedule = mesa_fork.time.BaseScheduler(self)      
+        # passive objects (doors, shelves, items, ...) have no behaviour: only operators are stepped
+        self.schedule = mesa_fork.time.BaseScheduler(self, active_only=True)
+        if self.scheduling_params.get("scheduler", "base") == "event":
+            # operators are activated only at their next meaningful event (see Executor.next_event_delay)
+            self.schedule = mesa_fork.time.DiscreteEventScheduler(self, active_only=True)
+        elif self.scheduling_params.get("scheduler", "base") == "staged":
+            self.schedule = StagedFactoryScheduler(self)
 
+        # components report through model.tracer instead of printing
+        self.tracer = make_tracer(self.tracing_params, model=self)
 
         # Initialize environment components
         self.init_doors(doors_params)
@@ -83,15 +138,21 @@ class FactoryModel(Model):
         self.init_items(items_params)
         self.init_coffee_machines(coffee_machines_params)
         self.init_ac_switches(ac_switches_params)
+        self.init_holder_index()
+        self.init_path_planner()
+        self.init_symbolic_planner()
 
         # Initialize task library
         self.task_library = TaskLibrary(self)
 
         
         # Initialize agents
+        # operator state (positions, carried items, tasks) is stored column-wise in the registry
+        self.operator_registry = OperatorRegistry()
         # TODO: ensure human is initialized before robot
         self.init_humans(humans_params)
         self.init_robots(robots_params)
+        self.init_motion_model()
 
         
         # --------------------------------------------------------------
@@ -109,18 +170,19 @@ class FactoryModel(Model):
         # --------------------------------------------------------------
         # Assign tasks to operators after all initializations
         # --------------------------------------------------------------
+        self.init_task_allocator()
         assign_tasks_to_operators(self)
         # print_assigned_taskIntentions(self)
 
+        # skips ticks in which operators only walk (run_steps(..., fast_forward=True))
+        self.fast_forward = FastForward(self)
+
 
         # --------------------------------------------------------------
         # set up collector for visualization
         # --------------------------------------------------------------
         # logging.debug("Setting up datacollector")
-        self.datacollector = DataCollector(
-            model_reporters={"Step": lambda m: m.schedule.steps},
-            agent_reporters={"Position": lambda a: a.pos}
-        )
+        self.datacollector = self._new_datacollector()
 
 
 
@@ -131,7 +193,7 @@ class FactoryModel(Model):
 
     def step(self):
         """Single step of simulation"""
-        print("="*50+f"starting step {self.schedule.steps}")
+        self.tracer.debug("model.step", "=" * 50 + "starting step {step}", step=self.schedule.steps)
 
 
         # Update state before step
@@ -139,6 +201,10 @@ class FactoryModel(Model):
         
         # Execute step - operators will handle their own planning/execution
         self.schedule.step()
+
+        # kinematic motion: move all operators toward their steered waypoints at once
+        if self.motion_model is not None:
+            self.motion_model.integrate()
         
         # Update state after step
         self.state_manager.update()
@@ -147,6 +213,96 @@ class FactoryModel(Model):
         self.datacollector.collect(self)
         # logging.debug(f"finished step {self.schedule.steps}"+"-"*50)
 
+    @staticmethod
+    def _new_datacollector() -> DataCollector:
+        return DataCollector(
+            model_reporters={"Step": report_step,
+                             "Throughput": report_throughput},
+            agent_reporters={"Position": report_position}
+        )
+
+    def fork(self, seed=None) -> 'FactoryModel':
+        """
+        Lightweight clone for what-if rollouts.
+
+        The static layout (doors, coffee machines, AC switches, occupancy grid and
+        planners), the task library and the static predicates are shared with this
+        model; operators, items, holders, executors and recognizer beliefs are copied,
+        so stepping the clone never touches the live model. The planners' caches
+        (routes, STRIPS plans) are shared too, since their entries only depend on the
+        layout, but each clone counts its own stats. The clone starts with an empty
+        data collector and a silent tracer at the same level (set_sink gives it a sink
+        of its own); seed reseeds its RNG for stochastic continuations.
+        """
+        memo = {id(obj): obj for obj in self._static_objects()}
+        memo[id(self.datacollector)] = self._new_datacollector()
+        memo[id(self.tracer)] = Tracer(self.tracer.level)
+        self._fork_planner_stats(memo)
+        clone = copy.deepcopy(self, memo)
+        clone.tracer.model = clone
+        if seed is not None:
+            clone.reset_randomizer(seed)
+        return clone
+
+    def _fork_planner_stats(self, memo: dict):
+        """Shallow copies of the shared planners: same caches, own counters and last-search stats"""
+        path_planner = memo[id(self.path_planner)] = copy.copy(self.path_planner)
+        memo[id(self.strips_planner)] = copy.copy(self.strips_planner)
+        if self.route_cache is not None:
+            route_cache = memo[id(self.route_cache)] = copy.copy(self.route_cache)
+            route_cache.planner = path_planner
+        if self.fleet_planner is not None:
+            fleet_planner = memo[id(self.fleet_planner)] = copy.copy(self.fleet_planner)
+            fleet_planner.planner = copy.copy(self.fleet_planner.planner)
+
+    def _static_objects(self) -> list:
+        """Objects that never change after initialization (shared by forks)"""
+        static = [self.doors, self.coffee_machines, self.ac_switches,
+                  self.path_planner, self.path_planner.grid, self.route_cache, self.fleet_planner,
+                  self.strips_planner, self.task_library,
+                  self.state_manager.static_predicates, self.state_manager.static_targets,
+                  self.recognition_params, self.planning_params, self.allocation_params, self.scheduling_params,
+                  self.tracing_params]
+        static += list(self.doors.values()) + list(self.coffee_machines.values()) + list(self.ac_switches.values())
+        for tasks in self.task_library.tasks.values():
+            static += list(tasks.values())
+        return [obj for obj in static if obj is not None]
+
+    def save_checkpoint(self, path: str) -> int:
+        """Write the complete model state to a versioned, compressed checkpoint file (see models/checkpoint.py)"""
+        size = checkpoint.save_checkpoint(self, path)
+        self.tracer.info("model.checkpoint", "Saved checkpoint at step {step} to {path} ({size} bytes)",
+                         step=self.schedule.steps, path=path, size=size)
+        return size
+
+    @classmethod
+    def from_checkpoint(cls, path: str) -> 'FactoryModel':
+        """Restore a model saved with save_checkpoint"""
+        model = checkpoint.load_checkpoint(path)
+        if not isinstance(model, cls):
+            raise checkpoint.CheckpointError(f"{path} holds a {type(model).__name__}, not a {cls.__name__}")
+        return model
+
+    def run_steps(self, n: int, fast_forward: bool = False):
+        """Advance n steps; with fast_forward, jump over ticks where operators only walk (headless runs)"""
+        target = self.schedule.steps + n
+        event_driven = getattr(self.schedule, 'event_driven', False)
+        while self.schedule.steps < target:
+            if fast_forward and self.fast_forward.advance(target - self.schedule.steps):
+                continue
+            if event_driven and self.schedule.skip_idle(target - self.schedule.steps):
+                continue    # no operator has an event before the next step
+            self.step()
+
+    def get_entity(self, entity_id: str):
+        """Factory entity (usable object, holder, item or operator) by id, None if unknown"""
+        for entities in (self.coffee_machines, self.ac_switches, self.doors, self.holders, self.items,
+                         self.humans, self.robots):
+            entity = entities.get(entity_id)
+            if entity is not None:
+                return entity
+        return None
+
 
     # Overriding the run_model method from BaseModel
     # def run_model(self):
@@ -216,6 +372,7 @@ class FactoryModel(Model):
         # initialize items
         # logging.debug("Initializing items")
         self.items = {}
+        positions = []
         for item_data in items_params:
             item = Item(unique_id=item_data["unique_id"], 
                         model=self,
@@ -228,12 +385,15 @@ class FactoryModel(Model):
                         )
 
             self.items[item_data["unique_id"]] = item
-            self.grid.place_agent(item, item_data["init_pos"])   #MESA way of filling "pos" property of agents
+            positions.append(item_data["init_pos"])
             self.schedule.add(item)
              
             # UPDATE shelves: add items to shelves
             self.shelves[item_data["init_shelf_id"]].add_item(item)
 
+        # one bulk placement (the space extends its position cache once, not per item)
+        self.grid.place_agents(list(self.items.values()), positions)   #MESA way of filling "pos" property of agents
+
     def init_coffee_machines(self, coffee_machines_params):
         # initialize coffee machines
         # logging.debug("Initializing coffee machines")
@@ -265,6 +425,62 @@ class FactoryModel(Model):
             self.grid.place_agent(ac, ac_data["init_pos"])  #MESA way of filling "pos" property of agents
             self.schedule.add(ac)
 
+    def init_holder_index(self):
+        # every agent that can hold items (shelves, kitting table, future holder types)
+        self.holders = {agent.unique_id: agent for agent in self.agents if hasattr(agent, 'add_item')}
+        self.holder_index = HolderIndex(self.holders.values(),
+                                        cell_size=self.recognition_params.get("release_radius", 100))
+
+    def init_symbolic_planner(self):
+        # STRIPS planner for task types without a hand-written plan template
+        self.strips_planner = StripsPlanner(StripsDomain.from_model(self),
+                                            max_expansions=self.planning_params.get("strips_max_expansions", 2000))
+
+    def init_motion_model(self):
+        # velocity/acceleration-limited motion (opt-in); default is one MOVE_STEP jump per tick
+        self.motion_model = None
+        if self.planning_params.get("kinematic_motion", False):
+            self.motion_model = KinematicMotionModel(self,
+                                                     max_speed=self.planning_params.get("max_speed", 40),
+                                                     max_accel=self.planning_params.get("max_accel", 15))
+
+    def init_task_allocator(self):
+        params = self.allocation_params
+        self.task_allocator = TaskAllocator(
+            self,
+            capacity=params.get("capacity", 3),
+            reallocate_on_completion=params.get("reallocate_on_completion", True),
+            seconds_per_step=params.get("seconds_per_step", 1.0),
+        )
+
+    def init_path_planner(self):
+        # occupancy grid of the static layout, shared by all operators' executors
+        grid = OccupancyGrid.from_model(self, cell_size=self.planning_params.get("cell_size", 25))
+        self.path_planner = PathPlanner(grid)
+
+        # cost of the humans' current and forecast positions, kept up to date by the space
+        self.cost_map = DynamicCostMap(grid,
+                                       forecast_steps=self.planning_params.get("forecast_steps", 3),
+                                       forecast_cost=self.planning_params.get("forecast_cost", 4.0))
+        self.grid.add_move_listener(self.cost_map.on_agent_moved)
+
+        # joint planner for the robot fleet (opt-in)
+        self.fleet_planner = None
+        if self.planning_params.get("fleet_planning", False):
+            self.fleet_planner = MultiAgentPlanner(grid,
+                                                   cell_size=self.planning_params.get("fleet_cell_size", 35),
+                                                   goal_dwell=self.planning_params.get("fleet_goal_dwell", 2),
+                                                   max_expansions=self.planning_params.get("fleet_max_expansions", 20000),
+                                                   time_budget=self.planning_params.get("fleet_time_budget", 0.05),
+                                                   horizon=self.planning_params.get("fleet_horizon", 40))
+
+        # table of routes between landmarks, so repeated trips only plan their short end legs
+        self.route_cache = None
+        if self.planning_params.get("route_cache", True):
+            self.route_cache = RouteCache.from_model(self, self.path_planner,
+                                                     attach_radius=self.planning_params.get("route_attach_radius", 100),
+                                                     precompute=self.planning_params.get("precompute_routes", False))
+
     def init_humans(self, humans_params):
         # Initialize humans
         self.humans = {}
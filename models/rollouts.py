@@ -0,0 +1,190 @@
+import contextlib
+import io
+import os
+import pickle
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from tracing.tracer import Tracer
+
+
+'''
+Monte-Carlo rollouts
+
+RolloutPool runs M stochastic continuations of a FactoryModel's current state for H
+steps each and aggregates their outcomes. Worker processes are pre-warmed once with a
+pickled copy of the model: each worker keeps that copy's static objects (layout,
+planners, task library, ... see FactoryModel._static_objects). Per rollout only the
+dynamic state is shipped: the model is pickled with the static objects replaced by
+persistent ids, which the workers resolve to their own copies.
+
+Continuations differ by seed: the model RNG, the global python/numpy RNGs and the
+recognizers' engine RNGs are reseeded per rollout. The factory itself is deterministic,
+so humans are perturbed: each one pauses a tick with probability hesitation, drawn from
+the reseeded model RNG (hesitation=0 gives M identical rollouts).
+'''
+
+
+# worker-side static objects (index -> object), set by _init_worker
+_STATIC: List = []
+
+
+class _StatePickler(pickle.Pickler):
+    """Pickle a model with its static objects replaced by their index"""
+
+    def __init__(self, file, static_ids: Dict[int, int]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.static_ids = static_ids
+
+    def persistent_id(self, obj):
+        return self.static_ids.get(id(obj))
+
+
+class _StateUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        return _STATIC[pid]
+
+
+def dump_dynamic_state(model) -> bytes:
+    static_ids = {id(obj): idx for idx, obj in enumerate(model._static_objects())}
+    buf = io.BytesIO()
+    _StatePickler(buf, static_ids).dump(model)
+    return buf.getvalue()
+
+
+def _init_worker(template: bytes):
+    global _STATIC
+    with contextlib.redirect_stdout(io.StringIO()):
+        model = pickle.loads(template)
+    _STATIC = model._static_objects()
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def _layout_ids(model) -> List[int]:
+    """ids of the static objects a fork shares as they are (it copies the planners, see FactoryModel.fork)"""
+    planners = {id(model.path_planner), id(model.route_cache), id(model.fleet_planner), id(model.strips_planner)}
+    return [id(obj) for obj in model._static_objects() if id(obj) not in planners]
+
+
+def _reseed(model, seed: int):
+    model.reset_randomizer(seed)
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+    for robot in model.robots.values():
+        engine = getattr(robot.intention_recognition, 'engine', None)
+        if engine is not None and hasattr(engine, 'rng'):
+            engine.rng = np.random.default_rng(model.random.getrandbits(32))
+
+
+def _run_rollout(state: bytes, horizon: int, seed: int, near_distance: float, hesitation: float) -> Dict:
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        model = _StateUnpickler(io.BytesIO(state)).load()
+        return simulate(model, horizon, seed, near_distance, hesitation)
+
+
+def simulate(model, horizon: int, seed: int, near_distance: float = 25, hesitation: float = 0.0) -> Dict:
+    """Run one continuation of model (modified in place) and measure its outcome"""
+    model.tracer = Tracer()     # silent: rollouts do not trace into the live model's sink
+    _reseed(model, seed)
+    for human in model.humans.values():
+        human.hesitation = hesitation
+    start = model.schedule.steps
+    completed_before = len(model.task_allocator.completed)
+    # items of the tasks assigned at the start of the rollout
+    targets = {task.parameters.get('item_id') for op in model.operator_registry.operators
+               for task in op.assigned_taskIntentions}
+    targets.discard(None)
+    kitting_table = np.asarray(model.kitting_table.pos, dtype=float)
+
+    time_to_complete = None
+    near_collisions = 0
+    for _ in range(horizon):
+        model.step()
+        positions = model.operator_registry.positions
+        diff = positions[:, None, :] - positions[None, :, :]
+        close = np.hypot(diff[..., 0], diff[..., 1]) < near_distance
+        at_table = np.all(positions == kitting_table, axis=1)     # shared drop-off point
+        close &= ~(at_table[:, None] | at_table[None, :])
+        near_collisions += int(np.triu(close, k=1).sum())
+        if time_to_complete is None and all(model.items[item_id].holder is model.kitting_table for item_id in targets):
+            time_to_complete = model.schedule.steps - start
+
+    return {
+        "seed": seed,
+        "completed": len(model.task_allocator.completed) - completed_before,
+        "time_to_complete": time_to_complete,
+        "near_collisions": near_collisions,
+    }
+
+
+def aggregate(results: List[Dict], horizon: int) -> Dict:
+    finished = [r["time_to_complete"] for r in results if r["time_to_complete"] is not None]
+    completed = np.array([r["completed"] for r in results], dtype=float)
+    near = np.array([r["near_collisions"] for r in results], dtype=float)
+    return {
+        "rollouts": len(results),
+        "horizon": horizon,
+        "completion_rate": len(finished) / len(results) if results else 0.0,
+        "time_to_complete_mean": float(np.mean(finished)) if finished else None,
+        "time_to_complete_max": int(max(finished)) if finished else None,
+        "completed_mean": float(completed.mean()) if len(completed) else 0.0,
+        "near_collisions_mean": float(near.mean()) if len(near) else 0.0,
+        "near_collisions_max": int(near.max()) if len(near) else 0,
+        "results": results,
+    }
+
+
+class RolloutPool:
+    """
+    Process pool of workers pre-warmed with a model's static layout.
+
+    run() takes that model or a fork of it: the workers resolve the static objects by
+    their position in _static_objects(), so another model is rejected.
+    """
+
+    def __init__(self, model, workers: Optional[int] = None, near_distance: float = 25, hesitation: float = 0.05):
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.near_distance = near_distance
+        self.hesitation = hesitation
+        self._executor = None
+        self._layout = _layout_ids(model)
+        self._static_count = len(model._static_objects())
+        if self.workers > 0:
+            template = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 initializer=_init_worker, initargs=(template,))
+            # workers start lazily on submit: start (and initialize) them all now
+            for future in [self._executor.submit(_ready) for _ in range(self.workers)]:
+                future.result()
+
+    def run(self, model, rollouts: int, horizon: int, seed: int = 0) -> Dict:
+        """Run `rollouts` continuations of model's current state for `horizon` steps; model is not modified"""
+        if _layout_ids(model) != self._layout or len(model._static_objects()) != self._static_count:
+            raise ValueError("RolloutPool.run takes the pool's template model or a fork of it")
+        seeds = [seed + k for k in range(rollouts)]
+        if self._executor is None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = [simulate(model.fork(), horizon, s, self.near_distance, self.hesitation) for s in seeds]
+        else:
+            state = dump_dynamic_state(model)
+            futures = [self._executor.submit(_run_rollout, state, horizon, s, self.near_distance, self.hesitation)
+                       for s in seeds]
+            results = [future.result() for future in futures]
+        return aggregate(results, horizon)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,81 @@
+from typing import Dict, List
+
+from mesa_fork.time import StagedActivation
+from execution.microactions import microactionType
+
+
+class StagedFactoryScheduler(StagedActivation):
+    """
+    Perceive -> decide -> commit activation of the operators.
+
+    1. perceive: every operator observes the same world (nobody has moved yet this
+       tick), so what a robot sees no longer depends on insertion order. The stage is
+       read-only with respect to the world; it runs sequentially, since perception is
+       pure Python and a thread pool only adds overhead under the GIL.
+    2. decide: executors update their plans and pick the micro-action for this tick
+       without applying it. Sequential: planning shares the model's planners, caches
+       and the task allocator.
+    3. commit: the decided micro-actions are applied, humans first, with conflicts
+       resolved on the spot: a move into a spot another operator has just moved into,
+       or a grab of an item someone has just grabbed, waits for the next tick.
+    """
+
+    def __init__(self, model):
+        super().__init__(model, stage_list=["perceive", "decide", "commit"], active_only=True)
+        self.conflicts = 0
+
+    def step(self) -> None:
+        agents = list(self._agents)
+        staged = [agent for agent in agents if hasattr(agent, 'decide')]
+
+        for agent in staged:
+            agent.perceive()
+        self.time += self.stage_time
+
+        for agent in staged:
+            agent.decide()
+        self.time += self.stage_time
+
+        self._commit(staged)
+        for agent in agents:
+            if not hasattr(agent, 'decide'):
+                agent.step()        # woken-up objects without stages
+        self.time += self.stage_time
+
+        self.steps += 1
+
+    # ------------------------------------------------
+    # stages
+    # ------------------------------------------------
+    def _commit(self, agents: List):
+        moved = []          # (pos, size) of the spots taken by moves committed this tick
+        grabbed = set()
+        for agent in sorted(agents, key=lambda a: not getattr(a, 'is_human', False)):
+            m = agent.intended_microaction
+            if m is not None and m.microaction_type == microactionType.MOVE_STEP:
+                spot = (m.parameters['target_pos'], agent.size)
+                if any(_overlaps(spot, other) for other in moved):
+                    self._wait(agent, "move into a spot taken this tick")
+                else:
+                    moved.append(spot)
+            elif m is not None and m.microaction_type == microactionType.GRAB:
+                item_id = m.parameters.get('item_id')
+                if item_id in grabbed:
+                    self._wait(agent, f"{item_id} grabbed by someone else this tick")
+                else:
+                    grabbed.add(item_id)
+            agent.commit()
+
+    def _wait(self, agent, reason: str):
+        self.model.tracer.debug("scheduler.wait", "✗ {agent} waits: {reason}", agent=agent.unique_id, reason=reason)
+        agent.intended_microaction = None
+        self.conflicts += 1
+
+    def get_stats(self) -> Dict:
+        return {"conflicts": self.conflicts}
+
+
+def _overlaps(a, b) -> bool:
+    (ax, ay), (aw, ah) = a
+    (bx, by), (bw, bh) = b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
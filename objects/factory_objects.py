@@ -9,6 +9,8 @@ import logging
 
 # parent class for all passive objects in the factory
 class PassiveAgent(Agent):
+    parent = None   # agent it is attached to in the space (ContinuousSpace.attach), e.g. the operator carrying an item
+
     def __init__(self, unique_id: str, model, 
                  size, side, zone):
         super().__init__(unique_id, model)
@@ -21,6 +23,15 @@ class PassiveAgent(Agent):
         self.side = side
         self.zone = zone
 
+    @property
+    def pos(self):
+        """Own position, or the parent's while attached to it"""
+        return self._pos if self.parent is None else self.parent.pos
+
+    @pos.setter
+    def pos(self, value):
+        self._pos = value
+
     def update_pos(self, given_pos):
         self.pos = given_pos
     
@@ -112,6 +123,9 @@ class CoffeeMachine(PassiveAgent):
                  size, side, zone):
         super().__init__(unique_id, model, size, side=side, zone=zone)
 
+    def use(self, operator):
+        operator.has_coffee = True
+
 class ACSwitch(PassiveAgent):
     def __init__(self, unique_id, model, 
                  size, side, zone):
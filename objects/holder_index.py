@@ -0,0 +1,56 @@
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class HolderIndex:
+    """
+    Uniform-grid spatial index over item holders (shelves, kitting tables, ...).
+
+    Holders are bucketed by position into square cells of cell_size pixels. A
+    nearest-holder query within a radius only visits the cells overlapping the
+    query circle, so with cell_size close to the usual radius a lookup touches
+    3x3 buckets regardless of how many holders the layout has.
+
+    The index stores holder ids and positions only (no agent references), so it
+    can be shared by copies of the model.
+    """
+
+    def __init__(self, holders: Iterable, cell_size: float = 100):
+        self.cell_size = cell_size
+        self.positions: Dict[str, Tuple[float, float]] = {}
+        self.buckets = defaultdict(list)   # (cx, cy) -> [holder_id, ...]
+
+        for holder in holders:
+            self.add(holder.unique_id, holder.pos)
+
+    def _cell(self, pos) -> Tuple[int, int]:
+        return (int(pos[0] // self.cell_size), int(pos[1] // self.cell_size))
+
+    def add(self, holder_id: str, pos):
+        """Add a holder (or move it, if already indexed)"""
+        if holder_id in self.positions:
+            self.remove(holder_id)
+        self.positions[holder_id] = pos
+        self.buckets[self._cell(pos)].append(holder_id)
+
+    def remove(self, holder_id: str):
+        pos = self.positions.pop(holder_id)
+        self.buckets[self._cell(pos)].remove(holder_id)
+
+    def nearest(self, pos, radius: float) -> Optional[str]:
+        """Return the id of the holder nearest to pos within radius, or None"""
+        cx, cy = self._cell(pos)
+        span = int(math.ceil(radius / self.cell_size))
+
+        best_id = None
+        best_dist_sq = radius * radius
+        for x in range(cx - span, cx + span + 1):
+            for y in range(cy - span, cy + span + 1):
+                for holder_id in self.buckets.get((x, y), ()):
+                    hx, hy = self.positions[holder_id]
+                    dist_sq = (hx - pos[0]) ** 2 + (hy - pos[1]) ** 2
+                    if dist_sq < best_dist_sq:
+                        best_id = holder_id
+                        best_dist_sq = dist_sq
+        return best_id
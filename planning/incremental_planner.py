@@ -0,0 +1,313 @@
+import heapq
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+from planning.path_planner import Cell, OccupancyGrid, PathPlanner, densify_path
+
+
+_SQRT2 = math.sqrt(2)
+_EPS = 1e-9
+_NEIGHBORS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+# =============================================================================
+# Dynamic cost map
+# =============================================================================
+
+class DynamicCostMap:
+    """
+    Per-cell costs of moving humans, layered over the static OccupancyGrid.
+
+    Fed by the ContinuousSpace move listener: a human's current footprint blocks its
+    cells, and the cells it will cross in the next forecast_steps ticks (linear
+    extrapolation of its last move) cost forecast_cost extra per forecast. Every change
+    is pushed to the change sets of the subscribed planners, so each one can repair
+    its search for exactly the cells that changed.
+    """
+
+    def __init__(self, grid: OccupancyGrid, forecast_steps: int = 3, forecast_cost: float = 4.0):
+        self.grid = grid
+        self.forecast_steps = forecast_steps
+        self.forecast_cost = forecast_cost
+
+        # sparse counters (a few cells per human): cheaper to probe per edge than numpy scalars
+        self.blocked: Dict[Cell, int] = {}     # footprints covering each cell
+        self.forecast: Dict[Cell, int] = {}    # forecasts covering each cell
+
+        self._footprints: Dict[str, Set[Cell]] = {}
+        self._forecasts: Dict[str, Set[Cell]] = {}
+        self._subscribers: List[Set[Cell]] = []
+
+    def subscribe(self) -> Set[Cell]:
+        """Return a set that collects every cell whose cost changes from now on"""
+        changes = set()
+        self._subscribers.append(changes)
+        return changes
+
+    def unsubscribe(self, changes: Set[Cell]):
+        self._subscribers = [s for s in self._subscribers if s is not changes]
+
+    def on_agent_moved(self, agent, old_pos, new_pos):
+        """ContinuousSpace move listener; only humans are dynamic obstacles"""
+        if not getattr(agent, 'is_human', False):
+            return
+        footprint = set()
+        forecast = set()
+        if new_pos is not None:
+            footprint = self.grid.footprint_cells(new_pos, agent.size)
+            if old_pos is not None:
+                vx, vy = new_pos[0] - old_pos[0], new_pos[1] - old_pos[1]
+                for k in range(1, self.forecast_steps + 1):
+                    px, py = new_pos[0] + k * vx, new_pos[1] + k * vy
+                    if not (0 <= px < self.grid.width and 0 <= py < self.grid.height):
+                        break
+                    forecast |= self.grid.footprint_cells((px, py), agent.size)
+                forecast -= footprint
+        self._apply(agent.unique_id, footprint, forecast)
+
+    def _apply(self, agent_id: str, footprint: Set[Cell], forecast: Set[Cell]):
+        old_footprint = self._footprints.get(agent_id, set())
+        old_forecast = self._forecasts.get(agent_id, set())
+        self._count(self.blocked, old_footprint - footprint, -1)
+        self._count(self.blocked, footprint - old_footprint, 1)
+        self._count(self.forecast, old_forecast - forecast, -1)
+        self._count(self.forecast, forecast - old_forecast, 1)
+        self._footprints[agent_id] = footprint
+        self._forecasts[agent_id] = forecast
+
+        changed = (old_footprint ^ footprint) | (old_forecast ^ forecast)
+        if changed:
+            for changes in self._subscribers:
+                changes |= changed
+
+    @staticmethod
+    def _count(counter: Dict[Cell, int], cells: Set[Cell], delta: int):
+        for cell in cells:
+            n = counter.get(cell, 0) + delta
+            if n:
+                counter[cell] = n
+            else:
+                del counter[cell]
+
+    def cell_factor(self, cell: Cell) -> float:
+        """Cost multiplier of entering a cell (inf while a human stands on it)"""
+        if cell in self.blocked:
+            return math.inf
+        return 1.0 + self.forecast_cost * self.forecast.get(cell, 0)
+
+
+# =============================================================================
+# D* Lite
+# =============================================================================
+
+class DStarLite:
+    """
+    D* Lite (Koenig & Likhachev) on the occupancy grid plus a DynamicCostMap.
+
+    The search runs backward from the goal, so when the robot moves and a few cells
+    change cost, only the vertices whose cost-to-goal is affected are re-expanded:
+    repair work grows with the size of the change, not of the map. The goal cell
+    ignores dynamic blocking (operators share drop-off points).
+    """
+
+    def __init__(self, cost_map: DynamicCostMap, start, goal):
+        self.cost_map = cost_map
+        self.grid = cost_map.grid
+        self.start = self.grid.to_cell(start)
+        self.goal = self.grid.to_cell(goal)
+        self.goal_pos = goal
+
+        labels = self.grid.labels
+        passable = (labels == 0) | (labels == labels[self.start]) | (labels == labels[self.goal])
+        passable[self.start] = True
+        passable[self.goal] = True
+        self.static_passable = passable.tolist()    # nested lists: fast per-cell lookups
+
+        self.g: Dict[Cell, float] = {}
+        self.rhs: Dict[Cell, float] = {self.goal: 0.0}
+        self.km = 0.0
+        self.last_start = self.start
+
+        self.open_heap = []
+        self.open_keys: Dict[Cell, Tuple[float, float]] = {}   # cell -> current key (lazy deletion)
+        self._counter = 0
+        self._push(self.goal)
+
+        self.changes = cost_map.subscribe()
+        self._waypoint_planner = PathPlanner(self.grid)
+        self.cells: Optional[List[Cell]] = None    # path of the last (re)plan
+        self.path_found = False
+        self.path_changed = False
+        self.expanded = 0           # total vertex expansions
+        self.last_expanded = 0      # expansions of the last (re)plan
+
+    def close(self):
+        self.cost_map.unsubscribe(self.changes)
+
+    # ------------------------------------------------
+    # costs
+    # ------------------------------------------------
+    @staticmethod
+    def heuristic(a: Cell, b: Cell) -> float:
+        return PathPlanner.heuristic(a, b)
+
+    def _passable(self, cell: Cell) -> bool:
+        if not (0 <= cell[0] < self.grid.cols and 0 <= cell[1] < self.grid.rows):
+            return False
+        if not self.static_passable[cell[0]][cell[1]]:
+            return False
+        return cell == self.goal or cell not in self.cost_map.blocked
+
+    def _cost(self, u: Cell, v: Cell) -> float:
+        if not (self._passable(u) and self._passable(v)):
+            return math.inf
+        dx, dy = v[0] - u[0], v[1] - u[1]
+        if dx and dy:
+            # no corner cutting
+            if not (self._passable((u[0] + dx, u[1])) and self._passable((u[0], u[1] + dy))):
+                return math.inf
+            length = _SQRT2
+        else:
+            length = 1.0
+        factor_u = 1.0 if u == self.goal else self.cost_map.cell_factor(u)
+        factor_v = 1.0 if v == self.goal else self.cost_map.cell_factor(v)
+        return length * (factor_u + factor_v) / 2
+
+    def _neighbors(self, cell: Cell) -> List[Cell]:
+        x, y = cell
+        return [(x + dx, y + dy) for dx, dy in _NEIGHBORS
+                if 0 <= x + dx < self.grid.cols and 0 <= y + dy < self.grid.rows]
+
+    # ------------------------------------------------
+    # priority queue
+    # ------------------------------------------------
+    def _key(self, cell: Cell) -> Tuple[float, float]:
+        m = min(self.g.get(cell, math.inf), self.rhs.get(cell, math.inf))
+        return (m + self.heuristic(self.start, cell) + self.km, m)
+
+    def _push(self, cell: Cell):
+        key = self._key(cell)
+        self.open_keys[cell] = key
+        self._counter += 1
+        heapq.heappush(self.open_heap, (key, self._counter, cell))
+
+    def _top(self):
+        """Drop stale heap entries and return (key, cell) of the best open vertex, or None"""
+        while self.open_heap:
+            key, _, cell = self.open_heap[0]
+            if self.open_keys.get(cell) == key:
+                return key, cell
+            heapq.heappop(self.open_heap)
+        return None
+
+    # ------------------------------------------------
+    # search
+    # ------------------------------------------------
+    def _update_vertex(self, u: Cell):
+        if u != self.goal:
+            best = math.inf
+            for s in self._neighbors(u):
+                cost = self._cost(u, s)
+                if cost < math.inf:
+                    best = min(best, cost + self.g.get(s, math.inf))
+            self.rhs[u] = best
+        self.open_keys.pop(u, None)
+        if self.g.get(u, math.inf) != self.rhs.get(u, math.inf):
+            self._push(u)
+
+    def _compute_shortest_path(self):
+        expanded = 0
+        while True:
+            top = self._top()
+            start_key = self._key(self.start)
+            start_consistent = self.g.get(self.start, math.inf) == self.rhs.get(self.start, math.inf)
+            # expand ties with the start key too (float noise), or the descent may hit stale cells
+            if top is None or (top[0][0] > start_key[0] + _EPS and start_consistent):
+                break
+            k_old, u = top
+            heapq.heappop(self.open_heap)
+            del self.open_keys[u]
+            expanded += 1
+
+            k_new = self._key(u)
+            g_u = self.g.get(u, math.inf)
+            rhs_u = self.rhs.get(u, math.inf)
+            if k_old < k_new:
+                self._push(u)
+            elif g_u > rhs_u:
+                self.g[u] = rhs_u
+                for s in self._neighbors(u):
+                    self._update_vertex(s)
+            else:
+                self.g[u] = math.inf
+                self._update_vertex(u)
+                for s in self._neighbors(u):
+                    self._update_vertex(s)
+        self.last_expanded = expanded
+        self.expanded += expanded
+
+    def replan(self, start) -> Optional[List[tuple]]:
+        """
+        Move the search start to the robot's current position, repair the search for
+        the cells changed since the last call and return waypoints to the goal
+        (None while the goal is cut off).
+        """
+        self.start = self.grid.to_cell(start)
+        if self.changes:
+            self.km += self.heuristic(self.last_start, self.start)
+            self.last_start = self.start
+            changed = list(self.changes)
+            self.changes.clear()
+            for cell in changed:
+                self._update_vertex(cell)
+                for s in self._neighbors(cell):
+                    self._update_vertex(s)
+        self._compute_shortest_path()
+
+        cells = self.path_cells()
+        previous = self.cells
+        self.cells = cells
+        self.path_found = cells is not None
+        # unchanged if the new path is just the remainder of the previous one
+        self.path_changed = not (previous and cells and self.start in previous
+                                 and cells == previous[previous.index(self.start):])
+        if cells is None:
+            return None
+        return self._waypoint_planner.cells_to_waypoints(cells, start, self.goal_pos)
+
+    def path_cells(self) -> Optional[List[Cell]]:
+        """Greedy descent of g from the start to the goal"""
+        if self.g.get(self.start, math.inf) == math.inf and self.start != self.goal:
+            return None
+        cells = [self.start]
+        cell = self.start
+        for _ in range(self.grid.cols * self.grid.rows):
+            if cell == self.goal:
+                return cells
+            best, best_cost = None, math.inf
+            for s in self._neighbors(cell):
+                cost = self._cost(cell, s) + self.g.get(s, math.inf)
+                if cost < best_cost:
+                    best, best_cost = s, cost
+            if best is None:
+                return None
+            cell = best
+            cells.append(cell)
+        return None
+
+
+def get_robot_path_with_velocity(start_pos, target_pos, agent, pixels_per_step: float = 50):
+    """
+    One-shot plan around the humans' current and forecast positions.
+
+    Returns (path, velocity): the positions of the move steps and, for each step,
+    the (dx, dy) displacement per tick that takes the robot there.
+    """
+    planner = DStarLite(agent.model.cost_map, start_pos, target_pos)
+    waypoints = planner.replan(start_pos)
+    planner.close()
+    if waypoints is None:
+        return [], []
+    path = densify_path(waypoints, pixels_per_step)
+    velocity = [(b[0] - a[0], b[1] - a[1]) for a, b in zip(path, path[1:])]
+    return path, velocity
@@ -0,0 +1,225 @@
+import heapq
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from planning.path_planner import Cell, OccupancyGrid, PathPlanner
+
+
+# 8-connected moves plus waiting in place
+_MOVES = [(0, 0), (1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1)]
+
+
+# =============================================================================
+# Reservation table
+# =============================================================================
+
+class ReservationTable:
+    """Space-time reservations: which cells (and cell-to-cell moves) are taken at which tick"""
+
+    def __init__(self):
+        self.vertices: Set[Tuple[Cell, int]] = set()         # (cell, t)
+        self.edges: Set[Tuple[Cell, Cell, int]] = set()      # (from, to, t of arrival)
+        self.last_time: Dict[Cell, int] = {}                 # last reserved tick of each cell
+        self.parked: Dict[Cell, int] = {}                    # cell -> tick from which someone stays there
+
+    def reserve(self, cells: List[Cell], dwell: int = 0, park: bool = False):
+        """
+        Reserve a timed path (cells[t] at tick t), then its last cell for dwell more
+        ticks, or for good if park (agents whose later moves are unknown stay put)
+        """
+        for t, cell in enumerate(cells):
+            self._reserve_vertex(cell, t)
+            if t:
+                self.edges.add((cells[t - 1], cell, t))
+        end = len(cells) - 1
+        if park:
+            self.parked[cells[-1]] = min(end, self.parked.get(cells[-1], end))
+            return
+        for k in range(1, dwell + 1):
+            self._reserve_vertex(cells[-1], end + k)
+
+    def _reserve_vertex(self, cell: Cell, t: int):
+        self.vertices.add((cell, t))
+        if t > self.last_time.get(cell, -1):
+            self.last_time[cell] = t
+
+    def is_free(self, cell: Cell, t: int) -> bool:
+        return (cell, t) not in self.vertices and t < self.parked.get(cell, t + 1)
+
+    def move_is_free(self, a: Cell, b: Cell, t: int) -> bool:
+        """Moving a -> b arriving at t does not swap places with someone moving b -> a"""
+        return (b, a, t) not in self.edges
+
+
+# =============================================================================
+# Prioritized planner
+# =============================================================================
+
+class MultiAgentPlanner:
+    """
+    Prioritized multi-agent path finding with a space-time reservation table.
+
+    Agents are planned one after the other (longest trip first) with space-time A*
+    (one move or wait per tick) on an OccupancyGrid resampled from the single-agent
+    planner's grid; each path is reserved before planning the next, so paths are free
+    of vertex and swap conflicts with each other and with the fixed trajectories
+    (e.g. humans' planned steps). The cell size is chosen so that a diagonal move
+    stays within one MOVE_STEP. Solve time is measured and capped by time_budget:
+    agents left when the budget runs out get no joint path (None).
+    """
+
+    def __init__(self, grid: OccupancyGrid, cell_size: float = 35, goal_dwell: int = 2,
+                 max_expansions: int = 20000, time_budget: float = 0.05, horizon: int = 40):
+        self.base_grid = grid
+        self.cell_size = cell_size
+        self.goal_dwell = goal_dwell
+        self.horizon = horizon      # ticks of the fixed trajectories worth reserving
+        self.max_expansions = max_expansions
+        self.time_budget = time_budget
+
+        self._build_grid()
+
+        # solve statistics
+        self.solves = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.total_solve_time = 0.0
+        self.max_solve_time = 0.0
+        self.last_solve_time = 0.0
+
+    def _build_grid(self):
+        self.grid = self.base_grid.resampled(self.cell_size)
+        self.planner = PathPlanner(self.grid)
+        self.grid_version = self.base_grid.version
+
+    @staticmethod
+    def heuristic(a: Cell, b: Cell) -> int:
+        """Chebyshev distance: ticks needed on an empty 8-connected grid"""
+        return max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+
+    # ------------------------------------------------
+    # joint planning
+    # ------------------------------------------------
+    def plan(self, requests: Dict[str, Tuple[tuple, tuple]],
+             fixed: Optional[Dict[str, List[tuple]]] = None,
+             delays: Optional[Dict[str, int]] = None) -> Dict[str, Optional[List[tuple]]]:
+        """
+        Plan all requests {agent_id: (start_pos, goal_pos)} jointly.
+
+        fixed holds trajectories that cannot be changed ({agent_id: [pos at t=0, t=1, ...]});
+        their agents stay on their last cell from then on. delays holds the ticks a
+        requesting agent waits on its start before its first move (e.g. it has already
+        acted in the current step).
+        Returns {agent_id: [pos at t=0, t=1, ...] or None}; consecutive equal positions are waits.
+        """
+        delays = delays or {}
+        t0 = time.perf_counter()
+        if self.base_grid.version != self.grid_version:
+            self._build_grid()
+
+        table = ReservationTable()
+        for positions in (fixed or {}).values():
+            table.reserve([self.grid.to_cell(pos) for pos in positions], park=True)
+
+        order = sorted(requests, key=lambda aid: -self.heuristic(self.grid.to_cell(requests[aid][0]),
+                                                                 self.grid.to_cell(requests[aid][1])))
+        paths = {}
+        for agent_id in order:
+            start, goal = requests[agent_id]
+            if time.perf_counter() - t0 > self.time_budget:
+                self.timeouts += 1
+                paths[agent_id] = None
+                continue
+            cells = self._search(start, goal, table, delays.get(agent_id, 0))
+            if cells is None:
+                self.failures += 1
+                paths[agent_id] = None
+                continue
+            table.reserve(cells, self.goal_dwell)
+            paths[agent_id] = self._to_positions(cells, start, goal)
+
+        self.last_solve_time = time.perf_counter() - t0
+        self.solves += 1
+        self.total_solve_time += self.last_solve_time
+        self.max_solve_time = max(self.max_solve_time, self.last_solve_time)
+        return paths
+
+    def _search(self, start, goal, table: ReservationTable, delay: int = 0) -> Optional[List[Cell]]:
+        """Space-time A*: cells[t] is the agent's cell at tick t; the search leaves start at tick delay"""
+        start_cell = self.grid.to_cell(start)
+        goal_cell = self.grid.to_cell(goal)
+        passable = self.planner.passable_mask(start_cell, goal_cell)
+        cols, rows = passable.shape
+
+        came_from = {}
+        closed = set()
+        counter = 0
+        open_heap = [(delay + self.heuristic(start_cell, goal_cell), delay, counter, start_cell)]
+        expansions = 0
+
+        while open_heap and expansions < self.max_expansions:
+            _, t, _, cell = heapq.heappop(open_heap)
+            state = (cell, t)
+            if state in closed:
+                continue
+            # stop only where nobody needs the goal cell later
+            if cell == goal_cell and t > table.last_time.get(goal_cell, -1):
+                return [start_cell] * delay + self._reconstruct(came_from, state)
+            closed.add(state)
+            expansions += 1
+
+            cx, cy = cell
+            for dx, dy in _MOVES:
+                nx, ny = cx + dx, cy + dy
+                if not (0 <= nx < cols and 0 <= ny < rows) or not passable[nx, ny]:
+                    continue
+                if dx and dy and not (passable[cx + dx, cy] and passable[cx, cy + dy]):
+                    continue
+                neighbor = (nx, ny)
+                # goal cells may be shared with parked operators (drop-off points), as in D* Lite
+                if neighbor == goal_cell and neighbor in table.parked:
+                    free = (neighbor, t + 1) not in table.vertices
+                else:
+                    free = table.is_free(neighbor, t + 1)
+                if not free or not table.move_is_free(cell, neighbor, t + 1):
+                    continue
+                next_state = (neighbor, t + 1)
+                if next_state in closed:
+                    continue
+                if next_state not in came_from:
+                    came_from[next_state] = state
+                    counter += 1
+                    heapq.heappush(open_heap, (t + 1 + self.heuristic(neighbor, goal_cell), t + 1, counter, neighbor))
+        return None
+
+    @staticmethod
+    def _reconstruct(came_from, state) -> List[Cell]:
+        cells = [state[0]]
+        while state in came_from:
+            state = came_from[state]
+            cells.append(state[0])
+        cells.reverse()
+        return cells
+
+    def _to_positions(self, cells: List[Cell], start, goal) -> List[tuple]:
+        """Cell centers per tick, with the exact start and goal positions at both ends"""
+        positions = [start]
+        for cell in cells[1:]:
+            if cell == cells[-1]:
+                positions.append(goal)
+            elif cell == cells[0]:
+                positions.append(start)
+            else:
+                positions.append(self.grid.cell_center(cell))
+        return positions
+
+    def get_stats(self) -> Dict:
+        return {
+            "solves": self.solves,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "total_solve_time": self.total_solve_time,
+            "mean_solve_time": self.total_solve_time / self.solves if self.solves else 0.0,
+            "max_solve_time": self.max_solve_time,
+            "last_solve_time": self.last_solve_time,
+        }
@@ -1,26 +1,217 @@
+import heapq
+import math
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
 
-#  path planner needs to know the world state of all agents and objects
-
-from typing import List, Tuple 
-
-
-# def get_robot_path_with_velocity(start_pos, target_pos, world_state, agent):
-    
-    
-    
-    
-#     # get current positions of other agents from world state:
-#     human1 = world_state["humans"][0]
-    
-#     # robot mind of human mind should have an attribute of possible targets (coming from probabilities inferred by the intention recognition system)
-#     # robot.human_mind.possible_targets ...   
-    
-    
-#     all_objects = world_state["objects"]
-    
-    
-    
-    
-#     return path, velocity
-    
-    
\ No newline at end of file
+import numpy as np
+
+
+Cell = Tuple[int, int]
+
+# 8-connected moves with their lengths (in cells)
+_MOVES = [(1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+          (1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)), (-1, -1, math.sqrt(2))]
+
+
+# =============================================================================
+# Occupancy grid
+# =============================================================================
+
+class OccupancyGrid:
+    """
+    Occupancy grid rasterized from the positions and sizes of static objects.
+
+    Each cell holds 0 if free, otherwise the label of the obstacle covering it.
+    Labels let the planner enter the obstacle that contains the start or the goal
+    (e.g. an item lying on a shelf), while still routing around every other one.
+    """
+
+    def __init__(self, width: float, height: float, cell_size: float):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.cols = int(math.ceil(width / cell_size))
+        self.rows = int(math.ceil(height / cell_size))
+
+        self.labels = np.zeros((self.cols, self.rows), dtype=int)
+        self.label_ids = [None]     # label -> entity id
+        self.obstacles = {}         # label -> (pos, size), to re-rasterize at another resolution
+        self.version = 0            # bumped on every layout change
+
+    @classmethod
+    def from_model(cls, model, cell_size: float) -> 'OccupancyGrid':
+        """Rasterize shelves, kitting table, coffee machines and AC switches (doors stay passable)"""
+        grid = cls(model.width, model.height, cell_size)
+        obstacles = [model.kitting_table] + list(model.shelves.values()) + \
+            list(model.coffee_machines.values()) + list(model.ac_switches.values())
+        for obj in obstacles:
+            grid.add_obstacle(obj.unique_id, obj.pos, obj.size)
+        return grid
+
+    def add_obstacle(self, entity_id: str, pos, size) -> int:
+        """Mark every cell overlapping the rectangle [pos, pos + size) as occupied"""
+        label = len(self.label_ids)
+        self.label_ids.append(entity_id)
+        self.obstacles[label] = (pos, size)
+        x0, y0, x1, y1 = self.rect_cells(pos, size)
+        self.labels[x0:x1, y0:y1] = label
+        self.version += 1
+        return label
+
+    def remove_obstacle(self, entity_id: str):
+        for label, label_id in enumerate(self.label_ids):
+            if label and label_id == entity_id:
+                self.labels[self.labels == label] = 0
+                self.label_ids[label] = None
+                self.obstacles.pop(label, None)
+        self.version += 1
+
+    def resampled(self, cell_size: float) -> 'OccupancyGrid':
+        """The same obstacles rasterized at another cell size"""
+        grid = OccupancyGrid(self.width, self.height, cell_size)
+        for label, (pos, size) in self.obstacles.items():
+            grid.add_obstacle(self.label_ids[label], pos, size)
+        return grid
+
+    def rect_cells(self, pos, size) -> Tuple[int, int, int, int]:
+        """Cell index bounds (x0, y0, x1, y1), end-exclusive, of a rectangle"""
+        x0 = max(0, int(pos[0] // self.cell_size))
+        y0 = max(0, int(pos[1] // self.cell_size))
+        x1 = min(self.cols, int(math.ceil((pos[0] + size[0]) / self.cell_size)))
+        y1 = min(self.rows, int(math.ceil((pos[1] + size[1]) / self.cell_size)))
+        return x0, y0, max(x1, x0 + 1), max(y1, y0 + 1)
+
+    def footprint_cells(self, pos, size) -> Set[Cell]:
+        x0, y0, x1, y1 = self.rect_cells(pos, size)
+        return {(x, y) for x in range(x0, x1) for y in range(y0, y1)}
+
+    def to_cell(self, pos) -> Cell:
+        x = min(self.cols - 1, max(0, int(pos[0] // self.cell_size)))
+        y = min(self.rows - 1, max(0, int(pos[1] // self.cell_size)))
+        return (x, y)
+
+    def cell_center(self, cell: Cell) -> Tuple[int, int]:
+        half = self.cell_size // 2
+        return (int(cell[0] * self.cell_size + half), int(cell[1] * self.cell_size + half))
+
+    def in_bounds(self, cell: Cell) -> bool:
+        return 0 <= cell[0] < self.cols and 0 <= cell[1] < self.rows
+
+
+# =============================================================================
+# A* planner
+# =============================================================================
+
+class PathPlanner:
+    """A* search on an OccupancyGrid (8-connected, octile heuristic)"""
+
+    def __init__(self, grid: OccupancyGrid):
+        self.grid = grid
+        self.last_expanded = 0      # nodes expanded by the last search
+
+    @staticmethod
+    def heuristic(a: Cell, b: Cell) -> float:
+        """Octile distance: exact cost on an empty 8-connected grid, hence admissible"""
+        dx = abs(a[0] - b[0])
+        dy = abs(a[1] - b[1])
+        return (dx + dy) + (math.sqrt(2) - 2) * min(dx, dy)
+
+    def passable_mask(self, start_cell: Cell, goal_cell: Cell, blocked: Optional[Iterable[Cell]] = None) -> np.ndarray:
+        """Free cells, plus the obstacles containing start and goal, minus dynamically blocked cells"""
+        labels = self.grid.labels
+        passable = (labels == 0) | (labels == labels[start_cell]) | (labels == labels[goal_cell])
+        if blocked:
+            for cell in blocked:
+                if self.grid.in_bounds(cell):
+                    passable[cell] = False
+        passable[start_cell] = True
+        passable[goal_cell] = True
+        return passable
+
+    def search(self, start_cell: Cell, goal_cell: Cell, passable: np.ndarray) -> Optional[List[Cell]]:
+        """Return the list of cells from start to goal, or None if unreachable"""
+        cols, rows = passable.shape
+        g_score = {start_cell: 0.0}
+        came_from = {}
+        closed = set()
+        open_heap = [(self.heuristic(start_cell, goal_cell), 0.0, start_cell)]
+        self.last_expanded = 0
+
+        while open_heap:
+            _, g, cell = heapq.heappop(open_heap)
+            if cell in closed:
+                continue
+            if cell == goal_cell:
+                return self._reconstruct(came_from, cell)
+            closed.add(cell)
+            self.last_expanded += 1
+
+            cx, cy = cell
+            for dx, dy, cost in _MOVES:
+                nx, ny = cx + dx, cy + dy
+                if not (0 <= nx < cols and 0 <= ny < rows) or not passable[nx, ny]:
+                    continue
+                # no corner cutting through obstacles
+                if dx and dy and not (passable[cx + dx, cy] and passable[cx, cy + dy]):
+                    continue
+                neighbor = (nx, ny)
+                new_g = g + cost
+                if new_g < g_score.get(neighbor, math.inf):
+                    g_score[neighbor] = new_g
+                    came_from[neighbor] = cell
+                    heapq.heappush(open_heap, (new_g + self.heuristic(neighbor, goal_cell), new_g, neighbor))
+        return None
+
+    @staticmethod
+    def _reconstruct(came_from, cell) -> List[Cell]:
+        cells = [cell]
+        while cell in came_from:
+            cell = came_from[cell]
+            cells.append(cell)
+        cells.reverse()
+        return cells
+
+    def plan(self, start, goal, blocked: Optional[Iterable[Cell]] = None) -> Optional[List[tuple]]:
+        """
+        Plan a path between two pixel positions.
+
+        Returns waypoints (start, turning points at cell centers, exact goal), or None
+        if the goal is unreachable. Use densify_path (or the lazy iter_steps) to turn them into move steps.
+        """
+        cells = self.plan_cells(start, goal, blocked)
+        if cells is None:
+            return None
+        return self.cells_to_waypoints(cells, start, goal)
+
+    def plan_cells(self, start, goal, blocked: Optional[Iterable[Cell]] = None) -> Optional[List[Cell]]:
+        """Plan between two pixel positions and return the grid cells of the path"""
+        start_cell = self.grid.to_cell(start)
+        goal_cell = self.grid.to_cell(goal)
+        if start_cell == goal_cell:
+            return [start_cell]
+
+        passable = self.passable_mask(start_cell, goal_cell, blocked)
+        return self.search(start_cell, goal_cell, passable)
+
+    def cells_to_waypoints(self, cells: List[Cell], start, goal) -> List[tuple]:
+        """Keep only the cells where the direction changes, then attach exact start and goal"""
+        waypoints = [start]
+        for prev, cell, nxt in zip(cells, cells[1:], cells[2:]):
+            if (cell[0] - prev[0], cell[1] - prev[1]) != (nxt[0] - cell[0], nxt[1] - cell[1]):
+                waypoints.append(self.grid.cell_center(cell))
+        waypoints.append(goal)
+        return waypoints
+
+
+def iter_steps(waypoints: List[tuple], pixels_per_step: float) -> Iterator[tuple]:
+    """Lazily yield the integer positions after waypoints[0], at most pixels_per_step apart"""
+    for (x0, y0), (x1, y1) in zip(waypoints, waypoints[1:]):
+        dx, dy = x1 - x0, y1 - y0
+        steps = max(1, int(math.ceil(math.hypot(dx, dy) / pixels_per_step)))
+        for i in range(1, steps):
+            yield (int(x0 + dx * i / steps), int(y0 + dy * i / steps))
+        yield (x1, y1)
+
+
+def densify_path(waypoints: List[tuple], pixels_per_step: float) -> List[tuple]:
+    """Split a waypoint polyline into integer positions at most pixels_per_step apart"""
+    return [waypoints[0]] + list(iter_steps(waypoints, pixels_per_step))
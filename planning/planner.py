@@ -1,5 +1,5 @@
-from typing import List, Optional
-from intentions.factory_intentions import TaskIntention, TaskType, ActionIntention, ActionType
+from typing import Dict, List, Optional, Tuple
+from intentions.factory_intentions import TaskIntention, TaskType, ActionIntention, ActionType, ActionRecord
 from intentions.state_representation import State, Predicate
 from intentions.entity_representation import EntityType, EntityIdentifier
 
@@ -9,71 +9,168 @@ Planning Layer
 
 Single Planner class handles ALL planning (replaces IntentionPlanner and ExecutionPlanner)
 Plans in two stages: task→actions, then action→micro-actions
+
+Task plans are compiled once per TaskType into a PlanTemplate (the action sequence
+built with variables in place of the task parameters) and instantiated into immutable
+ActionRecords for each concrete task; both are cached per Planner (per operator).
+Task types without a template are planned from their goal by the model's
+StripsPlanner (planning/strips.py).
 '''
 
+VARIABLE_PREFIX = "?"
+
+
+class PlanTemplate:
+    """Action sequence of a TaskType with task parameters left as variables"""
+    __slots__ = ('task_type', 'variables', 'steps')
+
+    def __init__(self, task_type: TaskType, variables: Tuple[str, ...], actions: List[ActionIntention]):
+        self.task_type = task_type
+        self.variables = variables
+        # lifted steps: (action_type, parameters, [(predicate name, args), ...])
+        self.steps = [
+            (action.action_type,
+             dict(action.parameters),
+             [(pred.name, tuple(pred.args)) for pred in action.desired_state.predicates])
+            for action in actions
+        ]
+
+    @staticmethod
+    def _bind(value, binding: Dict[str, str]):
+        if isinstance(value, str) and value.startswith(VARIABLE_PREFIX):
+            return binding.get(value[len(VARIABLE_PREFIX):])
+        return value
+
+    def instantiate(self, binding: Dict[str, str]) -> Tuple[ActionRecord, ...]:
+        """Bind the variables to the task parameters"""
+        return tuple(
+            ActionRecord(
+                action_type,
+                {key: self._bind(value, binding) for key, value in parameters.items()},
+                [Predicate(name, tuple(self._bind(arg, binding) for arg in args)) for name, args in predicates],
+            )
+            for action_type, parameters, predicates in self.steps
+        )
+
+
 class Planner:
     """Unified planner that handles task-to-action and action-to-microaction planning"""
-    
-    def plan_for_task(self, task: TaskIntention, world_state: State) -> List[ActionIntention]:
+
+    # TaskType -> (builder method name, task parameters it depends on)
+    TEMPLATE_BUILDERS = {
+        TaskType.DELIVER_ITEM: ('_deliver_item_actions', ('agent_id', 'item_id')),
+    }
+
+    def __init__(self, model=None):
+        self.model = model
+        # per planner (each operator has its own, and bindings include the agent):
+        # templates per TaskType, instances per bound parameters
+        self._templates: Dict[TaskType, Optional[PlanTemplate]] = {}
+        self._instances: Dict[tuple, Tuple[ActionRecord, ...]] = {}
+
+    def plan_for_task(self, task: TaskIntention, world_state: State) -> List[ActionRecord]:
         """Convert a task into sequence of actions"""
-        # if task.name.startswith("deliver_item"):
-        if task.task_type == TaskType.DELIVER_ITEM:
-            item_id = task.parameters.get('item_id')  # this is full item_X string (e.g. "item_1")
-            agent_id = task.parameters.get('agent_id')
-            
-            return [
-                # ---------------------------------------------------------
-                # Move to item
-                # ---------------------------------------------------------
-                ActionIntention(
-                    action_type=ActionType.MOVE_TO,
-                    desired_state=State([
-                        Predicate("reach", [agent_id, item_id])   # agent should be able to reach item, for now if they are at the same location, TODO: implement reachability check using neighborhood radius 
-                    ]),
-                    parameters={
-                        "agent_id": agent_id,
-                        "target_entity": item_id # this is full item_X string (e.g. "item_1")
-                    }
-                ),
-                # ---------------------------------------------------------
-                # Pick up item
-                # ---------------------------------------------------------
-                ActionIntention(
-                    action_type=ActionType.PICK_UP,
-                    desired_state=State([
-                        Predicate("holding", [agent_id, item_id])
-                    ]),
-                    parameters={
-                        "agent_id": agent_id,
-                        "item_id": item_id
-                    }
-                ),
-                # ---------------------------------------------------------
-                # Move to kitting table
-                # ---------------------------------------------------------
-                ActionIntention(
-                    action_type=ActionType.MOVE_TO,
-                    desired_state=State([
-                        Predicate("reach", [agent_id, "kitting_table"])
-                    ]),
-                    parameters={
-                        "agent_id": agent_id,
-                        "target_entity": "kitting_table"
-                    }
-                ),
-                # ---------------------------------------------------------
-                # Place item on kitting table
-                # ---------------------------------------------------------
-                ActionIntention(
-                    action_type=ActionType.PLACE,
-                    desired_state=State([
-                        Predicate("on", [item_id, "kitting_table"])
-                    ]),
-                    parameters={
-                        "agent_id": agent_id,
-                        "item_id": item_id,
-                        "target_holder": "kitting_table"   # could be any holder (shelf/kitting_table, floor, etc.)
-                    }
-                )
-            ]
-        return []
\ No newline at end of file
+        template = self.get_template(task.task_type)
+        if template is None:
+            return self._plan_with_strips(task, world_state)
+
+        binding = tuple(task.parameters.get(name) for name in template.variables)
+        key = (task.task_type, binding)
+        actions = self._instances.get(key)
+        if actions is None:
+            actions = template.instantiate(dict(zip(template.variables, binding)))
+            self._instances[key] = actions
+        return list(actions)   # callers consume their own copy
+
+    def _plan_with_strips(self, task: TaskIntention, world_state: State) -> List[ActionRecord]:
+        """Search a plan for the task's goal with the model's symbolic planner"""
+        strips = getattr(self.model, 'strips_planner', None)
+        agent_id = task.parameters.get('agent_id')
+        if strips is None or agent_id is None:
+            return []
+        goal = strips.task_goal(task)
+        if not goal:
+            return []
+
+        actions = strips.plan(agent_id, goal, world_state)
+        search = "cached" if strips.last_cached else f"{strips.last_expansions} expansions"
+        if actions is None:
+            self.model.tracer.warning("planner.no_plan", "No plan found for {task} ({search}, {ms:.1f} ms)",
+                                      task=task, search=search, ms=strips.last_time * 1000)
+            return []
+        self.model.tracer.info("planner.planned", "Planned {task}: {actions} actions ({search}, {ms:.1f} ms)",
+                               task=task, actions=len(actions), search=search, ms=strips.last_time * 1000)
+        return actions
+
+    def get_template(self, task_type: TaskType) -> Optional[PlanTemplate]:
+        """Compile (once) the plan template of a task type"""
+        if task_type not in self._templates:
+            builder = self.TEMPLATE_BUILDERS.get(task_type)
+            if builder is None:
+                self._templates[task_type] = None
+            else:
+                method_name, variables = builder
+                placeholders = [VARIABLE_PREFIX + name for name in variables]
+                actions = getattr(self, method_name)(*placeholders)
+                self._templates[task_type] = PlanTemplate(task_type, variables, actions)
+        return self._templates[task_type]
+
+    # ------------------------------------------------
+    # plan schemas (called once per TaskType with variables as arguments)
+    # ------------------------------------------------
+    def _deliver_item_actions(self, agent_id: str, item_id: str) -> List[ActionIntention]:
+        return [
+            # ---------------------------------------------------------
+            # Move to item
+            # ---------------------------------------------------------
+            ActionIntention(
+                action_type=ActionType.MOVE_TO,
+                desired_state=State([
+                    Predicate("reach", [agent_id, item_id])   # agent should be able to reach item, for now if they are at the same location, TODO: implement reachability check using neighborhood radius
+                ]),
+                parameters={
+                    "agent_id": agent_id,
+                    "target_entity": item_id # this is full item_X string (e.g. "item_1")
+                }
+            ),
+            # ---------------------------------------------------------
+            # Pick up item
+            # ---------------------------------------------------------
+            ActionIntention(
+                action_type=ActionType.PICK_UP,
+                desired_state=State([
+                    Predicate("holding", [agent_id, item_id])
+                ]),
+                parameters={
+                    "agent_id": agent_id,
+                    "item_id": item_id
+                }
+            ),
+            # ---------------------------------------------------------
+            # Move to kitting table
+            # ---------------------------------------------------------
+            ActionIntention(
+                action_type=ActionType.MOVE_TO,
+                desired_state=State([
+                    Predicate("reach", [agent_id, "kitting_table"])
+                ]),
+                parameters={
+                    "agent_id": agent_id,
+                    "target_entity": "kitting_table"
+                }
+            ),
+            # ---------------------------------------------------------
+            # Place item on kitting table
+            # ---------------------------------------------------------
+            ActionIntention(
+                action_type=ActionType.PLACE,
+                desired_state=State([
+                    Predicate("on", [item_id, "kitting_table"])
+                ]),
+                parameters={
+                    "agent_id": agent_id,
+                    "item_id": item_id,
+                    "target_holder": "kitting_table"   # could be any holder (shelf/kitting_table, floor, etc.)
+                }
+            )
+        ]
@@ -0,0 +1,171 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from planning.path_planner import Cell, PathPlanner
+
+
+class RouteCache:
+    """
+    Cache of planned routes between landmarks (shelves, kitting table, doors, coffee machines).
+
+    Routes are keyed by (start landmark or start cell, goal landmark) and stored as grid
+    cells running from where the path leaves the start landmark to where it enters the
+    goal landmark. A trip is then assembled as: live leg from the operator's actual
+    position onto the cached route, the cached route, live leg to the exact goal. Only
+    the two short legs are planned on every trip (and only they see the other operators;
+    cached routes are planned on the static layout).
+
+    The cache is flushed whenever the occupancy grid version changes.
+    """
+
+    def __init__(self, planner: PathPlanner, landmarks: Dict[str, Tuple[tuple, tuple]],
+                 attach_radius: float = 100, precompute: bool = False):
+        self.planner = planner
+        self.grid = planner.grid
+        self.attach_radius_cells = max(1, int(attach_radius // self.grid.cell_size))
+
+        # landmark id -> (pos, size), footprint cells and center
+        self.landmarks = landmarks
+        self.footprints = {lid: self.grid.footprint_cells(pos, size) for lid, (pos, size) in landmarks.items()}
+        self.centers = {lid: (int(pos[0] + size[0] // 2), int(pos[1] + size[1] // 2))
+                        for lid, (pos, size) in landmarks.items()}
+
+        self.routes: Dict[tuple, Optional[List[Cell]]] = {}   # (start key, goal landmark) -> cells
+        self.grid_version = self.grid.version
+
+        self.hits = 0
+        self.misses = 0
+        self.live_legs = 0
+
+        if precompute:
+            self.precompute()
+
+    @classmethod
+    def from_model(cls, model, planner: PathPlanner, attach_radius: float = 100, precompute: bool = False):
+        landmarks = {}
+        for obj in [model.kitting_table] + list(model.shelves.values()) + \
+                list(model.doors.values()) + list(model.coffee_machines.values()):
+            landmarks[obj.unique_id] = (obj.pos, obj.size)
+        return cls(planner, landmarks, attach_radius=attach_radius, precompute=precompute)
+
+    # ------------------------------------------------
+    # cache maintenance
+    # ------------------------------------------------
+    def precompute(self):
+        """Fill the table with the routes between every pair of landmarks"""
+        for a in self.landmarks:
+            for b in self.landmarks:
+                if a != b:
+                    self._landmark_route(a, b)
+
+    def _check_version(self):
+        if self.grid.version != self.grid_version:
+            self.routes.clear()
+            self.grid_version = self.grid.version
+
+    def landmark_at(self, pos) -> Optional[str]:
+        """Id of the landmark whose footprint contains pos, if any"""
+        for lid, (lpos, size) in self.landmarks.items():
+            if lpos[0] <= pos[0] <= lpos[0] + size[0] and lpos[1] <= pos[1] <= lpos[1] + size[1]:
+                return lid
+        return None
+
+    # ------------------------------------------------
+    # cached routes
+    # ------------------------------------------------
+    def _trim(self, cells: List[Cell], start_landmark: Optional[str], goal_landmark: str) -> List[Cell]:
+        """Cut the path to the stretch between leaving the start landmark and entering the goal landmark"""
+        first = 0
+        if start_landmark is not None:
+            start_cells = self.footprints[start_landmark]
+            while first < len(cells) - 1 and cells[first + 1] in start_cells:
+                first += 1
+        goal_cells = self.footprints[goal_landmark]
+        last = first
+        while last < len(cells) - 1 and cells[last] not in goal_cells:
+            last += 1
+        return cells[first:last + 1]
+
+    def _landmark_route(self, a: str, b: str) -> Optional[List[Cell]]:
+        key = (a, b)
+        if key in self.routes:
+            self.hits += 1
+        else:
+            self.misses += 1
+            cells = self.planner.plan_cells(self.centers[a], self.centers[b])
+            self.routes[key] = None if cells is None else self._trim(cells, a, b)
+        return self.routes[key]
+
+    def _cell_route(self, start, b: str) -> Optional[List[Cell]]:
+        """Route from a free position: exact cell hit, else join the nearest cached route to b"""
+        start_cell = self.grid.to_cell(start)
+        key = (start_cell, b)
+        if key in self.routes:
+            self.hits += 1
+            return self.routes[key]
+
+        joint = self._nearest_route_cell(start_cell, b)
+        if joint is not None:
+            route, idx = joint
+            self.hits += 1
+            return route[idx:]
+
+        self.misses += 1
+        cells = self.planner.plan_cells(start, self.centers[b])
+        self.routes[key] = None if cells is None else self._trim(cells, None, b)
+        return self.routes[key]
+
+    def _nearest_route_cell(self, cell: Cell, b: str) -> Optional[Tuple[List[Cell], int]]:
+        """Closest cell (Chebyshev distance, within the attach radius) on any cached route to b"""
+        best = None
+        best_dist = self.attach_radius_cells + 1
+        for (_, goal), route in self.routes.items():
+            if goal != b or not route:
+                continue
+            for idx, (x, y) in enumerate(route):
+                dist = max(abs(x - cell[0]), abs(y - cell[1]))
+                if dist < best_dist:
+                    best = (route, idx)
+                    best_dist = dist
+        return best
+
+    # ------------------------------------------------
+    # planning
+    # ------------------------------------------------
+    def plan(self, start, goal, blocked: Optional[Iterable[Cell]] = None) -> Optional[List[tuple]]:
+        """Same contract as PathPlanner.plan: waypoints from start to goal, or None"""
+        self._check_version()
+        goal_landmark = self.landmark_at(goal)
+        start_landmark = self.landmark_at(start)
+        if goal_landmark is None or goal_landmark == start_landmark:
+            return self.planner.plan(start, goal, blocked=blocked)
+
+        if start_landmark is not None:
+            route = self._landmark_route(start_landmark, goal_landmark)
+        else:
+            route = self._cell_route(start, goal_landmark)
+        if not route:
+            return self.planner.plan(start, goal, blocked=blocked)
+
+        head = self._leg(start, self.grid.cell_center(route[0]), blocked)
+        tail = self._leg(self.grid.cell_center(route[-1]), goal, blocked)
+        if head is None or tail is None:
+            return self.planner.plan(start, goal, blocked=blocked)
+
+        cells = head[:-1] + route + tail[1:]
+        # drop repeated cells at the joints
+        cells = [c for i, c in enumerate(cells) if i == 0 or c != cells[i - 1]]
+        return self.planner.cells_to_waypoints(cells, start, goal)
+
+    def _leg(self, start, goal, blocked) -> Optional[List[Cell]]:
+        if self.grid.to_cell(start) == self.grid.to_cell(goal):
+            return [self.grid.to_cell(start)]
+        self.live_legs += 1
+        return self.planner.plan_cells(start, goal, blocked)
+
+    def get_stats(self) -> Dict:
+        return {
+            "routes": len(self.routes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "live_legs": self.live_legs,
+        }
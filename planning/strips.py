@@ -0,0 +1,320 @@
+import heapq
+import itertools
+import math
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from intentions.factory_intentions import ActionType, ActionRecord, TaskType
+from intentions.state_representation import Predicate, State
+
+
+'''
+STRIPS-style symbolic planner
+
+Actions are lifted schemas (typed parameters, preconditions, negative preconditions,
+add and delete effects) over the Predicate vocabulary of the world state
+(reach, holding, on, has_coffee). A task's goal is its desired_state, so new task
+types only need a goal, not a hand-written plan. Search is greedy best-first with
+the h_add heuristic, duplicate detection on hashed (frozenset) states and a bound
+on node expansions.
+
+Facts are tuples (name, arg1, arg2, ...). In negative preconditions and deletes,
+WILDCARD matches any argument (e.g. holding(?a, *) = "hands not free").
+'''
+
+Fact = Tuple[str, ...]
+WILDCARD = "*"
+
+
+class ActionSchema:
+    """Lifted action: typed parameters, preconditions and effects with ?variables"""
+
+    def __init__(self, name: str, action_type: ActionType, parameters: List[Tuple[str, str]],
+                 pre: List[Fact], add: List[Fact], delete: List[Fact] = (), neg_pre: List[Fact] = (),
+                 record: Dict[str, str] = None):
+        self.name = name
+        self.action_type = action_type
+        self.parameters = parameters        # [(variable, type), ...]
+        self.pre = list(pre)
+        self.neg_pre = list(neg_pre)
+        self.add = list(add)
+        self.delete = list(delete)
+        self.record = record or {}          # ActionRecord parameters, values may be variables
+
+
+class GroundAction:
+    """Schema with every variable bound to an object"""
+    __slots__ = ('schema', 'binding', 'pre', 'neg_pre', 'add', 'delete')
+
+    def __init__(self, schema: ActionSchema, binding: Dict[str, str]):
+        self.schema = schema
+        self.binding = binding
+        self.pre = tuple(_ground(f, binding) for f in schema.pre)
+        self.neg_pre = tuple(_ground(f, binding) for f in schema.neg_pre)
+        self.add = tuple(_ground(f, binding) for f in schema.add)
+        self.delete = tuple(_ground(f, binding) for f in schema.delete)
+
+    def applicable(self, state: FrozenSet[Fact]) -> bool:
+        if not all(p in state for p in self.pre):
+            return False
+        return not any(_matches(pattern, fact) for pattern in self.neg_pre for fact in state)
+
+    def apply(self, state: FrozenSet[Fact]) -> FrozenSet[Fact]:
+        kept = [f for f in state if not any(_matches(pattern, f) for pattern in self.delete)]
+        return frozenset(kept).union(self.add)
+
+    def to_record(self) -> ActionRecord:
+        parameters = {key: self.binding.get(value, value) for key, value in self.schema.record.items()}
+        desired = [Predicate(f[0], list(f[1:])) for f in self.add]
+        return ActionRecord(self.schema.action_type, parameters, desired)
+
+    def __repr__(self):
+        args = ", ".join(self.binding[var] for var, _ in self.schema.parameters)
+        return f"{self.schema.name}({args})"
+
+
+def _ground(fact: Fact, binding: Dict[str, str]) -> Fact:
+    return tuple(binding.get(arg, arg) for arg in fact)
+
+
+def _matches(pattern: Fact, fact: Fact) -> bool:
+    return len(pattern) == len(fact) and all(p == WILDCARD or p == f for p, f in zip(pattern, fact))
+
+
+# =============================================================================
+# Factory domain
+# =============================================================================
+
+FACTORY_SCHEMAS = [
+    ActionSchema(
+        "move_to", ActionType.MOVE_TO,
+        parameters=[("?a", "agent"), ("?e", "location")],
+        pre=[],
+        add=[("reach", "?a", "?e")],
+        delete=[("reach", "?a", WILDCARD)],
+        record={"agent_id": "?a", "target_entity": "?e"},
+    ),
+    ActionSchema(
+        "pick_up", ActionType.PICK_UP,
+        parameters=[("?a", "agent"), ("?i", "item"), ("?h", "holder")],
+        pre=[("reach", "?a", "?i"), ("on", "?i", "?h")],
+        neg_pre=[("holding", "?a", WILDCARD)],
+        add=[("holding", "?a", "?i")],
+        delete=[("on", "?i", "?h")],
+        record={"agent_id": "?a", "item_id": "?i"},
+    ),
+    ActionSchema(
+        "place", ActionType.PLACE,
+        parameters=[("?a", "agent"), ("?i", "item"), ("?h", "holder")],
+        pre=[("holding", "?a", "?i"), ("reach", "?a", "?h")],
+        add=[("on", "?i", "?h")],
+        delete=[("holding", "?a", "?i")],
+        record={"agent_id": "?a", "item_id": "?i", "target_holder": "?h"},
+    ),
+    ActionSchema(
+        "use_coffee_machine", ActionType.USE,
+        parameters=[("?a", "agent"), ("?m", "coffee_machine")],
+        pre=[("reach", "?a", "?m")],
+        neg_pre=[("holding", "?a", WILDCARD)],
+        add=[("has_coffee", "?a")],
+        record={"agent_id": "?a", "target_entity": "?m"},
+    ),
+]
+
+# goals of task types whose desired_state is left empty
+TASK_GOALS = {
+    TaskType.SEARCH_ITEM: [("reach", "?agent_id", "?item_id")],
+    TaskType.GO_BATHROOM: [("reach", "?agent_id", "?bathroom_location")],
+    TaskType.OPEN_WINDOW: [("reach", "?agent_id", "?window_id")],
+}
+
+
+class StripsDomain:
+    """Action schemas plus the typed objects they are grounded over"""
+
+    def __init__(self, schemas: List[ActionSchema], objects: Dict[str, List[str]]):
+        self.schemas = schemas
+        self.objects = objects              # type -> object ids
+        self.vocabulary = {f[0] for s in schemas for f in s.pre + s.add + s.neg_pre + s.delete}
+
+    @classmethod
+    def from_model(cls, model) -> 'StripsDomain':
+        items = list(model.items)
+        holders = list(model.holders)
+        coffee_machines = list(model.coffee_machines)
+        locations = items + holders + coffee_machines + list(model.doors) + list(model.ac_switches)
+        return cls(FACTORY_SCHEMAS, {
+            "item": items,
+            "holder": holders,
+            "coffee_machine": coffee_machines,
+            "location": locations,
+        })
+
+    def ground(self, agent_id: str) -> List[GroundAction]:
+        """All ground actions of one agent"""
+        objects = dict(self.objects, agent=[agent_id])
+        actions = []
+        for schema in self.schemas:
+            variables = [var for var, _ in schema.parameters]
+            domains = [objects.get(obj_type, []) for _, obj_type in schema.parameters]
+            for values in itertools.product(*domains):
+                actions.append(GroundAction(schema, dict(zip(variables, values))))
+        return actions
+
+
+# =============================================================================
+# Planner
+# =============================================================================
+
+class StripsPlanner:
+    """Greedy best-first search with h_add over a StripsDomain"""
+
+    def __init__(self, domain: StripsDomain, max_expansions: int = 2000):
+        self.domain = domain
+        self.max_expansions = max_expansions
+
+        self._ground_actions: Dict[str, List[GroundAction]] = {}    # agent -> ground actions
+        self._plans: Dict[tuple, Optional[List[GroundAction]]] = {}  # (goal, relevant initial facts) -> plan
+
+        # statistics
+        self.plans = 0
+        self.failures = 0
+        self.cache_hits = 0
+        self.expansions = 0
+        self.last_expansions = 0
+        self.last_cached = False            # the last plan came from the cache (no search, 0 expansions)
+        self.total_time = 0.0
+        self.last_time = 0.0
+
+    # ------------------------------------------------
+    # problem setup
+    # ------------------------------------------------
+    def task_goal(self, task) -> List[Fact]:
+        """Goal facts of a task: its desired_state, or the TASK_GOALS entry of its type"""
+        goal = [(p.name,) + tuple(p.args) for p in task.desired_state.predicates]
+        if not goal:
+            binding = {"?" + key: value for key, value in task.parameters.items()}
+            goal = [_ground(f, binding) for f in TASK_GOALS.get(task.task_type, [])]
+            if any(arg is None or arg.startswith("?") for f in goal for arg in f[1:]):
+                return []   # a parameter the goal needs is missing
+        return goal
+
+    def initial_state(self, world_state: State) -> FrozenSet[Fact]:
+        return frozenset((p.name,) + tuple(p.args) for p in world_state.predicates
+                         if p.name in self.domain.vocabulary)
+
+    def _relevant(self, goal: Iterable[Fact], actions: List[GroundAction]) -> Tuple[List[GroundAction], set]:
+        """Backward relevance: actions adding a relevant fact make their preconditions relevant"""
+        facts = set(goal)
+        relevant = []
+        remaining = list(actions)
+        changed = True
+        while changed:
+            changed = False
+            still = []
+            for action in remaining:
+                if any(f in facts for f in action.add):
+                    relevant.append(action)
+                    facts.update(action.pre)
+                    changed = True
+                else:
+                    still.append(action)
+            remaining = still
+        return relevant, facts
+
+    # ------------------------------------------------
+    # search
+    # ------------------------------------------------
+    @staticmethod
+    def h_add(state: FrozenSet[Fact], goal: Tuple[Fact, ...], actions: List[GroundAction]) -> float:
+        """Additive heuristic: sum over goal facts of the relaxed cost to reach each one"""
+        cost = dict.fromkeys(state, 0)
+        changed = True
+        while changed:
+            changed = False
+            for action in actions:
+                c = 1
+                for p in action.pre:
+                    pc = cost.get(p)
+                    if pc is None:
+                        break
+                    c += pc
+                else:
+                    for f in action.add:
+                        if c < cost.get(f, math.inf):
+                            cost[f] = c
+                            changed = True
+        return sum(cost.get(g, math.inf) for g in goal)
+
+    def plan(self, agent_id: str, goal: List[Fact], world_state: State) -> Optional[List[ActionRecord]]:
+        """Plan for one agent; None if the goal is unreachable within max_expansions"""
+        t0 = time.perf_counter()
+        if agent_id not in self._ground_actions:
+            self._ground_actions[agent_id] = self.domain.ground(agent_id)
+        goal = tuple(goal)
+        actions, relevant_facts = self._relevant(goal, self._ground_actions[agent_id])
+
+        init = self.initial_state(world_state)
+        neg_names = {p[0] for a in actions for p in a.neg_pre}
+        key = (agent_id, goal, frozenset(f for f in init if f in relevant_facts or f[0] in neg_names))
+        self.last_cached = key in self._plans
+        if self.last_cached:
+            self.cache_hits += 1
+            self.last_expansions = 0
+            plan = self._plans[key]
+        else:
+            plan = self._search(init, goal, actions)
+            self._plans[key] = plan
+            self.plans += 1
+            if plan is None:
+                self.failures += 1
+
+        self.last_time = time.perf_counter() - t0
+        self.total_time += self.last_time
+        return None if plan is None else [action.to_record() for action in plan]
+
+    def _search(self, init: FrozenSet[Fact], goal: Tuple[Fact, ...], actions: List[GroundAction]):
+        h0 = self.h_add(init, goal, actions)
+        self.last_expansions = 0
+        if h0 == math.inf:
+            return None
+
+        counter = itertools.count()
+        open_heap = [(h0, next(counter), init)]
+        parents = {init: None}     # state -> (parent state, action); doubles as duplicate detection
+        while open_heap and self.last_expansions < self.max_expansions:
+            _, _, state = heapq.heappop(open_heap)
+            if all(g in state for g in goal):
+                return self._extract(parents, state)
+            self.last_expansions += 1
+            self.expansions += 1
+            for action in actions:
+                if not action.applicable(state):
+                    continue
+                successor = action.apply(state)
+                if successor in parents:
+                    continue
+                parents[successor] = (state, action)
+                h = self.h_add(successor, goal, actions)
+                if h < math.inf:
+                    heapq.heappush(open_heap, (h, next(counter), successor))
+        return None
+
+    @staticmethod
+    def _extract(parents, state) -> List[GroundAction]:
+        plan = []
+        while parents[state] is not None:
+            state, action = parents[state]
+            plan.append(action)
+        plan.reverse()
+        return plan
+
+    def get_stats(self) -> Dict:
+        return {
+            "plans": self.plans,
+            "failures": self.failures,
+            "cache_hits": self.cache_hits,
+            "expansions": self.expansions,
+            "total_time": self.total_time,
+            "last_time": self.last_time,
+        }
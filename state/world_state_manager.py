@@ -2,7 +2,7 @@
 from typing import List, Dict, Any, Tuple
 from intentions.state_representation import State, Predicate, Fluent
 from actors.factory_operators import Operator
-from objects.factory_objects import Item, Shelf, KittingTable
+from objects.factory_objects import ACSwitch, CoffeeMachine, Door, Item, Shelf, KittingTable
 import logging
 
 
@@ -15,6 +15,18 @@ class WorldStateManager:
         # Initialize world state with initial model state
         self.static_predicates = self._get_static_predicates()
 
+        # static entities operators can reach besides items and the kitting table (shelves, coffee machines, ...)
+        self.static_targets = [(entity.unique_id, entity.pos) for entity in
+                               list(self.model.shelves.values()) + list(self.model.coffee_machines.values()) +
+                               list(self.model.doors.values()) + list(self.model.ac_switches.values())]
+
+        # everything an operator can reach, queried from the space for all operators at once;
+        # reach predicates keep the order of the per-entity checks (items, kitting table, static targets)
+        self.REACH_TYPES = (Item, KittingTable, Shelf, Door, CoffeeMachine, ACSwitch)
+        self._reach_rank = {entity_id: rank for rank, entity_id in
+                            enumerate(list(self.model.items) + ["kitting_table"] +
+                                      [entity_id for entity_id, _ in self.static_targets])}
+
 
     def _get_static_predicates(self) -> List[Predicate]:
         """Get static predicates that are true in the initial state"""
@@ -33,6 +45,10 @@ class WorldStateManager:
         for door_id, door in self.model.doors.items():
             door_pos_str = f"{door.pos[0]},{door.pos[1]}"
             static_predicates.append(Predicate("at", [door_id, door_pos_str]))
+
+        # Coffee machines and AC switches
+        for entity_id, entity in list(self.model.coffee_machines.items()) + list(self.model.ac_switches.items()):
+            static_predicates.append(Predicate("at", [entity_id, f"{entity.pos[0]},{entity.pos[1]}"]))
             
         return static_predicates
 
@@ -50,6 +66,17 @@ class WorldStateManager:
 
 
 
+    def _reachable_entities(self, agents) -> List[List[str]]:
+        """Ids of the entities each agent can reach (same position, see _check_reach), in one space query"""
+        if not agents:
+            return []
+        hits = self.model.grid.get_neighbors_batch([agent.pos for agent in agents], 0,
+                                                   agent_type=self.REACH_TYPES)
+        return [sorted((entity.unique_id for entity in entities if entity.unique_id in self._reach_rank),
+                       key=self._reach_rank.__getitem__)
+                for entities in hits]
+
+
     def update(self):
         """Update the complete world state based on current model state"""
 
@@ -61,8 +88,9 @@ class WorldStateManager:
         # Update predicates for agents
         # =========================================================
         all_agents = list(self.model.humans.values()) + list(self.model.robots.values())       
-        
-        for agent in all_agents:
+        reachable = self._reachable_entities(all_agents)
+
+        for agent, reached in zip(all_agents, reachable):
             # --------------------------------------------------------- 
             # Update "at(agent, pos)"  
             # ---------------------------------------------------------
@@ -76,26 +104,21 @@ class WorldStateManager:
             # ---------------------------------------------------------
             # Check reach predicates with items and static objects
             # ---------------------------------------------------------
-            for item in self.model.items.values():
-                if self._check_reach(agent.pos, item.pos):
-                    new_predicates.append(Predicate("reach", [agent.unique_id, item.unique_id]))
-   
-            # Check reach with kitting table
-            if self._check_reach(agent.pos, self.model.kitting_table.pos):
-                new_predicates.append(Predicate("reach", [agent.unique_id, "kitting_table"]))
+            for entity_id in reached:
+                new_predicates.append(Predicate("reach", [agent.unique_id, entity_id]))
+
+            if agent.has_coffee:
+                new_predicates.append(Predicate("has_coffee", [agent.unique_id]))
 
             # ---------------------------------------------------------
             # Handle carrying case - using item.holder relationship
             # ---------------------------------------------------------            
             if agent.carrying:
-                # Add holding predicate
+                # Add holding predicate (the carried item's "at" comes with the items below:
+                # attached to the agent in the space, it is at the agent's position)
                 new_predicates.append(
                     Predicate("holding", [agent.unique_id, agent.carrying.unique_id])
                 )
-                # Add carried item's position (same as agent)
-                new_predicates.append(
-                    Predicate("at", [agent.carrying.unique_id, agent_pos_str])
-                )
         
             
         # =========================================================
@@ -152,4 +175,4 @@ class WorldStateManager:
         #     print("\nFluents:")
         #     for fluent in self.state.fluents:
         #         print(f"  - {fluent}")
-        print("\n")
\ No newline at end of file
+        self.model.tracer.debug("world_state.print", "\n")
\ No newline at end of file
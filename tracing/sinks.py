@@ -0,0 +1,88 @@
+import json
+from collections import deque
+from typing import Dict, List, Optional
+
+
+'''
+Trace sinks
+
+A sink receives the trace records the Tracer lets through, as dicts:
+
+    {"step": 12, "level": "debug", "event": "executor.move", "message": "...", "fields": {...}}
+
+NullSink drops everything (the Tracer then skips formatting altogether), PrintSink
+writes the messages to stdout, RingBufferSink keeps the last records in memory and
+JsonlSink appends one JSON object per record to a file.
+'''
+
+
+class NullSink:
+    def emit(self, record: Dict):
+        pass
+
+    def close(self):
+        pass
+
+
+class PrintSink:
+    def emit(self, record: Dict):
+        print(record["message"])
+
+    def close(self):
+        pass
+
+
+class RingBufferSink:
+    """Last `capacity` records, oldest first"""
+
+    def __init__(self, capacity: int = 10000):
+        self.buffer = deque(maxlen=capacity)
+
+    def emit(self, record: Dict):
+        self.buffer.append(record)
+
+    @property
+    def records(self) -> List[Dict]:
+        return list(self.buffer)
+
+    def close(self):
+        pass
+
+
+class JsonlSink:
+    """One JSON object per line; the file is opened on the first record"""
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.mode = "a" if append else "w"
+        self._file = None
+
+    def emit(self, record: Dict):
+        if self._file is None:
+            self._file = open(self.path, self.mode)
+            self.mode = "a"
+        self._file.write(json.dumps(record, default=str) + "\n")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __getstate__(self):
+        # the file handle does not survive pickling (checkpoints, rollouts): reopen in append mode
+        self.close()
+        state = self.__dict__.copy()
+        state["mode"] = "a"
+        return state
+
+
+def make_sink(kind: str = "print", path: Optional[str] = None, capacity: int = 10000):
+    if kind == "null":
+        return NullSink()
+    if kind == "print":
+        return PrintSink()
+    if kind == "ring":
+        return RingBufferSink(capacity)
+    if kind == "jsonl":
+        return JsonlSink(path or "trace.jsonl")
+    raise ValueError(f"Unknown trace sink: {kind}")
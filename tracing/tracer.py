@@ -0,0 +1,89 @@
+from typing import Callable, Dict, Optional, Union
+
+from tracing.sinks import NullSink, make_sink
+
+
+'''
+Structured, level-gated tracing
+
+Simulation components report what they do as trace events instead of printing:
+
+    model.tracer.debug("executor.move", "Planning move from {start} to {target}", start=pos, target=entity_id)
+
+An event below the tracer's level (or any event while the sink is a NullSink) returns
+right after one comparison: the message is only formatted, with str.format over the
+fields, once the event is let through. Messages that are costly to build can be passed
+as a callable, or built under `if tracer.enabled(DEBUG):`.
+'''
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "off": OFF}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+class Tracer:
+    def __init__(self, level: Union[int, str] = INFO, sink=None, model=None):
+        self.model = model          # records carry its current step
+        self.sink = sink if sink is not None else NullSink()
+        self.set_level(level)
+        self.emitted = 0
+
+    def set_level(self, level: Union[int, str]):
+        self.level = LEVELS[level] if isinstance(level, str) else level
+        self._threshold = OFF + 1 if isinstance(self.sink, NullSink) else self.level
+
+    def set_sink(self, sink):
+        self.sink.close()
+        self.sink = sink
+        self.set_level(self.level)
+
+    def enabled(self, level: int) -> bool:
+        return level >= self._threshold
+
+    # ------------------------------------------------
+    # events
+    # ------------------------------------------------
+    def event(self, level: int, name: str, message: Union[str, Callable[[], str]] = "", **fields):
+        if level < self._threshold:
+            return
+        if callable(message):
+            message = message()
+        elif fields:
+            message = message.format(**fields)
+        record = {
+            "step": self.model.schedule.steps if self.model is not None else None,
+            "level": LEVEL_NAMES.get(level, level),
+            "event": name,
+            "message": message,
+        }
+        if fields:
+            # sinks may keep records: never hold on to the (mutable) objects themselves
+            record["fields"] = {key: value if isinstance(value, _SCALARS) else str(value)
+                                for key, value in fields.items()}
+        self.sink.emit(record)
+        self.emitted += 1
+
+    def debug(self, name: str, message: Union[str, Callable[[], str]] = "", **fields):
+        self.event(DEBUG, name, message, **fields)
+
+    def info(self, name: str, message: Union[str, Callable[[], str]] = "", **fields):
+        self.event(INFO, name, message, **fields)
+
+    def warning(self, name: str, message: Union[str, Callable[[], str]] = "", **fields):
+        self.event(WARNING, name, message, **fields)
+
+    def close(self):
+        self.sink.close()
+
+
+def make_tracer(params: Optional[Dict] = None, model=None) -> Tracer:
+    """Tracer from a tracing config dict (see config/tracing_param_config.py)"""
+    params = params or {}
+    sink = make_sink(params.get("sink", "print"), params.get("path"), params.get("capacity", 10000))
+    return Tracer(params.get("level", "debug"), sink, model=model)
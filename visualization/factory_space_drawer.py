@@ -127,7 +127,7 @@ def _factory_static_elements(model):
         
         
     # draw shelves as shapes
-    for agent in model.schedule.agents:
+    for agent in model.shelves.values():
         if isinstance(agent, Shelf):
             shelf = agent
             fig.add_shape(
@@ -160,46 +160,31 @@ def _factory_static_elements(model):
     
 def _factory_dynamic_elements(model, fig):
     
-    # add robot and human agents as scatter plot
-    for agent in model.schedule.agents:
-        if isinstance(agent, Robot):
-            # fig.add_shape(
-            #     type="circle",
-            #     x0=agent.pos[0]-1,
-            #     y0=agent.pos[1]-1,
-            #     x1=agent.pos[0]+ agent.size[0],
-            #     y1=agent.pos[1]+ agent.size[1],
-            #     line=dict(color="blue", width=1), 
-            # )
+    # add robot and human agents as annotations, read from the operator registry
+    registry = model.operator_registry
+    for agent, (x, y), is_human in zip(registry.operators, registry.positions, registry.is_human):
+        if not is_human:
             # Using Emoji of a robot face:
             fig.add_annotation(
-                x=agent.pos[0]+ agent.size[0]/2,
-                y=agent.pos[1]+ agent.size[1]/2,
+                x=x+ agent.size[0]/2,
+                y=y+ agent.size[1]/2,
                 text="🤖",
                 font=dict(color="blue", size= agent.size[0]*1.1),
                 showarrow=False,
             )
             
-        elif isinstance(agent, Human):
-            # fig.add_shape(
-            #     type="circle",
-            #     x0=agent.pos[0]-1,
-            #     y0=agent.pos[1]-1,
-            #     x1=agent.pos[0]+ agent.size[0],
-            #     y1=agent.pos[1]+ agent.size[1],
-            #     line=dict(color="green", width=1), 
-            # )
+        else:
             # Using Emoji of a worke face: 
             fig.add_annotation(
-                x=agent.pos[0]+ agent.size[0]/2,
-                y=agent.pos[1]+ agent.size[1]/2,
+                x=x+ agent.size[0]/2,
+                y=y+ agent.size[1]/2,
                 text="👷🏼‍♀️",
                 font=dict(color="green", size= agent.size[0]*2),
                 showarrow=False,
             )
     
     # add item agents as scatter plot
-    for agent in model.schedule.agents:
+    for agent in model.items.values():
         if isinstance(agent, Item):
             
             holder_ag = agent.holder
@@ -226,14 +211,14 @@ def _factory_dynamic_elements(model, fig):
             )
 
     # Add planned paths for operators
-    for agent in model.schedule.agents:
-        if isinstance(agent, Operator) and hasattr(agent, 'planned_path') and agent.planned_path:
+    for planned_path, is_human in zip(registry.planned_paths, registry.is_human):
+        if planned_path:
             # Extract x and y coordinates from path
-            x_coords = [pos[0] for pos in agent.planned_path]
-            y_coords = [pos[1] for pos in agent.planned_path]
+            x_coords = [pos[0] for pos in planned_path]
+            y_coords = [pos[1] for pos in planned_path]
             
             # Choose color based on agent type
-            path_color = 'blue' if isinstance(agent, Robot) else 'green'
+            path_color = 'green' if is_human else 'blue'
             
             # Create a scatter plot with markers for the path points
             path_fig = px.scatter(x=x_coords, y=y_coords)